@@ -0,0 +1 @@
+"""Offline micro‑benchmarks; run modules with ``python -m benchmarks.<name>``."""
@@ -0,0 +1,76 @@
+"""CLI cold‑start benchmark.
+
+Runs short ``pyvast`` invocations in fresh interpreters and reports wall time,
+plus the slowest imports of one of them (``python -X importtime``). The
+``load`` case builds an executor for the HTTP‑only demo manifest and fails if
+that imported lxml.
+
+    python -m benchmarks.bench_cli_startup [-n 10] [--importtime inspect]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = str(ROOT / "contrib/manifests/multi_ssp_demo.yml")
+
+CASES = {
+    "python": ["-c", "pass"],  # interpreter floor
+    "import": ["-c", "import pyvast"],
+    "help": ["-m", "pyvast.cli", "--help"],
+    "inspect": ["-m", "pyvast.cli", "manifest", "inspect", DEMO],
+    "executor": ["-c", "import pyvast.manifest.executor"],
+    "load": ["-c", "import sys; from pathlib import Path; from pyvast.manifest.executor import ManifestExecutor;"
+             " from pyvast.manifest.loader import ManifestLoader;"
+             f" ManifestExecutor(ManifestLoader(Path({DEMO!r})).model);"
+             " assert 'lxml' not in sys.modules, 'lxml imported by an HTTP-only manifest'"],
+}
+
+
+def _run(args, env):
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, *args], cwd=ROOT, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - t0
+
+
+def importtime(args, env, top=15):
+    out = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT, env=env,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True).stderr
+    rows = []
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cum_us, name = line[len("import time:"):].split("|")
+        if not name[1:].startswith(" "):  # nested imports are indented further
+            rows.append((int(cum_us), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", type=int, default=10)
+    ap.add_argument("--importtime", choices=list(CASES), help="show the slowest top-level imports of a case")
+    args = ap.parse_args(argv)
+
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    res = {}
+    for name, cmd in CASES.items():
+        _run(cmd, env)  # warm the OS page cache / .pyc files
+        times = [_run(cmd, env) for _ in range(args.n)]
+        res[name] = (min(times) * 1e3, statistics.median(times) * 1e3)
+        print(f"{name:>9}: min {res[name][0]:7.1f} ms   median {res[name][1]:7.1f} ms")
+    if args.importtime:
+        print(f"\nslowest imports for {args.importtime!r} (cumulative):")
+        for us, mod in importtime(CASES[args.importtime], env):
+            print(f"  {us / 1e3:7.1f} ms  {mod}")
+    return res
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Micro‑benchmark: ``interpolate_macros`` vs. compiled templates.
+
+Renders every string of the adfox spec from the demo manifest (base_uri,
+query values, headers) with the demo context.
+
+    python -m benchmarks.bench_macro [-n 20000]
+"""
+
+import argparse
+import json
+import timeit
+from pathlib import Path
+
+from pyvast.manifest.loader import ManifestLoader
+from pyvast.utils.macro import compile_template, interpolate_macros
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def load_case():
+    model = ManifestLoader(ROOT / "contrib/manifests/multi_ssp_demo.yml").model
+    spec = model.adapters["adfox"].spec
+    texts = [spec.base_uri, *map(str, spec.query.values()), *map(str, spec.headers.values())]
+    ctx = json.loads((ROOT / "contrib/ctx/demo.json").read_text())
+    return texts, ctx
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", type=int, default=20_000)
+    n = ap.parse_args(argv).n
+
+    texts, ctx = load_case()
+    templates = [compile_template(t) for t in texts]
+
+    def regex():
+        for t in texts:
+            interpolate_macros(t, ctx)
+
+    def compiled():
+        for t in templates:
+            t.render(ctx)
+
+    res = {}
+    for name, fn in (("interpolate_macros", regex), ("compiled", compiled)):
+        res[name] = min(timeit.repeat(fn, number=n, repeat=5)) / n * 1e6
+        print(f"{name:>20}: {res[name]:8.2f} µs / spec")
+    print(f"{'speedup':>20}: {res['interpolate_macros'] / res['compiled']:8.1f}x")
+    return res
+
+
+if __name__ == "__main__":
+    main()
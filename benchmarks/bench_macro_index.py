@@ -0,0 +1,55 @@
+"""Micro‑benchmark: request fan‑out rendering with and without a :class:`MacroIndex`.
+
+One request (the demo context) is rendered by ``--endpoints`` request plans
+built from the demo manifest's adapters, the way ``ManifestExecutor.execute``
+fans out: every endpoint gets its own shallow copy of the context. The
+indexed run creates a fresh index per request, so the first lookup of every
+key is included.
+
+    python -m benchmarks.bench_macro_index [-n 5000] [--endpoints 16]
+"""
+
+import argparse
+import json
+import timeit
+from pathlib import Path
+
+from pyvast.adapters.request_plan import RequestPlan
+from pyvast.manifest.loader import ManifestLoader
+from pyvast.utils.macro import MacroIndex
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", type=int, default=5_000)
+    ap.add_argument("--endpoints", type=int, default=16)
+    args = ap.parse_args(argv)
+
+    model = ManifestLoader(ROOT / "contrib/manifests/multi_ssp_demo.yml").model
+    specs = [adef.spec for adef in model.adapters.values()]
+    plans = [RequestPlan(specs[i % len(specs)]) for i in range(args.endpoints)]
+    ctx = json.loads((ROOT / "contrib/ctx/demo.json").read_text())
+
+    def plain():
+        for plan in plans:
+            plan.render(dict(ctx))
+
+    def indexed():
+        index = MacroIndex(ctx)
+        for plan in plans:
+            plan.render(index.copy(), None, None, index)
+
+    index = MacroIndex(ctx)  # same requests, [CACHE_BUST] aside
+    assert [p.cache_key(ctx) for p in plans] == [p.cache_key(ctx, None, None, index) for p in plans]
+    res = {}
+    for name, fn in (("plain", plain), ("indexed", indexed)):
+        res[name] = min(timeit.repeat(fn, number=args.n, repeat=5)) / args.n * 1e6
+        print(f"{name:>8}: {res[name]:8.2f} µs / request ({args.endpoints} endpoints)")
+    print(f"{'speedup':>8}: {res['plain'] / res['indexed']:8.2f}x")
+    return res
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Benchmark: streaming :func:`parse_vast` vs. full‑DOM parsing.
+
+Builds a large multi‑ad response (media files, tracking, bulky Extensions and
+CompanionAds) and compares CPU time and peak‑RSS growth (lxml allocates
+outside the Python heap, so RSS is measured in a fresh interpreter) of
+
+* ``dom+tostring`` – parse + serialize back, as ``resolve_wrappers`` does per hop,
+* ``dom`` – ``lxml.etree.fromstring`` then building the same model,
+* ``stream`` – :func:`pyvast.vast.parse_vast`.
+
+Expect ``stream`` and ``dom`` to take about the same time (within noise);
+what differs is peak RSS, which for ``stream`` stays near the size of the
+model instead of growing with the response.
+
+    python -m benchmarks.bench_parser [--ads 50] [-n 200]
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+import lxml.etree as ET
+
+from pyvast.vast import Ad, Creative, Impression, MediaFile, Tracking, Vast, parse_vast
+from pyvast.vast.parser import _int, parse_duration
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def make_response(ads: int = 50) -> bytes:
+    def ad(i):
+        media = "".join(
+            f'<MediaFile delivery="progressive" type="video/mp4" width="{w}" height="{w // 2}" '
+            f'bitrate="{w}">https://cdn.example/{i}/{w}.mp4</MediaFile>'
+            for w in (320, 640, 960, 1280, 1920)
+        )
+        tracking = "".join(
+            f'<Tracking event="{e}">https://t.example/{i}/{e}?cb=[CACHEBUSTING]</Tracking>'
+            for e in ("start", "firstQuartile", "midpoint", "thirdQuartile", "complete",
+                      "mute", "unmute", "pause", "resume", "fullscreen")
+        )
+        companions = "".join(
+            f'<Companion width="300" height="250"><StaticResource creativeType="image/png">'
+            f'https://c.example/{i}/{j}.png</StaticResource></Companion>'
+            for j in range(10)
+        )
+        extension = "<Extension type='blob'>" + "x" * 4000 + "</Extension>"
+        return (
+            f'<Ad id="ad{i}" sequence="{i + 1}"><InLine><AdSystem>bench</AdSystem>'
+            f'<AdTitle>Ad {i}</AdTitle><Impression>https://imp.example/{i}</Impression>'
+            f'<Creatives><Creative id="c{i}"><Linear><Duration>00:00:15</Duration>'
+            f'<TrackingEvents>{tracking}</TrackingEvents>'
+            f'<VideoClicks><ClickThrough>https://click.example/{i}</ClickThrough></VideoClicks>'
+            f'<MediaFiles>{media}</MediaFiles></Linear></Creative>'
+            f'<Creative><CompanionAds>{companions}</CompanionAds></Creative></Creatives>'
+            f'<Extensions>{extension * 5}</Extensions></InLine></Ad>'
+        )
+
+    return ('<VAST version="4.0">' + "".join(ad(i) for i in range(ads)) + "</VAST>").encode()
+
+
+def _dom_creative(el) -> Creative:
+    cr = Creative(id=el.get("id"), ad_id=el.get("adId"), sequence=_int(el.get("sequence")))
+    linear = el.find("Linear")
+    if linear is not None:
+        cr.duration = parse_duration(linear.findtext("Duration"))
+        cr.media_files = [
+            MediaFile((m.text or "").strip(), m.get("delivery"), m.get("type"), _int(m.get("width")),
+                      _int(m.get("height")), _int(m.get("bitrate")), m.get("codec"))
+            for m in linear.iterfind("MediaFiles/MediaFile")
+        ]
+        cr.tracking = [
+            Tracking(t.get("event", ""), (t.text or "").strip(), t.get("offset"))
+            for t in linear.iterfind("TrackingEvents/Tracking")
+        ]
+        cr.click_through = (linear.findtext("VideoClicks/ClickThrough") or "").strip()
+    return cr
+
+
+def parse_dom(data: bytes) -> Vast:
+    """Full DOM first, then build the same model with XPath‑style lookups."""
+    doc = ET.fromstring(data)
+    vast = Vast(doc.get("version", "4.0"))
+    for el in doc.iterfind("Ad"):
+        body = el.find("InLine")
+        vast.ads.append(Ad(
+            id=el.get("id"),
+            sequence=_int(el.get("sequence")),
+            ad_system=(body.findtext("AdSystem") or "").strip(),
+            title=(body.findtext("AdTitle") or "").strip(),
+            impressions=[Impression((i.text or "").strip(), i.get("id")) for i in body.iterfind("Impression")],
+            creatives=[_dom_creative(c) for c in body.iterfind("Creatives/Creative")],
+        ))
+    return vast
+
+
+def dom_roundtrip(data: bytes) -> str:
+    """What ``resolve_wrappers`` does per hop today: parse + serialize back."""
+    return ET.tostring(ET.fromstring(data), encoding="unicode")
+
+
+_CHILD = """
+import pathlib, resource, sys
+from benchmarks.bench_parser import CASES
+
+def hwm():  # VmHWM resets on exec, unlike ru_maxrss which a child inherits
+    try:
+        for line in open("/proc/self/status"):
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+data = pathlib.Path(sys.argv[2]).read_bytes()
+before = hwm()
+keep = CASES[sys.argv[1]](data)
+print(hwm() - before)
+"""
+
+
+def _rss_growth(name: str, path: Path) -> int:
+    """Peak‑RSS growth (KiB) of parsing ``path`` once in a fresh interpreter."""
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD, name, str(path)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return int(out.stdout.strip())
+
+
+CASES = {"dom+tostring": dom_roundtrip, "dom": parse_dom, "stream": parse_vast}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--ads", type=int, default=50)
+    ap.add_argument("-n", type=int, default=200)
+    args = ap.parse_args(argv)
+
+    data = make_response(args.ads)
+    print(f"response: {args.ads} ads, {len(data) / 1024:.0f} KiB")
+    res = {}
+    with tempfile.NamedTemporaryFile(suffix=".xml") as f:
+        f.write(data)
+        f.flush()
+        for name, fn in CASES.items():
+            t = min(timeit.repeat(lambda: fn(data), number=args.n, repeat=3)) / args.n
+            res[name] = (t * 1e3, _rss_growth(name, Path(f.name)))
+            print(f"{name:>13}: {res[name][0]:7.2f} ms   peak-RSS +{res[name][1]:7d} KiB")
+    return res
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Micro‑benchmark: legacy ``_build_request`` vs. :class:`RequestPlan`.
+
+    python -m benchmarks.bench_request_plan [-n 20000]
+"""
+
+import argparse
+import json
+import timeit
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from pyvast.adapters.request_plan import RequestPlan
+from pyvast.manifest.loader import ManifestLoader
+from pyvast.utils.macro import interpolate_macros
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def legacy_build_request(spec, ctx):
+    """The per‑call algorithm ``_build_request`` used before request plans."""
+    parsed = urlparse(interpolate_macros(spec.base_uri, ctx))
+    query = dict(parse_qsl(parsed.query, keep_blank_values=True))
+    for key, val in spec.query.items():
+        query[key] = interpolate_macros(str(val), ctx)
+    url = urlunparse(parsed._replace(query=urlencode(query, doseq=True)))
+    hdrs = {k: interpolate_macros(str(v), ctx) for k, v in spec.headers.items()}
+    return url, hdrs, None
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", type=int, default=20_000)
+    n = ap.parse_args(argv).n
+
+    model = ManifestLoader(ROOT / "contrib/manifests/multi_ssp_demo.yml").model
+    ctx = json.loads((ROOT / "contrib/ctx/demo.json").read_text())
+    res = {}
+    for aid, adef in model.adapters.items():
+        plan = RequestPlan(adef.spec)
+        legacy = min(timeit.repeat(lambda: legacy_build_request(adef.spec, ctx), number=n, repeat=5))
+        planned = min(timeit.repeat(lambda: plan.render(ctx), number=n, repeat=5))
+        res[aid] = (legacy / n * 1e6, planned / n * 1e6)
+        print(f"{aid:>14}: legacy {res[aid][0]:7.2f} µs   plan {res[aid][1]:7.2f} µs"
+              f"   {legacy / planned:5.1f}x")
+    return res
+
+
+if __name__ == "__main__":
+    main()
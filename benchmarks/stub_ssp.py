@@ -0,0 +1,124 @@
+"""Local stub SSP for offline benchmarks.
+
+An aiohttp app serving ``/ssp/{profile}``. A :class:`Profile` decides how the
+answer looks and how long it takes: latency distribution, no‑fill rate,
+wrapper chain depth, ads per response and padding to a target size. Wrapper
+hops point back at the stub (``?hop=N``), so wrapper chains resolve locally.
+Randomness is seeded, so runs are repeatable.
+
+    async with StubSSP({'fast': Profile(latency=('fixed', 0.001))}) as ssp:
+        url = ssp.url('fast')
+"""
+
+import asyncio
+import random
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from aiohttp import web
+
+__all__ = ["Profile", "StubSSP", "make_inline", "make_wrapper"]
+
+NOFILL = '<?xml version="1.0" encoding="UTF-8"?><VAST version="4.0"/>'
+
+
+@dataclass
+class Profile:
+    # ('fixed', s) | ('uniform', lo, hi) | ('lognormal', median_s, sigma)
+    latency: Tuple = ("fixed", 0.0)
+    nofill_rate: float = 0.0
+    wrapper_depth: int = 0
+    ads: int = 1
+    size: int = 0  # pad InLine responses to about this many bytes
+
+    def delay(self, rng: random.Random) -> float:
+        kind, *args = self.latency
+        if kind == "fixed":
+            return args[0]
+        if kind == "uniform":
+            return rng.uniform(*args)
+        if kind == "lognormal":
+            median, sigma = args
+            return rng.lognormvariate(0, sigma) * median
+        raise ValueError(f"unknown latency distribution {kind!r}")
+
+
+def make_inline(ads: int = 1, size: int = 0, tag: str = "stub") -> str:
+    body = "".join(
+        f'<Ad id="{tag}-{i}" sequence="{i + 1}"><InLine><AdSystem>stub</AdSystem>'
+        f"<AdTitle>{tag} {i}</AdTitle><Impression><![CDATA[http://127.0.0.1/imp/{tag}/{i}]]></Impression>"
+        f'<Creatives><Creative id="c{i}" adId="{tag}-{i}"><Linear><Duration>00:00:15</Duration>'
+        '<TrackingEvents><Tracking event="start"><![CDATA[http://127.0.0.1/t/start]]></Tracking>'
+        "</TrackingEvents><MediaFiles>"
+        f'<MediaFile delivery="progressive" type="video/mp4" width="640" height="360">'
+        f"<![CDATA[http://127.0.0.1/cdn/{tag}/{i}.mp4]]></MediaFile>"
+        "</MediaFiles></Linear></Creative></Creatives></InLine></Ad>"
+        for i in range(ads)
+    )
+    xml = f'<?xml version="1.0" encoding="UTF-8"?><VAST version="4.0">{body}</VAST>'
+    if size > len(xml):
+        xml = xml.replace("</VAST>", f"<!--{'x' * (size - len(xml) - 7)}--></VAST>")
+    return xml
+
+
+def make_wrapper(next_url: str, tag: str = "stub") -> str:
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><VAST version="4.0"><Ad id="w"><Wrapper>'
+        f"<AdSystem>stub</AdSystem><VASTAdTagURI><![CDATA[{next_url}]]></VASTAdTagURI>"
+        f"<Impression><![CDATA[http://127.0.0.1/imp/{tag}/wrapper]]></Impression>"
+        "</Wrapper></Ad></VAST>"
+    )
+
+
+class StubSSP:
+    def __init__(self, profiles: Dict[str, Profile], *, seed: int = 1):
+        self.profiles = profiles
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.port: Optional[int] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._bodies: Dict[str, str] = {}  # InLine bodies are built once per profile
+
+    def url(self, profile: str) -> str:
+        return f"http://127.0.0.1:{self.port}/ssp/{profile}"
+
+    async def start(self) -> "StubSSP":
+        app = web.Application()
+        app.router.add_get("/ssp/{profile}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "StubSSP":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        name = request.match_info["profile"]
+        profile = self.profiles.get(name)
+        if profile is None:
+            raise web.HTTPNotFound()
+        self.requests += 1
+        delay = profile.delay(self.rng)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        hop = int(request.query.get("hop", profile.wrapper_depth))
+        if hop == profile.wrapper_depth and self.rng.random() < profile.nofill_rate:
+            body = NOFILL
+        elif hop > 0:
+            body = make_wrapper(f"{self.url(name)}?hop={hop - 1}", name)
+        else:
+            body = self._bodies.get(name)
+            if body is None:
+                body = self._bodies[name] = make_inline(profile.ads, profile.size, name)
+        return web.Response(text=body, content_type="application/xml")
@@ -0,0 +1,234 @@
+"""Offline benchmark suite with baseline comparison.
+
+Micro cases (µs/op): ``interpolate_macros``, ``_build_request``,
+``apply_param_setters``. End‑to‑end cases run against a local
+:class:`~benchmarks.stub_ssp.StubSSP`: ``resolve_wrappers`` over a 3‑hop chain
+and full ``ManifestExecutor.execute`` calls at fixed concurrency.
+
+    python -m benchmarks.suite --save              # run and store as the baseline
+    python -m benchmarks.suite                     # run, compare with the baseline
+    python -m benchmarks.suite --only macro,execute --tolerance 0.3
+
+Every metric records whether lower or higher is better; the run exits with
+status 1 when any metric is worse than the baseline by more than
+``--tolerance`` (relative), and with status 2 when there is no baseline.
+
+Absolute numbers only compare on the same machine, so no baseline is
+committed (``baseline.json`` is git‑ignored). Measure both sides in one job,
+e.g. in CI::
+
+    git checkout "$BASE" && python -m benchmarks.suite --save
+    git checkout "$HEAD" && python -m benchmarks.suite
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import timeit
+from pathlib import Path
+from typing import Callable, Dict
+
+import aiohttp
+
+from pyvast.adapters.base_http import BaseHTTPAdapter
+from pyvast.manifest.executor import ManifestExecutor
+from pyvast.manifest.loader import ManifestLoader
+from pyvast.manifest.types import ManifestModel, ParamSetter
+from pyvast.manifest.utils_param import apply_param_setters
+from pyvast.runtime import PoolConfig, Runtime
+from pyvast.utils.macro import interpolate_macros
+from pyvast.utils.wrapper_resolver import resolve_wrappers
+
+from .stub_ssp import Profile, StubSSP
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINE = Path(__file__).with_name("baseline.json")
+
+Metrics = Dict[str, Dict[str, object]]
+
+PROFILES = {
+    "fast": Profile(latency=("fixed", 0.0)),
+    "typical": Profile(latency=("lognormal", 0.005, 0.5), nofill_rate=0.2, size=4096),
+    "wrapped": Profile(latency=("fixed", 0.0), wrapper_depth=3),
+}
+
+
+def _metric(value: float, unit: str, better: str = "lower") -> Dict[str, object]:
+    return {"value": round(value, 3), "unit": unit, "better": better}
+
+
+def _per_op(fn: Callable[[], object], n: int) -> float:
+    return min(timeit.repeat(fn, number=n, repeat=5)) / n * 1e6
+
+
+def _demo():
+    model = ManifestLoader(ROOT / "contrib/manifests/multi_ssp_demo.yml").model
+    ctx = json.loads((ROOT / "contrib/ctx/demo.json").read_text())
+    return model, ctx
+
+
+# micro ------------------------------------------------------------------------
+def bench_macro(n: int) -> Metrics:
+    model, ctx = _demo()
+    spec = model.adapters["adfox"].spec
+    texts = [spec.base_uri, *map(str, spec.query.values()), *map(str, spec.headers.values())]
+
+    def run():
+        for t in texts:
+            interpolate_macros(t, ctx)
+
+    return {"macro.interpolate": _metric(_per_op(run, n), "us/op")}
+
+
+def bench_build_request(n: int) -> Metrics:
+    model, ctx = _demo()
+    adef = model.adapters["adfox"]
+    adapter = BaseHTTPAdapter(adef.spec, adef.config)
+    return {"adapter.build_request": _metric(_per_op(lambda: adapter._build_request(ctx), n), "us/op")}
+
+
+def bench_param_setters(n: int) -> Metrics:
+    _, ctx = _demo()
+    setters = [
+        ParamSetter(target="query.p1", factory={"fn": "pyvast.utils.factories:constant", "args": ["${device.ifa}"]}),
+        ParamSetter(target="query.p2", factory={"fn": "pyvast.utils.factories:constant", "args": ["x"]}),
+        ParamSetter(target="header.X-Set", factory={"fn": "pyvast.utils.factories:constant", "args": ["h"]}),
+    ]
+
+    async def run():
+        best = float("inf")
+        for _ in range(5):
+            t0 = time.perf_counter()
+            for _ in range(n):
+                await apply_param_setters({**ctx, "url": "https://h/x?a=1"}, setters)
+            best = min(best, time.perf_counter() - t0)
+        return best / n * 1e6
+
+    return {"param_setters.apply": _metric(asyncio.run(run()), "us/op")}
+
+
+# end to end -------------------------------------------------------------------
+def bench_wrappers(n: int) -> Metrics:
+    async def run():
+        async with StubSSP(PROFILES) as ssp, aiohttp.ClientSession() as s:
+
+            async def fetch(url):
+                async with s.get(url) as r:
+                    return await r.text()
+
+            url = ssp.url("wrapped")
+            lat = []
+            for _ in range(n):
+                t0 = time.perf_counter()
+                await resolve_wrappers(await fetch(url), fetch, ctx={})
+                lat.append(time.perf_counter() - t0)
+            return lat
+
+    lat = asyncio.run(run())
+    return {"wrappers.resolve_3hop.p50": _metric(statistics.median(lat) * 1e3, "ms")}
+
+
+def stub_manifest(ssp: StubSSP) -> ManifestModel:
+    adapters = {
+        name: {"spec": {"base_uri": ssp.url(name), "query": {"ip": "${device.ip}", "cb": "[CACHE_BUST]"}},
+               "config": {"timeout": 1.0}}
+        for name in ("fast", "typical")
+    }
+    return ManifestModel(
+        id="bench",
+        adapters=adapters,
+        endpoints=[{"id": f"{a}_ep", "name": a, "adapter_id": a} for a in adapters],
+        groups=[
+            {"id": "par", "priority": 1, "mode": "parallel", "select": "priority",
+             "endpoints": ["typical_ep", "fast_ep"]},
+        ],
+    )
+
+
+def bench_execute(n: int, concurrency: int = 32) -> Metrics:
+    async def run():
+        async with StubSSP(PROFILES) as ssp, Runtime(PoolConfig(warm_interval=0)) as rt:
+            async with ManifestExecutor(stub_manifest(ssp), runtime=rt) as ex:
+                _, ctx = _demo()
+                lat = []
+                sem = asyncio.Semaphore(concurrency)
+
+                async def one():
+                    async with sem:
+                        t0 = time.perf_counter()
+                        await ex.execute(ctx)
+                        lat.append(time.perf_counter() - t0)
+
+                t0 = time.perf_counter()
+                await asyncio.gather(*(one() for _ in range(n)))
+                return lat, time.perf_counter() - t0
+
+    lat, wall = asyncio.run(run())
+    lat.sort()
+    return {
+        "execute.rps": _metric(len(lat) / wall, "req/s", "higher"),
+        "execute.p50": _metric(lat[len(lat) // 2] * 1e3, "ms"),
+        "execute.p95": _metric(lat[int(len(lat) * 0.95)] * 1e3, "ms"),
+    }
+
+
+CASES = {
+    "macro": (bench_macro, 20_000),
+    "build_request": (bench_build_request, 20_000),
+    "param_setters": (bench_param_setters, 5_000),
+    "wrappers": (bench_wrappers, 200),
+    "execute": (bench_execute, 2_000),
+}
+
+
+def compare(current: Metrics, baseline: Metrics, tolerance: float) -> bool:
+    """Print a comparison table; ``False`` if anything regressed."""
+    ok = True
+    for name, m in current.items():
+        base = baseline.get(name)
+        line = f"{name:>28}: {m['value']:10.3f} {m['unit']:<6}"
+        if base and base["value"]:
+            ratio = m["value"] / base["value"]
+            worse = ratio - 1 if m["better"] == "lower" else 1 - ratio
+            flag = "REGRESSION" if worse > tolerance else ""
+            ok = ok and not flag
+            line += f"  baseline {base['value']:10.3f}  {ratio:6.2f}x  {flag}"
+        print(line)
+    return ok
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--only", help="comma separated cases: " + ",".join(CASES))
+    ap.add_argument("--scale", type=float, default=1.0, help="multiply iteration counts")
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--save", action="store_true", help="store this run as the baseline")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    args = ap.parse_args(argv)
+
+    names = args.only.split(",") if args.only else list(CASES)
+    current: Metrics = {}
+    for name in names:
+        fn, n = CASES[name]
+        current.update(fn(max(1, int(n * args.scale))))
+
+    if args.save:
+        stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        stored.update(current)
+        args.baseline.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+        compare(current, {}, args.tolerance)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        compare(current, {}, args.tolerance)
+        print(f"no baseline at {args.baseline}; run with --save on the base revision first",
+              file=sys.stderr)
+        return 2
+    return 0 if compare(current, json.loads(args.baseline.read_text()), args.tolerance) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,8 @@
 from .registry import register_adapter, get_adapter
-from .mock import MockAdapter
-register_adapter('mock', MockAdapter)
+
+def __getattr__(name):  # keep `from pyvast.adapters import MockAdapter` without importing it eagerly
+    if name == 'MockAdapter':
+        return get_adapter('mock')
+    raise AttributeError(name)
+
 __all__ = ['register_adapter','get_adapter','MockAdapter']
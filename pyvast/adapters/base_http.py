@@ -4,11 +4,23 @@ from __future__ import annotations
 
 Responsibilities
 ----------------
-* Render `AdapterSpec` (base_uri, query, headers, body) using macro engine.
+* Render `AdapterSpec` (base_uri, query, headers, body) using macro engine;
+  the spec is compiled once into a :class:`RequestPlan` at construction.
 * Apply ParamSetter cascade (client → group → endpoint → mixins).
 * Re‑use an existing aiohttp.ClientSession passed from ManifestExecutor.
 * Respect timeout from `AdapterConfig`.
-* Optionally resolve `<VASTAdTagURI>` wrapper chains.
+* Optionally answer from a response cache (`AdapterConfig.cache`) keyed by
+  the rendered request with volatile macros masked. Stale entries are served
+  (and refreshed in the background) only on a Runtime's long‑lived session.
+* Read bodies in chunks (gzip/deflate decoded on the fly by aiohttp) up to
+  `AdapterConfig.max_body`, and raise :class:`NoFill` as soon as the first
+  bytes show a VAST without any ``<Ad>``.
+* Optionally coalesce identical concurrent requests into one upstream call
+  (`AdapterConfig.coalesce`), keyed like the response cache – only on a
+  Runtime's long‑lived session, since joined callers depend on the session
+  of the request that started the call.
+* Optionally resolve `<VASTAdTagURI>` wrapper chains (cached per adapter,
+  see `AdapterConfig.wrapper_cache_ttl`).
 
 This is a *thin* but fully‑featured adapter — concrete DSP integrations can be
 described declaratively in YAML and re‑use this class without writing code.
@@ -16,18 +28,25 @@ described declaratively in YAML and re‑use this class without writing code.
 
 import asyncio
 import logging
+import time
+from functools import partial
 from types import MappingProxyType
 from typing import Any, Dict, List, Optional, Tuple, Union
-from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
 import aiohttp
 from aiohttp.client_exceptions import ClientError
 
+from pyvast.exceptions import BodyTooLarge, NoFill
 from pyvast.manifest.types import AdapterConfig, AdapterSpec, ParamSetter
-from pyvast.manifest.utils_param import apply_param_setters
-from pyvast.utils.macro import interpolate_macros
-from pyvast.utils.wrapper_resolver import resolve_wrappers
+from pyvast.adapters.request_plan import RequestPlan
+from pyvast.runtime import is_long_lived
+from pyvast.manifest.utils_param import resolve_param_setters
 from pyvast.utils.instrumentation import traced
+from pyvast.utils.macro import MacroIndex, current_macros
+from pyvast.utils.profiling import current_attempt
+from pyvast.utils.response_cache import ResponseCache
+from pyvast.utils.singleflight import SingleFlight
+from pyvast.utils.vast_probe import VastProbe
 
 log = logging.getLogger("pyvast.adapter.http")
 
@@ -46,6 +65,38 @@ class BaseHTTPAdapter:
         self.spec = spec
         self.config = config
         self.setters = setters or []
+        self.plan = RequestPlan(spec)
+        self.flights: Optional[SingleFlight] = None
+        if config.coalesce is not None:
+            self.flights = SingleFlight(config.coalesce.window, timeout=config.timeout)
+        self._wrappers = None  # WrapperResolver (lxml), built on the first wrapper chain
+        self.cache: Optional[ResponseCache] = None
+        if config.cache is not None:
+            self.cache = ResponseCache(
+                ttl=config.cache.ttl,
+                stale_ttl=config.cache.stale_ttl,
+                nofill_ttl=config.cache.nofill_ttl,
+                maxsize=config.cache.maxsize,
+                refresh_timeout=config.timeout,
+            )
+
+    @property
+    def wrappers(self):
+        """The adapter's :class:`~pyvast.utils.wrapper_resolver.WrapperResolver`."""
+        if self._wrappers is None:
+            from pyvast.utils.wrapper_resolver import WrapperCache, WrapperResolver
+
+            config = self.config
+            self._wrappers = WrapperResolver(
+                cache=WrapperCache(config.wrapper_cache_ttl, config.wrapper_cache_size)
+                if config.wrapper_cache_ttl > 0
+                else None,
+                hop_timeout=config.wrapper_timeout or config.timeout,
+                flights=SingleFlight(config.coalesce.window, timeout=config.wrapper_timeout or config.timeout)
+                if config.coalesce is not None and config.coalesce.wrappers
+                else None,
+            )
+        return self._wrappers
 
     # ---------------------------------------------------------------------
     async def fetch(
@@ -59,7 +110,10 @@ class BaseHTTPAdapter:
         Parameters
         ----------
         ctx
-            Mutable context dict propagated by executor (adrequest, device, etc.).
+            Request context dict (adrequest, device, etc.), the executor's
+            per-attempt shallow copy. It is not modified; ParamSetter
+            factories receive a shallow copy of it. Without setters, macros
+            are rendered through the request's :class:`MacroIndex`.
         session
             Shared :class:`aiohttp.ClientSession`; executor is responsible for closing it.
         """
@@ -70,61 +124,120 @@ class BaseHTTPAdapter:
                 timeout=aiohttp.ClientTimeout(total=self.config.timeout or 3.0)
             )
 
-        # 1. copy ctx → apply ParamSetter cascade
+        prof = current_attempt.get()  # set only while profiling
+        if prof is not None:
+            t0 = time.perf_counter()
+
+        # 1. copy ctx → evaluate ParamSetter cascade (query/header overrides)
         work_ctx: Dict[str, Any] = {**ctx}  # shallow copy is fine
-        await apply_param_setters(work_ctx, self.setters)
+        query, hdrs = await resolve_param_setters(work_ctx, self.setters)
+        # the request's macro index, unless setters may have written to work_ctx
+        index = current_macros.get()
+        if index is not None and (self.setters or not index.serves(ctx)):
+            index = None
+        if prof is not None:
+            t1 = time.perf_counter()
+            prof.add("setters", t1 - t0)
+
+        # 2. Build request (URL, headers, body) in one pass
+        url, headers, data = self._build_request(work_ctx, query, hdrs, index)
+        if prof is not None:
+            prof.add("render", time.perf_counter() - t1)
+
+        try:
+            # 3. Perform request (or answer from the response cache)
+            request = partial(self._request, session, url, headers, data)
+            # the shared call runs on the starter's session: only a Runtime's outlives its request
+            flights = self.flights if is_long_lived(session) else None
+            if self.cache is not None or flights is not None:
+                key = self.plan.cache_key(work_ctx, query, hdrs, index)
+                if flights is not None:
+                    request = partial(self._coalesced, key, request)
+            if self.cache is not None:
+                # a stale hit refreshes in the background: only on a Runtime session
+                raw_xml = await self.cache.get_or_fetch(key, request, revalidate=is_long_lived(session))
+            else:
+                raw_xml = await request()
 
-        # 2. Build request (URL, headers, body)
-        url, headers, data = self._build_request(work_ctx)
+            # 4. Wrapper resolution (optional) – still inside the session's life
+            if work_ctx.get("resolve_all"):
+                if prof is not None:
+                    t0, connect0 = time.perf_counter(), prof.stages.get("connect")
+                    parse0 = prof.stages.get("parse", 0.0)
+                raw_xml = await self.wrappers.resolve(
+                    raw_xml,
+                    fetch=lambda u: self._fetch_wrapper(u, session),
+                    ctx=work_ctx,
+                    limit=work_ctx.get("wrapper_limit"),
+                    coalesce=is_long_lived(session),
+                )
+                if prof is not None:  # hop connects are part of "wrappers", XML parsing is not
+                    prof.add("wrappers", time.perf_counter() - t0 - (prof.stages.get("parse", 0.0) - parse0))
+                    if connect0 is None:
+                        prof.stages.pop("connect", None)
+                    else:
+                        prof.stages["connect"] = connect0
+            return raw_xml
+        finally:
+            if owns_session:
+                await session.close()
 
-        # 3. Perform request with OTEL span
+    async def _request(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        headers: Dict[str, str],
+        data: Any,
+    ) -> str:
+        """Perform the upstream call with an OTEL span."""
+        prof = current_attempt.get()
+        if prof is not None:
+            prof.http = True
+            connect0 = prof.stages.get("connect", 0.0)
+            t0 = time.perf_counter()
         try:
             async with traced("vast.http", url=url, method=self.spec.method):
                 async with session.request(
                     self.spec.method, url, headers=headers, data=data
                 ) as resp:
+                    if prof is not None:
+                        t1 = time.perf_counter()
+                        prof.add("ttfb", t1 - t0 - (prof.stages.get("connect", 0.0) - connect0))
                     resp.raise_for_status()
-                    raw_xml = await resp.text()
+                    parse0 = prof.stages.get("parse", 0.0) if prof is not None else 0.0
+                    body = await self._read(resp)
+                    if prof is not None:  # the probe's share is "parse"
+                        prof.add("body", time.perf_counter() - t1 - (prof.stages.get("parse", 0.0) - parse0))
+                    return body
         except ClientError as e:
             log.warning("HTTP error %s → %s", url, e)
             raise
-        finally:
-            if owns_session:
-                await session.close()
 
-        # 4. Wrapper resolution (optional)
-        if work_ctx.get("resolve_all"):
-            raw_xml = await resolve_wrappers(
-                raw_xml,
-                fetch=lambda u: self._fetch_wrapper(u, session),
-                wrapper_limit=work_ctx.get("wrapper_limit", 5),
-            )
-        return raw_xml
+    async def _coalesced(self, key: str, request) -> str:
+        """Share one in-flight upstream call per ``key`` (``AdapterConfig.coalesce``)."""
+        prof = current_attempt.get()
+        if prof is None or not self.flights.running(key):
+            return await self.flights.do(key, request)
+        t0 = time.perf_counter()  # joining: the shared call's stages go to its starter
+        try:
+            return await self.flights.do(key, request)
+        finally:
+            prof.add("coalesced", time.perf_counter() - t0)
 
     # ------------------------------------------------------------------
-    def _build_request(self, ctx: Dict[str, Any]) -> Tuple[str, Dict[str, str], Any]:
-        """Render base_uri + query + headers using macro engine."""
-        # -- URL --------------------------------------------------------
-        base_uri = interpolate_macros(self.spec.base_uri, ctx)
-        parsed = urlparse(base_uri)
-        query: Dict[str, str] = dict(parse_qsl(parsed.query, keep_blank_values=True))
-
-        for key, val in self.spec.query.items():
-            query[key] = interpolate_macros(str(val), ctx)
-
-        url = urlunparse(parsed._replace(query=urlencode(query, doseq=True)))
-
-        # -- headers ----------------------------------------------------
-        hdrs: Dict[str, str] = {
-            k: interpolate_macros(str(v), ctx) for k, v in self.spec.headers.items()
-        }
-
-        # -- body for POST (simple x‑www‑form)
-        data = None
-        if self.spec.method == "POST":
-            data = urlencode(query)
-            url = urlunparse(parsed._replace(query=""))  # move query into body
+    def _build_request(
+        self,
+        ctx: Dict[str, Any],
+        query: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        index: Optional[MacroIndex] = None,
+    ) -> Tuple[str, Dict[str, str], Any]:
+        """Render base_uri + query + headers from the precompiled plan.
 
+        ``query`` / ``headers`` are ParamSetter overrides. For POST the query
+        is moved into an x‑www‑form body.
+        """
+        url, hdrs, data = self.plan.render(ctx, query, headers, index)
         log.debug("HTTP %s %s", self.spec.method, url)
         return url, hdrs, data
 
@@ -134,4 +247,42 @@ class BaseHTTPAdapter:
     ) -> str:  # helper for resolve_wrappers
         async with session.get(url) as r:
             r.raise_for_status()
-            return await r.text()
+            return await self._read(r)
+
+    async def _read(self, resp: aiohttp.ClientResponse) -> str:
+        """Read the body chunk by chunk, capped at ``config.max_body`` decoded bytes.
+
+        The first chunks go through a :class:`VastProbe`: a VAST that closes
+        without an ``<Ad>`` (or an empty body) raises :class:`NoFill` right
+        away, without decoding the rest into a string. Chunks arrive already
+        decompressed when the SSP honours ``Accept-Encoding: gzip, deflate``.
+        """
+        limit = self.config.max_body
+        if limit and not resp.headers.get("Content-Encoding") and (resp.content_length or 0) > limit:
+            raise BodyTooLarge(f"{resp.url}: Content-Length {resp.content_length} > {limit}")
+        probe: Optional[VastProbe] = VastProbe()
+        prof = current_attempt.get()
+        parse = 0.0
+        chunks: List[bytes] = []
+        size = 0
+        try:
+            async for chunk in resp.content.iter_any():
+                size += len(chunk)
+                if limit and size > limit:
+                    raise BodyTooLarge(f"{resp.url}: body over {limit} bytes")
+                chunks.append(chunk)
+                if probe is not None:
+                    t0 = time.perf_counter()
+                    found = probe.feed(chunk)
+                    parse += time.perf_counter() - t0
+                    if found is False:
+                        raise NoFill(f"{resp.url}: VAST without ads")
+                    if found or probe.broken:
+                        probe = None  # decided; stop parsing
+        finally:
+            if prof is not None:
+                prof.add("parse", parse)
+        body = b"".join(chunks)
+        if not body.strip():
+            raise NoFill(f"{resp.url}: empty body")
+        return body.decode(resp.charset or "utf-8", errors="replace")
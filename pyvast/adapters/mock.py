@@ -1,4 +1,7 @@
 
 class MockAdapter:
+    def __init__(self, spec=None, config=None, setters=None):
+        self.spec, self.config, self.setters = spec, config, setters or []
+
     async def fetch(self, ctx, *, session=None):
         return "<VAST version='4.0'><Ad><InLine/></Ad></VAST>"
@@ -1,7 +1,51 @@
-REGISTRY = {}
+"""Adapter classes by name (``AdapterDef.type``).
+
+Names map to classes or to ``"module:Class"`` paths that are imported on
+first use, so a process only pays for the adapters its manifests mention.
+Third‑party adapters are found through the ``pyvast.adapters`` entry point
+group, which is scanned only when a name is not registered::
+
+    [project.entry-points."pyvast.adapters"]
+    openrtb = "my_pkg.adapters:OpenRTBAdapter"
+
+Adapter classes are constructed as ``cls(spec, config, setters)`` and follow
+:class:`~pyvast.adapters.types.VastAdapter`; note that ``fetch`` gets a
+shallow per‑attempt copy of the request ``dict``, whose nested values are
+shared.
+"""
+
+import importlib
+from typing import Dict, Union
+
+__all__ = ['ENTRY_POINT_GROUP', 'get_adapter', 'register_adapter']
+
+ENTRY_POINT_GROUP = 'pyvast.adapters'
+
+REGISTRY: Dict[str, Union[type, str]] = {
+    'http': 'pyvast.adapters.base_http:BaseHTTPAdapter',
+    'mock': 'pyvast.adapters.mock:MockAdapter',
+}
+_scanned = False
 
 def register_adapter(name, cls):
+    """Register a class, or a ``"module:Class"`` path imported lazily."""
     REGISTRY[name] = cls
 
+def _scan_entry_points():
+    global _scanned
+    _scanned = True
+    from importlib.metadata import entry_points  # slow import, only on a miss
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        REGISTRY.setdefault(ep.name, ep.value)
+
 def get_adapter(name):
-    return REGISTRY[name]
+    cls = REGISTRY.get(name)
+    if cls is None and not _scanned:
+        _scan_entry_points()
+        cls = REGISTRY.get(name)
+    if cls is None:
+        raise KeyError(f'unknown adapter type {name!r}; registered: {sorted(REGISTRY)}')
+    if isinstance(cls, str):
+        mod, _, attr = cls.partition(':')
+        cls = REGISTRY[name] = getattr(importlib.import_module(mod), attr)
+    return cls
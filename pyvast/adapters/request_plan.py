@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+"""Precompiled request plans for :class:`BaseHTTPAdapter`.
+
+An :class:`AdapterSpec` is mostly static: the host, most query pairs and many
+headers never change between requests. :class:`RequestPlan` splits the spec
+once into pre‑encoded static pieces and compiled macro slots, so rendering a
+request only evaluates the dynamic slots (``${device.ip}``, ``[CACHE_BUST]`` …)
+and joins strings — no ``urlparse`` / ``parse_qsl`` / ``urlencode`` per call.
+
+Specs whose query string or fragment in ``base_uri`` contain macros (or whose
+rendered path smuggles in ``?``/``#``) fall back to the generic slow path,
+which produces exactly what the adapter used to build.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, quote_plus, urlencode, urlparse, urlunparse
+
+from pyvast.manifest.types import AdapterSpec
+from pyvast.utils.macro import MacroIndex, Template, compile_template
+
+__all__ = ["RequestPlan"]
+
+# static piece (already rendered / encoded) or compiled template
+Piece = Union[str, Template]
+
+
+class RequestPlan:
+    """Compiled form of one :class:`AdapterSpec`."""
+
+    __slots__ = (
+        "spec",
+        "method",
+        "prefix",
+        "fragment",
+        "query",
+        "headers",
+        "fast",
+    )
+
+    def __init__(self, spec: AdapterSpec):
+        self.spec = spec
+        self.method = spec.method
+        self.headers: List[Tuple[str, Piece]] = [
+            (k, _piece(str(v))) for k, v in spec.headers.items()
+        ]
+
+        head, _, fragment = spec.base_uri.partition("#")
+        prefix, _, raw_query = head.partition("?")
+        self.prefix = compile_template(prefix)
+        self.fragment = "#" + fragment if fragment else ""
+        # (key, encoded "k=" or "k=v", piece)
+        self.query: List[Tuple[str, str, Piece]] = []
+        self.fast = (
+            compile_template(raw_query).is_static
+            and compile_template(fragment).is_static
+            and urlunparse(urlparse(prefix)) == prefix
+        )
+        if not self.fast:
+            return
+
+        # same merge order as dict(parse_qsl(base)) updated with spec.query
+        merged: Dict[str, Piece] = dict(parse_qsl(raw_query, keep_blank_values=True))
+        for key, val in spec.query.items():
+            merged[key] = _piece(str(val))
+        for key, val in merged.items():
+            self.query.append((key, *_encode(key, val)))
+
+    # ------------------------------------------------------------------
+    def render(
+        self,
+        ctx: Dict[str, Any],
+        query: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        index: Optional[MacroIndex] = None,
+    ) -> Tuple[str, Dict[str, str], Optional[str]]:
+        """Return ``(url, headers, data)`` for ``ctx``.
+
+        ``query`` / ``headers`` are ParamSetter results; they override spec
+        values (new query keys are appended) in the same single pass.
+        ``index`` is the request's :class:`MacroIndex`, if it serves ``ctx``.
+        """
+        return self._render(ctx, query, headers, Template.render, index)
+
+    def cache_key(
+        self,
+        ctx: Dict[str, Any],
+        query: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        index: Optional[MacroIndex] = None,
+    ) -> str:
+        """Stable key of the rendered request with volatile macros
+        (``[CACHE_BUST]``, ``UUID`` …) left unrendered."""
+        url, hdrs, data = self._render(ctx, query, headers, Template.render_key, index)
+        return "\n".join([self.method, url, repr(sorted(hdrs.items())), data or ""])
+
+    def _render(self, ctx, query, headers, render, index=None) -> Tuple[str, Dict[str, str], Optional[str]]:
+        hdrs = {k: v if isinstance(v, str) else render(v, ctx, index) for k, v in self.headers}
+        if headers:
+            hdrs.update(headers)
+        if self.fast:
+            prefix = render(self.prefix, ctx, index)
+            if "?" not in prefix and "#" not in prefix:
+                slots = self.query
+                if query:
+                    extra = dict(query)
+                    slots = [
+                        (slot[0], *_encode(slot[0], extra.pop(slot[0])))
+                        if slot[0] in extra
+                        else slot
+                        for slot in slots
+                    ]
+                    slots += [(k, *_encode(k, v)) for k, v in extra.items()]
+                qs = "&".join(
+                    [
+                        enc if isinstance(v, str) else enc + quote_plus(render(v, ctx, index), safe="")
+                        for _, enc, v in slots
+                    ]
+                )
+                if self.method == "POST":
+                    return prefix + self.fragment, hdrs, qs
+                return (prefix + "?" + qs if qs else prefix) + self.fragment, hdrs, None
+        url, data = self._render_slow(ctx, query, render, index)
+        return url, hdrs, data
+
+    def _render_slow(
+        self,
+        ctx: Dict[str, Any],
+        overrides: Optional[Dict[str, str]] = None,
+        render=Template.render,
+        index: Optional[MacroIndex] = None,
+    ) -> Tuple[str, Optional[str]]:
+        """Generic path: render base_uri, then parse and re‑encode the query."""
+        base_uri = render(compile_template(self.spec.base_uri), ctx, index)
+        parsed = urlparse(base_uri)
+        query: Dict[str, str] = dict(parse_qsl(parsed.query, keep_blank_values=True))
+        for key, val in self.spec.query.items():
+            query[key] = render(compile_template(str(val)), ctx, index)
+        if overrides:
+            query.update(overrides)
+
+        if self.method == "POST":
+            return urlunparse(parsed._replace(query="")), urlencode(query)
+        return urlunparse(parsed._replace(query=urlencode(query, doseq=True))), None
+
+
+def _piece(text: str) -> Piece:
+    tpl = compile_template(text)
+    return tpl.source if tpl.is_static else tpl
+
+
+def _encode(key: str, val: Piece) -> Tuple[str, Piece]:
+    name = quote_plus(key, safe="") + "="
+    if isinstance(val, str):
+        return name + quote_plus(val, safe=""), val
+    return name, val
@@ -1,3 +1,12 @@
 from typing import Protocol, Any, Optional
 class VastAdapter(Protocol):
+    """What :class:`~pyvast.manifest.executor.ManifestExecutor` calls.
+
+    ``ctx`` is a plain ``dict``, a shallow copy made for this attempt:
+    top‑level writes stay with it, but nested values (``ctx['device']`` …)
+    are shared by every endpoint of the request and must not be mutated.
+    While unchanged it is also served by the request's
+    :class:`~pyvast.utils.macro.MacroIndex`; after changing a top‑level key
+    in place, hand other adapters a new dict (``{**ctx, ...}``).
+    """
     async def fetch(self, ctx: Any, *, session: Optional[Any]=None) -> str: ...
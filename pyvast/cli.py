@@ -1,14 +1,17 @@
 from __future__ import annotations
-import asyncio, pathlib, yaml, typer, rich_click as click
-from rich.table import Table
-from rich import print as rprint
-from pyvast.manifest.loader import ManifestLoader
-from pyvast.adapters.base_http import BaseHTTPAdapter
+# Heavy modules (pydantic, aiohttp, lxml, OpenTelemetry, rich) are imported
+# inside the commands that need them: short-lived invocations in deploy hooks
+# only pay for what they use (see benchmarks/bench_cli_startup.py).
+import pathlib, typer
+from typing import Optional
 app = typer.Typer(help="PyVAST CLI", rich_help_panel="root")
 # manifest ----------------------------------------------------
 man = typer.Typer(help="Validate & inspect manifests"); app.add_typer(man, name="manifest")
 @man.command("inspect")
 def inspect(path: pathlib.Path):
+    from rich import print as rprint
+    from rich.table import Table
+    from pyvast.manifest.loader import ManifestLoader
     m = ManifestLoader(path).model
     tbl = Table(title=f"[bold magenta]{m.id}", box=None)
     tbl.add_column("Group / Endpoint", style="bold green"); tbl.add_column("Adapter")
@@ -18,6 +21,14 @@ def inspect(path: pathlib.Path):
             ep = next(e for e in m.endpoints if e.id == eid)
             tbl.add_row(f" └─ {ep.id}", ep.adapter_id)
     rprint(tbl)
+@man.command("compile")
+def compile_(path: pathlib.Path,
+             cache_dir: pathlib.Path = typer.Option(..., "--cache-dir", envvar="PYVAST_MANIFEST_CACHE")):
+    """Validate PATH and store the compiled artifact in the manifest cache."""
+    from rich import print as rprint
+    from pyvast.manifest.loader import ManifestLoader
+    ld = ManifestLoader(path, cache_dir=cache_dir)
+    rprint({"manifest": ld.model.id, "artifact": str(cache_dir / f"{ld.digest}.json"), "cached": ld.from_cache})
 # adapter -----------------------------------------------------
 ad = typer.Typer(help="Adapter playground"); app.add_typer(ad, name="adapter")
 @ad.command("test")
@@ -25,14 +36,18 @@ def adapter_test(adapter_id: str,
                  manifest: pathlib.Path = typer.Option(..., exists=True),
                  ctx_file: pathlib.Path = typer.Option(..., "--ctx-file", "--ctx", exists=True),
                  url_only: bool = typer.Option(False, "--url-only", "-u")):
-    import aiohttp
+    import asyncio, aiohttp, yaml
+    from rich import print as rprint
+    from pyvast.adapters.base_http import BaseHTTPAdapter
+    from pyvast.manifest.loader import ManifestLoader
     ctx = yaml.safe_load(ctx_file.read_text())
     mdl = ManifestLoader(manifest).model
     ep  = next(e for e in mdl.endpoints if e.adapter_id == adapter_id)
     spec, cfg = mdl.adapters[adapter_id].spec, mdl.adapters[adapter_id].config
     a = BaseHTTPAdapter(spec, cfg, ep.set_params)
     ctx.setdefault("url", spec.base_uri)
-    url, hdrs, _ = a._build_request(ctx)
+    from pyvast.manifest.utils_param import resolve_param_setters
+    url, hdrs, _ = a._build_request(ctx, *asyncio.run(resolve_param_setters(ctx, ep.set_params)))
     rprint({"url": url, "headers": hdrs})
     if url_only: raise typer.Exit()
     async def _go():
@@ -40,4 +55,98 @@ def adapter_test(adapter_id: str,
             async with s.get(url, headers=hdrs, timeout=cfg.timeout) as r:
                 rprint({"status": r.status, "body": (await r.text())[:512]})
     asyncio.run(_go())
+# load --------------------------------------------------------
+@app.command("load")
+def load(manifest: pathlib.Path = typer.Argument(..., exists=True),
+         ctx_file: pathlib.Path = typer.Option(..., "--ctx", exists=True, help="JSON / JSONL context corpus"),
+         rps: Optional[float] = typer.Option(None, "--rps", help="target request rate (open loop)"),
+         concurrency: Optional[int] = typer.Option(None, "--concurrency", "-c", help="workers (closed loop)"),
+         duration: float = typer.Option(10.0, "--duration", "-d"),
+         deadline: Optional[float] = typer.Option(None, "--deadline", help="per-request budget, seconds"),
+         as_json: bool = typer.Option(False, "--json")):
+    """Run a manifest at a target RPS or concurrency and report latency / fill / loop lag."""
+    import asyncio, json
+    from rich import print as rprint
+    from rich.table import Table
+    from pyvast.loadgen import load_corpus, run_load
+    from pyvast.manifest.executor import ManifestExecutor
+    from pyvast.manifest.loader import ManifestLoader
+    if (rps is None) == (concurrency is None):
+        raise typer.BadParameter("pass exactly one of --rps / --concurrency")
+    corpus = load_corpus(ctx_file)
+    async def _go():
+        async with ManifestExecutor(ManifestLoader(manifest).model) as ex:
+            return await run_load(ex, corpus, rps=rps, concurrency=concurrency,
+                                  duration=duration, deadline=deadline)
+    report = asyncio.run(_go())
+    s = report.summary()
+    if as_json:
+        print(json.dumps(s, indent=2)); raise typer.Exit()
+    rprint({k: v for k, v in s.items() if k != "endpoints"})
+    hist = Table(title="latency", box=None); hist.add_column("≤ ms", justify="right"); hist.add_column("count", justify="right"); hist.add_column("")
+    peak = max((c for _, c in report.histogram()), default=0) or 1
+    for b, c in report.histogram():
+        if c: hist.add_row("inf" if b == float("inf") else str(b), str(c), "█" * max(1, round(30 * c / peak)))
+    rprint(hist)
+    eps = Table(title="endpoints", box=None)
+    for col in ("endpoint", "attempts", "fill", "nofill", "timeout", "error", "fill_rate", "p95_ms"): eps.add_column(col)
+    for eid, e in s["endpoints"].items():
+        eps.add_row(eid, *(str(e[c]) for c in ("attempts", "fill", "nofill", "timeout", "error", "fill_rate", "p95_ms")))
+    rprint(eps)
+# replay ------------------------------------------------------
+@app.command("replay")
+def replay(manifest: pathlib.Path = typer.Argument(..., exists=True),
+           input_: pathlib.Path = typer.Option(..., "--input", "-i", exists=True, help="JSONL context log"),
+           output: str = typer.Option("-", "--output", "-o", help="JSONL results ('-' → stdout)"),
+           concurrency: int = typer.Option(64, "--concurrency", "-c"),
+           deadline: Optional[float] = typer.Option(None, "--deadline", help="per-request budget, seconds"),
+           id_field: str = typer.Option("request_id", "--id-field", help="context key copied to each result"),
+           with_xml: bool = typer.Option(True, "--xml/--no-xml"),
+           profile: bool = typer.Option(False, "--profile", help="include per-stage timings")):
+    """Stream a JSONL context log through the manifest; results as JSONL, in completion order."""
+    import asyncio, json, sys
+    from pyvast.manifest.executor import ManifestExecutor
+    from pyvast.manifest.loader import ManifestLoader
+    def contexts():
+        with input_.open() as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    async def _go(out):
+        n = 0
+        async with ManifestExecutor(ManifestLoader(manifest).model) as ex:
+            async for r in ex.execute_many(contexts(), concurrency=concurrency, deadline=deadline, profile=profile):
+                rec = {"index": r.index, "id": r.ctx.get(id_field), "outcome": r.outcome,
+                       "elapsed_ms": round(r.elapsed * 1e3, 3)}
+                if r.error: rec["error"] = r.error
+                if with_xml and r.xml is not None: rec["xml"] = r.xml
+                if r.profile is not None: rec["profile"] = r.profile.as_dict()
+                out.write(json.dumps(rec, ensure_ascii=False) + "\n"); n += 1
+        return n
+    if output == "-":
+        n = asyncio.run(_go(sys.stdout))
+    else:
+        with open(output, "w") as out:
+            n = asyncio.run(_go(out))
+    print(f"{n} contexts replayed", file=sys.stderr)
+# serve -------------------------------------------------------
+@app.command("serve")
+def serve(manifest: pathlib.Path = typer.Argument(..., exists=True, help="manifest file, or a directory of <tenant>.yml"),
+          host: str = typer.Option("0.0.0.0", "--host"),
+          port: int = typer.Option(8080, "--port", "-p"),
+          workers: int = typer.Option(1, "--workers", "-w", help="processes sharing the port (SO_REUSEPORT)"),
+          deadline: Optional[float] = typer.Option(None, "--deadline", help="default per-request budget, seconds"),
+          drain_timeout: float = typer.Option(10.0, "--drain-timeout", help="seconds to finish in-flight requests on shutdown"),
+          drain_grace: float = typer.Option(2.0, "--drain-grace", help="seconds /healthz answers 503 before the listener closes"),
+          reload_interval: float = typer.Option(2.0, "--reload-interval", help="manifest file poll, 0 → off"),
+          cache_dir: Optional[pathlib.Path] = typer.Option(None, "--cache-dir", envvar="PYVAST_MANIFEST_CACHE")):
+    """Serve ad decisions over HTTP: GET|POST /vast (or /vast/{tenant} for a directory)."""
+    import logging
+    from pyvast.server import ServeConfig, serve as run_server
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(process)d %(name)s %(message)s")
+    code = run_server(ServeConfig(manifest=manifest, host=host, port=port, workers=workers, deadline=deadline,
+                                  drain_timeout=drain_timeout, drain_grace=drain_grace,
+                                  reload_interval=reload_interval, cache_dir=cache_dir))
+    if code:
+        raise typer.Exit(code)
 if __name__ == "__main__": app()
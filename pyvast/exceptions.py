@@ -0,0 +1,11 @@
+"""Exceptions shared by the executor and adapters."""
+
+__all__ = ["BodyTooLarge", "NoFill"]
+
+
+class NoFill(RuntimeError):
+    """No endpoint (or group) returned an ad for the request."""
+
+
+class BodyTooLarge(ValueError):
+    """An upstream response exceeded ``AdapterConfig.max_body``."""
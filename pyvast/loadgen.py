@@ -0,0 +1,191 @@
+"""Load generation against a :class:`ManifestExecutor` (``pyvast load``).
+
+Two modes:
+
+* ``concurrency=N`` – closed loop: N workers each issue the next request as
+  soon as the previous one finished.
+* ``rps=R`` – requests are started on a fixed schedule regardless of how fast
+  answers come back; at most ``max_inflight`` run at once, beyond that a
+  scheduled request is counted as *shed* instead of piling up.
+
+Contexts are taken round‑robin from a corpus (JSON object, JSON list or JSONL).
+Alongside request latency the run samples event‑loop lag (how late a periodic
+timer fires), which shows when one worker process is CPU‑saturated.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+__all__ = ["LoadReport", "LoopLagMonitor", "load_corpus", "percentile", "run_load"]
+
+
+def load_corpus(path: Path) -> List[Dict[str, Any]]:
+    """Request contexts from a ``.json`` (object or list) or ``.jsonl`` file."""
+    text = Path(path).read_text()
+    if Path(path).suffix == ".jsonl":
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    data = json.loads(text)
+    return data if isinstance(data, list) else [data]
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q / 100 * len(sorted_values)))]
+
+
+class LoopLagMonitor:
+    """Samples how late a ``interval``‑second timer wakes up."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            t0 = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - t0 - self.interval))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+_ATTEMPT_OUTCOMES = ("fill", "nofill", "timeout", "error")
+
+# latency histogram bucket upper bounds, ms
+BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf"))
+
+
+@dataclass
+class LoadReport:
+    elapsed: float = 0.0
+    latencies: List[float] = field(default_factory=list)  # seconds, completed requests
+    outcomes: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(("fill", "nofill", "error"), 0))
+    shed: int = 0
+    loop_lag: List[float] = field(default_factory=list)
+    endpoints: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @property
+    def requests(self) -> int:
+        return sum(self.outcomes.values())
+
+    def histogram(self) -> List[tuple]:
+        """``[(upper_bound_ms, count), …]`` over completed requests."""
+        counts = [0] * len(BUCKETS)
+        for s in self.latencies:
+            ms = s * 1e3
+            counts[next(i for i, b in enumerate(BUCKETS) if ms <= b)] += 1
+        return list(zip(BUCKETS, counts))
+
+    def summary(self) -> Dict[str, Any]:
+        lat = sorted(self.latencies)
+        lag = sorted(self.loop_lag)
+        ms = lambda v: None if v is None else round(v * 1e3, 3)  # noqa: E731
+        return {
+            "elapsed_s": round(self.elapsed, 3),
+            "requests": self.requests,
+            "rps": round(self.requests / self.elapsed, 1) if self.elapsed else 0.0,
+            "shed": self.shed,
+            **self.outcomes,
+            "fill_rate": round(self.outcomes["fill"] / self.requests, 4) if self.requests else 0.0,
+            "latency_ms": {f"p{q}": ms(percentile(lat, q)) for q in (50, 95, 99)} | {"max": ms(lat[-1] if lat else None)},
+            "loop_lag_ms": {"p50": ms(percentile(lag, 50)), "p99": ms(percentile(lag, 99)),
+                            "max": ms(lag[-1] if lag else None)},
+            "endpoints": self.endpoints,
+        }
+
+
+async def run_load(executor, corpus: List[Dict[str, Any]], *, rps: Optional[float] = None,
+                   concurrency: Optional[int] = None, duration: float = 10.0,
+                   deadline: Optional[float] = None, max_inflight: int = 10_000) -> LoadReport:
+    """Drive the executor for ``duration`` seconds; exactly one of ``rps`` / ``concurrency``.
+
+    Requests go through ``execute_profiled`` so per‑endpoint counts and
+    latency percentiles come from this run's own attempts.
+    """
+    if (rps is None) == (concurrency is None):
+        raise ValueError("pass exactly one of rps= or concurrency=")
+    if not corpus:
+        raise ValueError("empty context corpus")
+    report = LoadReport()
+    contexts: Iterator[Dict[str, Any]] = itertools.cycle(corpus)
+    # per endpoint: outcome → count, and the latency of every finished attempt
+    counts = {eid: dict.fromkeys(_ATTEMPT_OUTCOMES, 0) for eid in executor.health}
+    attempts: Dict[str, List[float]] = {eid: [] for eid in executor.health}
+
+    async def one() -> None:
+        t0 = time.perf_counter()
+        try:
+            prof = await executor.execute_profiled(next(contexts), deadline=deadline)
+            outcome = prof.outcome
+            for a in prof.attempts:
+                if a.outcome in _ATTEMPT_OUTCOMES:  # not skipped / cancelled / past the deadline
+                    counts[a.endpoint][a.outcome] += 1
+                    attempts[a.endpoint].append(a.total)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            outcome = "error"
+        report.latencies.append(time.perf_counter() - t0)
+        report.outcomes[outcome] += 1
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    start = time.perf_counter()
+    end = start + duration
+    try:
+        if concurrency is not None:
+            async def worker():
+                while time.perf_counter() < end:
+                    await one()
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        else:
+            inflight: set = set()
+            period, n = 1.0 / rps, 0
+            while True:
+                due = start + n * period
+                if due >= end:
+                    break
+                # sleep(0) when behind schedule still lets running requests progress
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                n += 1
+                if len(inflight) >= max_inflight:
+                    report.shed += 1
+                    continue
+                t = asyncio.create_task(one())
+                inflight.add(t)
+                t.add_done_callback(inflight.discard)
+            if inflight:
+                await asyncio.gather(*inflight)
+    finally:
+        report.elapsed = time.perf_counter() - start
+        await monitor.stop()
+        report.loop_lag = monitor.lags
+
+    for eid, c in counts.items():
+        total = sum(c.values())
+        p95 = percentile(sorted(attempts[eid]), 95)
+        report.endpoints[eid] = {
+            "attempts": total,
+            **c,
+            "fill_rate": round(c["fill"] / total, 4) if total else 0.0,
+            "p95_ms": None if p95 is None else round(p95 * 1e3, 3),
+        }
+    return report
@@ -1,33 +1,430 @@
 
-import asyncio, aiohttp
-from typing import Dict, Any
-from .types import ManifestModel
+import asyncio, aiohttp, itertools, logging, time
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Optional, Union
+from .types import GroupDef, HedgeConfig, ManifestModel
 from ..adapters.registry import get_adapter
-from .utils_param import apply_param_setters
-from ..adapters.base_http import BaseHTTPAdapter
-from ..utils.macro import interpolate_macros
+from ..exceptions import NoFill
+from ..runtime import Runtime, origin_of
+from ..utils.deadline import Deadline, current_deadline
+from ..utils.health import CircuitBreaker, EndpointHealth
+from ..utils.instrumentation import metrics
+from ..utils.profiling import AttemptProfile, ExecuteProfile, current_attempt, current_profile
+from ..utils.macro import MacroIndex, current_macros, interpolate_macros
+
+log = logging.getLogger('pyvast.executor')
+
+_DONE = object()  # end of execute_many's input (None is a context, if a bad one)
+
+class HedgeBudget:
+    """Token bucket capping hedges to ``max_rate`` per group execution."""
+
+    __slots__ = ('rate', 'burst', 'tokens')
+
+    def __init__(self, cfg: HedgeConfig):
+        self.rate, self.burst = cfg.max_rate, max(1.0, cfg.burst)
+        self.tokens = 1.0
+
+    def earn(self) -> None:
+        self.tokens = min(self.burst, self.tokens + self.rate)
+
+    def take(self) -> bool:
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+@dataclass(slots=True)
+class ExecuteResult:
+    """One finished context from :meth:`ManifestExecutor.execute_many`."""
+    index: int                      # position in the input
+    ctx: Dict[str, Any]
+    outcome: str                    # fill | nofill | error
+    xml: Optional[str] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    profile: Optional[ExecuteProfile] = None
 
 class ManifestExecutor:
-    def __init__(self, model: ManifestModel):
+    """Runs a manifest against a request context.
+
+    Use it as an async context manager to keep one pooled :class:`Runtime`
+    (connector, DNS cache, warm connections) across requests; pass
+    ``runtime=`` to share a runtime between several executors.
+    """
+
+    def __init__(self, model: ManifestModel, *, runtime: Optional[Runtime] = None,
+                 adapter_pool=None):
         self.model = model
+        self.runtime = runtime
+        self._owns_runtime = False
         self.endpoints = {e.id: e for e in model.endpoints}
+        if adapter_pool is not None:  # shared across tenants, see ManifestRegistry
+            self.adapters = {e.id: adapter_pool.get(model.adapters[e.adapter_id], e.set_params)
+                             for e in model.endpoints}
+        else:
+            self.adapters = {
+                e.id: get_adapter(model.adapters[e.adapter_id].type)(
+                    model.adapters[e.adapter_id].spec,
+                    model.adapters[e.adapter_id].config,
+                    e.set_params,
+                )
+                for e in model.endpoints
+            }
+        self.groups = sorted(model.groups, key=lambda g: g.priority)
+        self.health = {e.id: EndpointHealth(e.breaker.window) for e in model.endpoints}
+        self.breakers = {e.id: CircuitBreaker(e.breaker, self.health[e.id]) for e in model.endpoints}
+        self.hedge_budgets = {g.id: HedgeBudget(g.hedge) for g in model.groups if g.hedge}
+        # endpoint → origin kept warm by the runtime (AdapterConfig.warm)
+        self.warm_origins = {e.id: o for e in model.endpoints
+                             if model.adapters[e.adapter_id].config.warm
+                             and (o := origin_of(model.adapters[e.adapter_id].spec.base_uri))}
+
+    async def __aenter__(self):
+        if self.runtime is None:
+            self.runtime, self._owns_runtime = Runtime(), True
+        await self.runtime.start()
+        await self.runtime.warm(a.spec.base_uri for a in self.model.adapters.values() if a.config.warm)
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._owns_runtime:
+            await self.runtime.close()
+            self.runtime, self._owns_runtime = None, False
+
+    async def execute(self, ctx: Dict[str,Any], *, session=None, deadline: Optional[float] = None):
+        """Walk groups by priority and return the first filled VAST.
+
+        Waterfall groups try endpoints one after another; parallel groups fan
+        out to every endpoint at once (see :meth:`_run_parallel`). Without an
+        explicit ``session`` the runtime's pooled session is used; a throwaway
+        one is opened only when no runtime is started. Sessions we did not
+        create are left open.
 
-    async def execute(self, ctx: Dict[str,Any], *, session=None):
-        if session is None:
+        ``deadline`` is the total budget in seconds for the whole call: every
+        attempt's timeout is capped by the time left, and once it runs out the
+        remaining groups are skipped and :class:`NoFill` is raised.
+        """
+        if session is None and self.runtime is not None and self.runtime.started:
+            session = self.runtime.session
+        owns_session = session is None
+        if owns_session:
             session = aiohttp.ClientSession()
-        for group in sorted(self.model.groups, key=lambda g: g.priority):
-            for eid in group.endpoints:
-                ep = self.endpoints[eid]
-                spec = self.model.adapters[ep.adapter_id].spec
-                cfg  = self.model.adapters[ep.adapter_id].config
-                adapter = BaseHTTPAdapter(spec=spec, config=cfg, setters=ep.set_params)
-                local_ctx = dict(ctx); local_ctx['url']=spec.base_uri
-                await apply_param_setters(local_ctx, ep.set_params)
+        token = current_deadline.set(Deadline(deadline))
+        macros = current_macros.set(MacroIndex(ctx))  # macro keys resolved once for all endpoints
+        metrics.executing(1)
+        try:
+            for group in self.groups:
+                if current_deadline.get().expired:
+                    break
+                run = self._run_parallel if group.mode == 'parallel' else self._run_waterfall
                 try:
-                    xml = await adapter.fetch(local_ctx, session=session)
-                    await session.close()
+                    xml = await run(group, ctx, session)
+                    prof = current_profile.get()
+                    if prof is not None:
+                        prof.group = group.id
                     return xml
-                except Exception:
+                except NoFill:
+                    continue
+            raise NoFill(self.model.id)
+        finally:
+            metrics.executing(-1)
+            current_macros.reset(macros)
+            current_deadline.reset(token)
+            if owns_session:
+                await session.close()
+
+    async def execute_profiled(self, ctx: Dict[str,Any], *, session=None,
+                               deadline: Optional[float] = None) -> ExecuteProfile:
+        """:meth:`execute` with a per-stage timing breakdown of every attempt.
+
+        Returns an :class:`~pyvast.utils.profiling.ExecuteProfile` (``xml``,
+        ``outcome`` fill/nofill, ``attempts`` with their own outcome and
+        stages) instead of raising :class:`NoFill`. Cheap enough to sample a
+        fraction of production traffic through it.
+        """
+        prof = ExecuteProfile()
+        token = current_profile.set(prof)
+        t0 = time.perf_counter()
+        try:
+            prof.xml = await self.execute(ctx, session=session, deadline=deadline)
+            prof.outcome = 'fill'
+        except NoFill:
+            prof.outcome = 'nofill'
+        finally:
+            prof.total = time.perf_counter() - t0
+            current_profile.reset(token)
+        return prof
+
+    async def execute_many(self, contexts: Union[Iterable[Dict[str,Any]], AsyncIterable[Dict[str,Any]]], *,
+                           concurrency: int = 64, deadline: Optional[float] = None,
+                           profile: bool = False) -> AsyncIterator[ExecuteResult]:
+        """Run many contexts, yielding one :class:`ExecuteResult` each, in completion order.
+
+        At most ``concurrency`` requests are in flight and the input is pulled
+        only as slots free up, so memory stays flat for arbitrarily long
+        (sync or async) iterables. All requests share one pooled session: the
+        runtime's, or one opened for the whole batch. Closing the generator
+        early cancels what is still running.
+        """
+        session = self.runtime.session if self.runtime is not None and self.runtime.started else None
+        owns_session = session is None
+        if owns_session:
+            session = aiohttp.ClientSession()
+        if isinstance(contexts, AsyncIterable):
+            source = contexts.__aiter__()
+            async def pull():
+                return await anext(source, _DONE)
+        else:
+            source = iter(contexts)
+            async def pull():
+                return next(source, _DONE)
+
+        async def one(i, ctx):
+            t0 = time.perf_counter()
+            res = ExecuteResult(i, ctx, 'fill')
+            try:
+                if profile:
+                    res.profile = await self.execute_profiled(ctx, session=session, deadline=deadline)
+                    res.outcome, res.xml = res.profile.outcome, res.profile.xml
+                else:
+                    res.xml = await self.execute(ctx, session=session, deadline=deadline)
+            except NoFill:
+                res.outcome = 'nofill'
+            except Exception as e:
+                res.outcome, res.error = 'error', repr(e)
+            res.elapsed = time.perf_counter() - t0
+            return res
+
+        running = set()
+        counter = itertools.count()
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(running) < concurrency:
+                    ctx = await pull()
+                    if ctx is _DONE:
+                        exhausted = True
+                    else:
+                        running.add(asyncio.create_task(one(next(counter), ctx)))
+                if not running:
+                    return
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    yield t.result()
+        finally:
+            for t in running:
+                t.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+            if owns_session:
+                await session.close()
+
+    async def _attempt(self, eid: str, ctx: Dict[str,Any], session) -> str:
+        eprof = current_profile.get()
+        if eprof is None:
+            return await self._attempt_inner(eid, ctx, session)
+        prof = AttemptProfile(eid, outcome='skipped')
+        eprof.attempts.append(prof)
+        token = current_attempt.set(prof)
+        t0 = time.perf_counter()
+        try:
+            return await self._attempt_inner(eid, ctx, session, prof)
+        finally:
+            prof.total, prof.closed = time.perf_counter() - t0, True
+            current_attempt.reset(token)
+
+    async def _attempt_inner(self, eid: str, ctx: Dict[str,Any], session, prof=None) -> str:
+        ep = self.endpoints[eid]
+        adapter = self.adapters[eid]
+        own = self.model.adapters[ep.adapter_id].config.timeout
+        timeout = current_deadline.get().cap(own)
+        if timeout is not None and timeout <= 0:
+            raise NoFill(eid)
+        # the request budget, not the endpoint, is the limit: expiry isn't the SSP's fault
+        capped = timeout is not None and (own is None or timeout < own)
+        breaker = self.breakers[eid]
+        admission = breaker.allow()
+        if admission is None:
+            raise NoFill(f'{eid}: circuit open')
+        outcome = abandoned = None
+        t0 = time.perf_counter()
+        try:
+            async with asyncio.timeout(timeout):
+                # ParamSetters are applied by the adapter while building the request
+                xml = await adapter.fetch(self._attempt_ctx(ctx), session=session)
+            outcome = 'fill'
+            return xml
+        except NoFill:
+            outcome = 'nofill'
+            raise
+        except TimeoutError:
+            if capped:
+                abandoned = 'deadline'
+            else:
+                outcome = 'timeout'
+            raise
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            outcome = 'error'
+            log.info('endpoint %s failed: %r', eid, e)
+            raise
+        finally:
+            latency = time.perf_counter() - t0
+            breaker.record(latency, outcome, admission)  # None (cancelled, deadline) → not held against it
+            origin = self.warm_origins.get(eid)
+            if origin is not None and self.runtime is not None:
+                self.runtime.touch(origin)
+            if prof is not None:
+                prof.outcome = outcome or abandoned or 'cancelled'
+            if outcome is not None:
+                metrics.attempt(eid, latency, outcome)
+
+    @staticmethod
+    def _attempt_ctx(ctx: Dict[str,Any]) -> Dict[str,Any]:
+        """The attempt's own shallow copy of ``ctx``, known to the request's macro index."""
+        index = current_macros.get()
+        return index.copy() if index is not None and index.base is ctx else dict(ctx)
+
+    async def _run_waterfall(self, group: GroupDef, ctx, session) -> str:
+        if group.hedge is not None:
+            return await self._run_hedged(group, ctx, session)
+        for eid in group.endpoints:
+            if current_deadline.get().expired:
+                break
+            try:
+                return await self._attempt(eid, ctx, session)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                continue  # outcome already recorded by _attempt
+        raise NoFill(group.id)
+
+    def _hedge_delay(self, cfg: HedgeConfig, eid: str) -> Optional[float]:
+        health = self.health[eid]
+        if cfg.percentile is not None and len(health.samples) >= cfg.min_samples:
+            return health.percentile_cached(cfg.percentile)
+        return cfg.delay
+
+    async def _run_hedged(self, group: GroupDef, ctx, session) -> str:
+        """Waterfall with speculative hedging.
+
+        When the newest attempt has not answered within its hedge delay (fixed,
+        or the endpoint's own latency percentile), the next endpoint is started
+        alongside it and the first fill wins; the rest are cancelled. A failure
+        starts the next endpoint right away, as in a plain waterfall, even while
+        earlier attempts are still running; that costs no hedge token. Hedges
+        are rate‑limited by :class:`HedgeBudget`.
+        """
+        budget = self.hedge_budgets[group.id]
+        budget.earn()
+        deadline = current_deadline.get()
+        eids, nxt = group.endpoints, 0
+        running: Dict[asyncio.Task, str] = {}
+
+        def launch():
+            nonlocal nxt
+            eid = eids[nxt]; nxt += 1
+            running[asyncio.create_task(self._attempt(eid, ctx, session))] = eid
+            return eid, time.perf_counter(), True
+
+        last, started, armed = launch()
+        try:
+            while running:
+                wait = None
+                if armed and nxt < len(eids):
+                    delay = self._hedge_delay(group.hedge, last)
+                    if delay is not None:
+                        wait = max(0.0, delay - (time.perf_counter() - started))
+                done, _ = await asyncio.wait(running, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                if not done:  # hedge threshold passed
+                    armed = False
+                    if not deadline.expired and budget.take():
+                        log.debug('hedging %s with %s', last, eids[nxt])
+                        last, started, armed = launch()
                     continue
-        await session.close()
-        raise RuntimeError('NoFill')
+                for t in done:
+                    running.pop(t)
+                    if t.exception() is None:
+                        return t.result()
+                    if nxt < len(eids) and not deadline.expired:  # fall through, not a hedge
+                        last, started, armed = launch()
+            raise NoFill(group.id)
+        finally:
+            for t in running:
+                t.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+    async def _run_parallel(self, group: GroupDef, ctx, session) -> str:
+        """Start every endpoint of ``group`` at once and pick a winner.
+
+        ``select='first'`` returns as soon as any endpoint fills. With
+        ``select='priority'`` a fill is returned once no pending endpoint could
+        outrank it (lower ``EndpointDef.priority`` wins, ties by group order).
+        Losers are cancelled and awaited so their connections go back to the
+        pool before we return.
+        """
+        if group.pod is not None:
+            return await self._run_pod(group, ctx, session)
+        rank = {eid: (self.endpoints[eid].priority, i) for i, eid in enumerate(group.endpoints)}
+        tasks = {asyncio.create_task(self._attempt(eid, ctx, session)): eid for eid in group.endpoints}
+        pending = set(tasks)
+        best = None  # (rank, xml)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    eid = tasks[t]
+                    if t.exception() is not None:
+                        continue
+                    if best is None or rank[eid] < best[0]:
+                        best = (rank[eid], t.result())
+                if best is None:
+                    continue
+                if group.select == 'first' or all(rank[tasks[t]] > best[0] for t in pending):
+                    return best[1]
+            raise NoFill(group.id)
+        finally:
+            for t in pending:
+                t.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _run_pod(self, group: GroupDef, ctx, session) -> str:
+        """Fan out to every endpoint and merge all fills into one ad pod.
+
+        Every attempt runs to completion (timeouts are capped by the deadline);
+        fills are parsed into the compact model, ordered by endpoint rank and
+        handed to :func:`~pyvast.vast.assemble_pod`; the chosen ads are then
+        spliced from the original responses by :func:`~pyvast.vast.write_pod`,
+        so nothing the compact model skips is lost.
+        """
+        from ..vast import assemble_pod, parse_vast, write_pod  # lxml is loaded on first use, not with the manifest
+        eids = sorted(group.endpoints, key=lambda e: self.endpoints[e].priority)  # stable: ties by group order
+        results = await asyncio.gather(*(self._attempt(eid, ctx, session) for eid in eids),
+                                       return_exceptions=True)
+        t0 = time.perf_counter()
+        responses = []
+        for eid, xml in zip(eids, results):
+            if isinstance(xml, BaseException):
+                if isinstance(xml, asyncio.CancelledError):
+                    raise xml
+                continue
+            try:
+                responses.append((parse_vast(xml), xml))
+            except Exception as e:
+                log.info('endpoint %s returned unparsable VAST: %r', eid, e)
+        t1 = time.perf_counter()
+        cfg = group.pod
+        pod = assemble_pod((vast for vast, _ in responses), max_ads=cfg.max_ads,
+                           max_duration=cfg.max_duration, dedupe=cfg.dedupe)
+        if not pod.ads:
+            raise NoFill(group.id)
+        xml = write_pod(pod, responses)
+        prof = current_profile.get()
+        if prof is not None:
+            prof.stages['parse'] = t1 - t0
+            prof.stages['pod'] = time.perf_counter() - t1
+        return xml
@@ -1,14 +1,75 @@
-
+import functools, hashlib, json, logging, os
 from pathlib import Path
-import yaml
+from typing import Optional, Union
+import pydantic, yaml
 from .types import ManifestModel
+from ..version import __version__
+
+log = logging.getLogger('pyvast.manifest')
+
+_YAMLLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+@functools.lru_cache(maxsize=None)
+def _abi() -> bytes:
+    # compiled artifacts are only valid for the schema (and pydantic) that wrote them
+    schema = json.dumps(ManifestModel.model_json_schema(), sort_keys=True).encode()
+    return f'pyvast-{__version__}/pydantic-{pydantic.VERSION}/'.encode() + hashlib.sha256(schema).digest()
+
+def content_hash(text: Union[str, bytes]) -> str:
+    if isinstance(text, str):
+        text = text.encode()
+    return hashlib.sha256(_abi() + b'\0' + text).hexdigest()
 
-def _load(src):
-    if isinstance(src, dict):
-        return src
-    text = Path(src).read_text() if isinstance(src, Path) else src
-    return yaml.safe_load(text)
+def default_cache_dir() -> Optional[Path]:
+    d = os.environ.get('PYVAST_MANIFEST_CACHE')
+    return Path(d) if d else None
 
 class ManifestLoader:
-    def __init__(self, source):
-        self.model = ManifestModel(**_load(source))
+    """Loads and validates a manifest (``Path``, YAML text or dict).
+
+    With ``cache_dir`` (or ``$PYVAST_MANIFEST_CACHE``) the validated model is
+    compiled to ``<cache_dir>/<sha256>.json``, keyed by the YAML content, the
+    pyvast and pydantic versions and the manifest schema; later loads of the
+    same content skip YAML parsing and take pydantic's JSON fast path. The
+    artifact is plain JSON and is validated again on load, so a shared cache
+    directory cannot run code; a broken or stale artifact is ignored and
+    rewritten.
+    """
+
+    def __init__(self, source, *, cache_dir: Optional[Path] = None):
+        self.from_cache = False
+        self.digest: Optional[str] = None
+        if isinstance(source, dict):
+            self.model = ManifestModel(**source)
+            return
+        text = Path(source).read_bytes() if isinstance(source, Path) else source.encode()
+        self.digest = content_hash(text)
+        cache_dir = cache_dir if cache_dir is not None else default_cache_dir()
+        artifact = Path(cache_dir) / f'{self.digest}.json' if cache_dir else None
+        if artifact is not None:
+            model = _read_artifact(artifact)
+            if model is not None:
+                self.model, self.from_cache = model, True
+                return
+        self.model = ManifestModel(**yaml.load(text, Loader=_YAMLLoader))
+        if artifact is not None:
+            _write_artifact(artifact, self.model)
+
+def _read_artifact(path: Path) -> Optional[ManifestModel]:
+    try:
+        return ManifestModel.model_validate_json(path.read_bytes())
+    except FileNotFoundError:
+        return None
+    except Exception as e:  # truncated, or no longer valid (e.g. a factory moved)
+        log.warning('ignoring compiled manifest %s: %r', path, e)
+        return None
+
+def _write_artifact(path: Path, model: ManifestModel) -> None:
+    tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(model.model_dump_json())
+        os.replace(tmp, path)  # readers never see a half-written file
+    except Exception as e:
+        log.warning('cannot write compiled manifest %s: %r', path, e)
+        tmp.unlink(missing_ok=True)
@@ -0,0 +1,159 @@
+import asyncio, logging, weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, TypeVar
+from pydantic import BaseModel
+from .executor import ManifestExecutor
+from .loader import ManifestLoader
+from .types import AdapterDef, ManifestModel, ParamSetter
+from ..adapters.registry import get_adapter
+from ..runtime import Runtime
+
+log = logging.getLogger('pyvast.registry')
+
+M = TypeVar('M', bound=BaseModel)
+
+class AdapterPool:
+    """Interns manifest parts and the adapters built from them.
+
+    Identical :class:`AdapterDef`, :class:`EndpointDef` and :class:`GroupDef`
+    values collapse to one (shared, treat as read-only) instance, and every
+    (definition, setters) pair gets a single adapter (for ``http``, one
+    compiled :class:`RequestPlan` and one response/wrapper cache) however many
+    manifests use it.
+
+    Both tables hold weak references: an entry lives as long as some executor
+    (through its model and adapters) uses it, so evicting a tenant frees what
+    only that tenant used.
+    """
+
+    def __init__(self):
+        self.parts: 'weakref.WeakValueDictionary[Tuple[type, str], BaseModel]' = weakref.WeakValueDictionary()
+        self.adapters: 'weakref.WeakValueDictionary[Tuple[str, str], Any]' = weakref.WeakValueDictionary()
+
+    def intern(self, part: M) -> M:
+        return self._intern(part, part.model_dump_json())
+
+    def _intern(self, part: M, dump: str) -> M:
+        return self.parts.setdefault((type(part), dump), part)
+
+    def intern_model(self, model: ManifestModel) -> ManifestModel:
+        model.adapters = {k: self.intern(a) for k, a in model.adapters.items()}
+        model.endpoints = [self.intern(e) for e in model.endpoints]
+        model.groups = [self.intern(g) for g in model.groups]
+        return model
+
+    def get(self, adef: AdapterDef, setters: List[ParamSetter]):
+        dump = adef.model_dump_json()
+        adef = self._intern(adef, dump)
+        key = (dump, '[' + ','.join(s.model_dump_json() for s in setters) + ']')
+        adapter = self.adapters.get(key)
+        if adapter is None:
+            adapter = self.adapters[key] = get_adapter(adef.type)(adef.spec, adef.config, setters)
+        return adapter
+
+class ManifestRegistry:
+    """Many manifests (one per tenant: publisher, placement …) in one process.
+
+    Tenants map to ``<root>/<tenant>.yml`` unless :meth:`register`\\ ed
+    explicitly, and nothing is read until a tenant is first used. Executors
+    are kept in an LRU of ``max_executors``; an evicted tenant is rebuilt on
+    its next request (cheaply, from the compiled cache when ``cache_dir`` is
+    set). All executors share one :class:`Runtime` and one
+    :class:`AdapterPool`, so what a tenant adds is little more than its
+    executor's lookup dicts and per-endpoint health/breaker state.
+
+    Usage::
+
+        async with ManifestRegistry(Path('manifests'), cache_dir=Path('.cache')) as reg:
+            xml = await reg.execute('publisher-42', ctx)
+    """
+
+    def __init__(self, root: Optional[Path] = None, *, runtime: Optional[Runtime] = None,
+                 cache_dir: Optional[Path] = None, max_executors: int = 256):
+        self.root = Path(root) if root is not None else None
+        self.runtime = runtime
+        self._owns_runtime = False
+        self.cache_dir = cache_dir
+        self.max_executors = max_executors
+        self.pool = AdapterPool()
+        self.sources: Dict[str, Any] = {}
+        self._executors: 'OrderedDict[str, ManifestExecutor]' = OrderedDict()
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._generation: Dict[str, int] = {}  # bumped by register(): stale loads aren't installed
+        self.loads = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._executors)
+
+    def __contains__(self, tenant: str) -> bool:
+        return tenant in self._executors
+
+    async def __aenter__(self):
+        if self.runtime is None:
+            self.runtime, self._owns_runtime = Runtime(), True
+        await self.runtime.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._owns_runtime:
+            await self.runtime.close()
+            self.runtime, self._owns_runtime = None, False
+
+    def register(self, tenant: str, source) -> None:
+        """Map ``tenant`` to a manifest ``Path``, YAML text or dict; drops a loaded executor.
+
+        A load of the old source still in flight is not installed; its waiters
+        get the executor for the new source.
+        """
+        self.sources[tenant] = source
+        self._generation[tenant] = self._generation.get(tenant, 0) + 1
+        self._executors.pop(tenant, None)
+        self._loading.pop(tenant, None)
+
+    def executors(self) -> Dict[str, ManifestExecutor]:
+        """Loaded executors by tenant (a snapshot, least recently used first)."""
+        return dict(self._executors)
+
+    def source_of(self, tenant: str):
+        src = self.sources.get(tenant)
+        if src is not None:
+            return src
+        if self.root is None or not tenant or tenant.startswith('.') or '/' in tenant or '\\' in tenant:
+            raise KeyError(tenant)
+        path = self.root / f'{tenant}.yml'
+        if not path.is_file():
+            raise KeyError(tenant)
+        return path
+
+    async def get(self, tenant: str) -> ManifestExecutor:
+        ex = self._executors.get(tenant)
+        if ex is not None:
+            self._executors.move_to_end(tenant)
+            return ex
+        fut = self._loading.get(tenant)
+        if fut is None:  # one load per cold tenant, however many requests wait on it
+            fut = self._loading[tenant] = asyncio.ensure_future(self._load(tenant))
+            fut.add_done_callback(lambda f: self._loading.pop(tenant) if self._loading.get(tenant) is f else None)
+        return await asyncio.shield(fut)
+
+    async def execute(self, tenant: str, ctx: Dict[str, Any], **kw) -> str:
+        return await (await self.get(tenant)).execute(ctx, **kw)
+
+    async def _load(self, tenant: str) -> ManifestExecutor:
+        generation = self._generation.get(tenant, 0)
+        src = self.source_of(tenant)
+        loader = await asyncio.to_thread(ManifestLoader, src, cache_dir=self.cache_dir)
+        model = self.pool.intern_model(loader.model)
+        ex = ManifestExecutor(model, runtime=self.runtime, adapter_pool=self.pool)
+        if self.runtime is not None and self.runtime.started:
+            await self.runtime.warm(a.spec.base_uri for a in model.adapters.values() if a.config.warm)
+        if self._generation.get(tenant, 0) != generation:  # re-registered meanwhile
+            return await self.get(tenant)
+        self.loads += 1
+        self._executors[tenant] = ex
+        while len(self._executors) > self.max_executors:
+            evicted, _ = self._executors.popitem(last=False)
+            self.evictions += 1
+            log.debug('evicted manifest %s', evicted)
+        return ex
@@ -0,0 +1,103 @@
+import asyncio, logging, os
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from .executor import ManifestExecutor
+from .loader import ManifestLoader
+from ..runtime import Runtime
+
+log = logging.getLogger('pyvast.reload')
+
+class HotExecutor:
+    """:class:`ManifestExecutor` that follows its YAML file.
+
+    A background task polls the file's mtime/size every ``interval`` seconds.
+    A changed file is loaded (through the compiled cache, in a worker thread)
+    and a fresh executor built on the same :class:`Runtime`; then
+    ``self.executor`` is swapped in one assignment. Each :meth:`execute` call
+    picks the executor once at its start, so in-flight requests finish on the
+    version they began with. A manifest that fails to load, or whose executor
+    cannot be built, is logged and the current one keeps serving; the watcher
+    keeps polling.
+
+    Usage::
+
+        async with HotExecutor(Path('manifest.yml'), cache_dir=Path('.cache')) as hx:
+            xml = await hx.execute(ctx)
+    """
+
+    def __init__(self, path: Path, *, runtime: Optional[Runtime] = None,
+                 cache_dir: Optional[Path] = None, interval: float = 2.0):
+        self.path, self.cache_dir, self.interval = Path(path), cache_dir, interval
+        self.runtime = runtime
+        self._owns_runtime = False
+        self.executor: Optional[ManifestExecutor] = None
+        self.digest: Optional[str] = None
+        self.reloads = 0  # successful swaps after the initial load
+        self._stat: Optional[Tuple[int, int]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self):
+        if self.runtime is None:
+            self.runtime, self._owns_runtime = Runtime(), True
+        await self.runtime.start()
+        if not await self.reload():
+            raise RuntimeError(f'cannot load manifest {self.path}')
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._watch())
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._owns_runtime:
+            await self.runtime.close()
+            self.runtime, self._owns_runtime = None, False
+
+    async def execute(self, ctx: Dict[str, Any], **kw) -> str:
+        return await self.executor.execute(ctx, **kw)
+
+    def _file_stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    async def reload(self) -> bool:
+        """Load the file now; ``True`` if a new version went live."""
+        self._stat = self._file_stat()
+        try:
+            loader = await asyncio.to_thread(ManifestLoader, self.path, cache_dir=self.cache_dir)
+        except Exception as e:
+            log.error('manifest %s not reloaded: %r', self.path, e)
+            return False
+        if loader.digest == self.digest:
+            return False  # touched, not changed
+        try:  # a valid manifest can still fail here, e.g. on an unknown adapter type
+            executor = ManifestExecutor(loader.model, runtime=self.runtime)
+            await self.runtime.warm(a.spec.base_uri for a in loader.model.adapters.values() if a.config.warm)
+        except Exception as e:
+            log.error('manifest %s not reloaded: %r', self.path, e)
+            return False
+        old = self.executor
+        if old is not None:  # unchanged endpoints keep their health stats and breaker state
+            for eid, ep in executor.endpoints.items():
+                prev = old.endpoints.get(eid)
+                if prev is not None and prev.breaker == ep.breaker:
+                    executor.health[eid], executor.breakers[eid] = old.health[eid], old.breakers[eid]
+        self.executor, self.digest = executor, loader.digest
+        if old is not None:
+            self.reloads += 1
+            log.info('manifest %s reloaded (%s)', self.path, loader.digest[:12])
+        return True
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            if self._file_stat() != self._stat:
+                try:
+                    await self.reload()
+                except Exception:  # never let one bad reload end the watcher
+                    log.exception('manifest %s: reload failed', self.path)
@@ -1,11 +1,28 @@
 
-from pydantic import BaseModel, Field
-from typing import Dict, List, Any, Literal
+import importlib, inspect
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
+from typing import Callable, Dict, List, Any, Literal, Optional
 
 class FactorySpec(BaseModel):
     fn: str
     args: List[Any] = []
     kwargs: Dict[str, Any] = {}
+    # resolved once at load time – a bad `fn` path fails validation
+    _callable: Callable[..., Any] = PrivateAttr()
+    _is_async: bool = PrivateAttr(False)
+
+    @model_validator(mode='after')
+    def _resolve(self):
+        mod, _, attr = self.fn.replace(':','.').rpartition('.')
+        try:
+            fn = getattr(importlib.import_module(mod), attr)
+        except (ImportError, AttributeError, ValueError) as e:
+            raise ValueError(f'cannot resolve factory {self.fn!r}: {e}') from e
+        if not callable(fn):
+            raise ValueError(f'factory {self.fn!r} is not callable')
+        self._callable = fn
+        self._is_async = inspect.iscoroutinefunction(fn) or inspect.iscoroutinefunction(getattr(fn, '__call__', None))
+        return self
 
 class ParamSetter(BaseModel):
     target: str
@@ -17,24 +34,75 @@ class AdapterSpec(BaseModel):
     query: Dict[str, Any] = Field(default_factory=dict)
     headers: Dict[str, Any] = Field(default_factory=dict)
 
+class ResponseCacheConfig(BaseModel):
+    ttl: float = 30.0          # fresh for `ttl` seconds …
+    stale_ttl: float = 0.0     # … then served stale while revalidating
+    nofill_ttl: float = 0.0    # no-fill answers cached this long (no stale window), 0 → not cached
+    maxsize: int = 10_000
+
+class CoalesceConfig(BaseModel):
+    window: float = 1.0        # join an identical call started ≤ window s ago
+    wrappers: bool = True      # coalesce wrapper hops (VASTAdTagURI) too
+
 class AdapterConfig(BaseModel):
     timeout: float = 3.0
+    # pre-open connections to this origin and keep them warm with HEAD / while it sees traffic
+    warm: bool = False
+    # wrapper resolution: per-hop timeout (None → `timeout`), TTL/LRU cache of hops
+    wrapper_timeout: Optional[float] = None
+    wrapper_cache_ttl: float = 0.0          # seconds, 0 → no cache
+    wrapper_cache_size: int = 1024
+    # response bodies are read in chunks; decoded (post-gzip) size cap, 0 → none
+    max_body: int = 1 << 20
+    # opt-in cache of upstream responses keyed by the rendered request
+    cache: Optional[ResponseCacheConfig] = None
+    # opt-in single-flight: identical concurrent requests share one upstream call
+    coalesce: Optional[CoalesceConfig] = None
 
 class AdapterDef(BaseModel):
+    type: str = 'http'   # adapter class, see pyvast.adapters.registry
     spec: AdapterSpec
     config: AdapterConfig
 
+class BreakerConfig(BaseModel):
+    enabled: bool = True
+    window: int = 200                # attempts kept for health stats
+    consecutive_failures: int = 5    # trip after N timeouts/errors in a row …
+    error_rate: float = 0.5          # … or at this error rate
+    min_samples: int = 20            # … over at least this many attempts
+    cooldown: float = 10.0           # open → half-open after N seconds
+    half_open_probes: int = 1        # live requests let through as probes
+
 class EndpointDef(BaseModel):
     id: str
     name: str
     adapter_id: str
     priority: int = 0
     set_params: List[ParamSetter] = Field(default_factory=list)
+    breaker: BreakerConfig = Field(default_factory=BreakerConfig)
+
+class HedgeConfig(BaseModel):
+    delay: Optional[float] = None       # fixed threshold (s); fallback while learning
+    percentile: Optional[float] = None  # learned threshold: pXX of the endpoint's latency
+    min_samples: int = 50               # samples needed before `percentile` is used
+    max_rate: float = 0.1               # hedges per group execution (token bucket)
+    burst: float = 10.0
+
+class PodConfig(BaseModel):
+    max_ads: Optional[int] = None          # cap on ads in the pod
+    max_duration: Optional[float] = None   # seconds; ads with unknown duration are skipped
+    dedupe: bool = True                    # drop creatives already in the pod
 
 class GroupDef(BaseModel):
     id: str
     priority: int = 0
     mode: Literal['waterfall','parallel'] = 'waterfall'
+    # parallel only: 'first' → first fill wins, 'priority' → best EndpointDef.priority
+    select: Literal['first','priority'] = 'first'
+    # waterfall only: start the next endpoint speculatively when one is slow
+    hedge: Optional[HedgeConfig] = None
+    # parallel only: wait for every endpoint and merge all fills into one ad pod
+    pod: Optional[PodConfig] = None
     endpoints: List[str]
 
 class ManifestModel(BaseModel):
@@ -43,3 +111,16 @@ class ManifestModel(BaseModel):
     adapters: Dict[str, AdapterDef]
     endpoints: List[EndpointDef]
     groups: List[GroupDef]
+
+    @model_validator(mode='after')
+    def _check_refs(self):
+        # dangling ids would otherwise only surface as a KeyError when the executor is built
+        for e in self.endpoints:
+            if e.adapter_id not in self.adapters:
+                raise ValueError(f'endpoint {e.id!r}: unknown adapter_id {e.adapter_id!r}')
+        ids = {e.id for e in self.endpoints}
+        for g in self.groups:
+            missing = [eid for eid in g.endpoints if eid not in ids]
+            if missing:
+                raise ValueError(f'group {g.id!r}: unknown endpoints {missing}')
+        return self
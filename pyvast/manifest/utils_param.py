@@ -1,22 +1,38 @@
 
+import inspect
 from urllib.parse import urlparse, parse_qsl, urlencode
-import importlib, asyncio
+from typing import Any, Dict, Tuple
 from .types import ParamSetter
 from ..utils.macro import interpolate_macros
 
-async def apply_param_setters(ctx, setters:list[ParamSetter]):
+async def resolve_param_setters(ctx, setters:list[ParamSetter]) -> Tuple[Dict[str,str], Dict[str,str]]:
+    """Evaluate setters (factories are pre-resolved at load time) and return
+    the ``(query, headers)`` mutations they produce, in order.
+
+    Factories get ``ctx=`` as a plain ``dict``; a factory's result is its
+    return value. Nested values are shared with the request and must not be
+    mutated."""
+    query: Dict[str,str] = {}
+    headers: Dict[str,str] = {}
     for s in setters:
-        mod, _, attr = s.factory.fn.replace(':','.').rpartition('.')
-        fn = getattr(importlib.import_module(mod), attr)
-        value_raw = fn(*s.factory.args, **s.factory.kwargs, ctx=ctx)
-        if asyncio.iscoroutine(value_raw):
+        f = s.factory
+        value_raw: Any = f._callable(*f.args, **f.kwargs, ctx=ctx)
+        if f._is_async or inspect.isawaitable(value_raw):  # sync wrappers may return one too
             value_raw = await value_raw
         value = interpolate_macros(str(value_raw), ctx)
         bag, _, key = s.target.partition('.')
         if bag=='query':
-            parsed=urlparse(ctx['url'])
-            q=dict(parse_qsl(parsed.query))
-            q[key]=value
-            ctx['url']=parsed._replace(query=urlencode(q)).geturl()
+            query[key]=value
         elif bag=='header':
-            ctx.setdefault('headers',{})[key]=value
+            headers[key]=value
+    return query, headers
+
+async def apply_param_setters(ctx, setters:list[ParamSetter]):
+    query, headers = await resolve_param_setters(ctx, setters)
+    if query:  # one URL rebuild for all query setters
+        parsed=urlparse(ctx['url'])
+        q=dict(parse_qsl(parsed.query))
+        q.update(query)
+        ctx['url']=parsed._replace(query=urlencode(q)).geturl()
+    if headers:
+        ctx.setdefault('headers',{}).update(headers)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+"""Long‑lived HTTP runtime shared by executors.
+
+Responsibilities
+----------------
+* Own one tuned :class:`aiohttp.TCPConnector` (global + per‑host limits,
+  keep‑alive, DNS cache) and the :class:`aiohttp.ClientSession` on top of it.
+* Pre‑open connections to the origins of adapters that opt in
+  (``AdapterConfig.warm``) and keep them warm with a periodic ``HEAD /``, so
+  steady‑state requests skip TCP/TLS handshakes. Only origins that served
+  traffic during the last interval are pinged; idle SSPs get no requests.
+
+Usage::
+
+    async with Runtime(PoolConfig(limit_per_host=64)) as rt:
+        async with ManifestExecutor(model, runtime=rt) as ex:
+            xml = await ex.execute(ctx)
+"""
+
+import asyncio
+import logging
+import weakref
+from typing import Iterable, Optional, Set
+from urllib.parse import urlsplit
+
+import aiohttp
+from pydantic import BaseModel
+
+from pyvast.utils.macro import PATTERN
+from pyvast.utils.profiling import connect_trace_config
+
+log = logging.getLogger("pyvast.runtime")
+
+__all__ = ["PoolConfig", "Runtime", "is_long_lived", "origin_of"]
+
+# sessions owned by a started Runtime; see is_long_lived()
+_LONG_LIVED: "weakref.WeakSet[aiohttp.ClientSession]" = weakref.WeakSet()
+
+
+class PoolConfig(BaseModel):
+    limit: int = 512
+    limit_per_host: int = 64
+    keepalive_timeout: float = 60.0
+    ttl_dns_cache: int = 300
+    connect_timeout: float = 2.0
+    warmup: bool = True
+    warm_connections: int = 2  # connections pre‑opened per origin
+    warm_interval: float = 20.0  # 0 → no keep‑warm loop (pings only origins used since the last one)
+    trace_connect: bool = False  # time connection acquisition for profiled requests
+
+
+def origin_of(uri: str) -> Optional[str]:
+    """``scheme://host[:port]`` of ``uri``; ``None`` if the host is templated."""
+    parts = urlsplit(uri)
+    if not parts.scheme or not parts.netloc or PATTERN.search(parts.netloc):
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def is_long_lived(session: Optional[aiohttp.ClientSession]) -> bool:
+    """Whether ``session`` belongs to a :class:`Runtime`, i.e. outlives the request.
+
+    Background work that keeps using the session after ``execute`` returns
+    (cache refreshes, shared coalesced calls) is only safe on such sessions;
+    an executor without a Runtime closes its session when the request ends.
+    """
+    return session is not None and session in _LONG_LIVED and not session.closed
+
+
+class Runtime:
+    """Connection pool + session that outlives individual ad requests."""
+
+    def __init__(self, pool: Optional[PoolConfig] = None):
+        self.pool = pool or PoolConfig()
+        self.origins: Set[str] = set()  # opted in to warm‑up, see AdapterConfig.warm
+        self.recent: Set[str] = set()  # origins used since the last keep‑warm tick
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._warm_task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            raise RuntimeError("Runtime is not started")
+        return self._session
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None and not self._session.closed
+
+    async def start(self) -> "Runtime":
+        if self.started:
+            return self
+        p = self.pool
+        connector = aiohttp.TCPConnector(
+            limit=p.limit,
+            limit_per_host=p.limit_per_host,
+            keepalive_timeout=p.keepalive_timeout,
+            ttl_dns_cache=p.ttl_dns_cache,
+            use_dns_cache=True,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(sock_connect=p.connect_timeout),
+            trace_configs=[connect_trace_config()] if p.trace_connect else None,
+        )
+        _LONG_LIVED.add(self._session)
+        if p.warm_interval > 0:
+            self._warm_task = asyncio.create_task(self._keep_warm())
+        return self
+
+    async def close(self) -> None:
+        if self._warm_task is not None:
+            self._warm_task.cancel()
+            await asyncio.gather(self._warm_task, return_exceptions=True)
+            self._warm_task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "Runtime":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    # ------------------------------------------------------------------
+    async def warm(self, uris: Iterable[str]) -> None:
+        """Register the origins of ``uris`` and pre‑open connections to them."""
+        new = {o for o in map(origin_of, uris) if o} - self.origins
+        self.origins |= new
+        if new and self.pool.warmup:
+            await self._ping(new)
+
+    def touch(self, origin: str) -> None:
+        """Mark ``origin`` as used, so the next keep‑warm tick pings it."""
+        self.recent.add(origin)
+
+    async def _ping(self, origins: Iterable[str]) -> None:
+        n = self.pool.warm_connections
+        await asyncio.gather(
+            *(self._ping_one(o) for o in origins for _ in range(n)),
+            return_exceptions=True,
+        )
+
+    async def _ping_one(self, origin: str) -> None:
+        # A HEAD leaves the connection in the keep‑alive pool once released.
+        try:
+            async with self.session.head(
+                origin + "/",
+                allow_redirects=False,
+                timeout=aiohttp.ClientTimeout(total=self.pool.connect_timeout * 2),
+            ):
+                pass
+        except Exception as e:  # warm‑up is best effort
+            log.debug("warm‑up %s failed: %s", origin, e)
+
+    async def _keep_warm(self) -> None:
+        while True:
+            await asyncio.sleep(self.pool.warm_interval)
+            used, self.recent = self.origins & self.recent, set()
+            if used:
+                await self._ping(used)
@@ -0,0 +1,363 @@
+"""HTTP ad‑decision server (``pyvast serve``).
+
+Endpoints
+---------
+``GET|POST /vast`` (one manifest) or ``/vast/{tenant}`` (a directory of
+manifests, see :class:`~pyvast.manifest.registry.ManifestRegistry`)
+    The request context is the JSON body (POST) or the query string, where
+    dotted keys nest: ``?device.ip=1.2.3.4&self.site_id=x``. ``deadline``
+    overrides the server's per‑request budget. A fill answers ``200`` with
+    the VAST; no fill answers ``200`` with an empty ``<VAST/>``. The outcome
+    is also in the ``X-Pyvast-Outcome`` header.
+``GET /healthz``
+    ``200 ok`` while serving, ``503`` while draining (for ``drain_grace``
+    seconds the worker keeps accepting, so load balancers see it).
+``GET /stats``
+    Per‑endpoint health snapshots of this worker.
+
+Processes
+---------
+``workers=N`` forks N processes that each bind the same address with
+``SO_REUSEPORT``, so the kernel spreads connections across them. Every worker
+runs its own event loop (uvloop when installed), one pooled
+:class:`~pyvast.runtime.Runtime` and persistent executors. On SIGTERM/SIGINT a
+worker fails ``/healthz`` for ``drain_grace`` seconds, stops accepting, waits up
+to ``drain_timeout`` for in‑flight requests, then closes its pools. The parent
+forwards the signal and restarts workers that die unexpectedly, with an
+exponential backoff per worker slot. It gives up (exit status 1) when a worker
+dies before it ever served, or ``max_restarts`` times within
+``restart_window`` seconds: a broken deploy must not become a fork loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import signal
+import socket
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from aiohttp import web
+
+from pyvast.exceptions import NoFill
+from pyvast.manifest.registry import ManifestRegistry
+from pyvast.manifest.reload import HotExecutor
+from pyvast.runtime import PoolConfig, Runtime
+
+log = logging.getLogger("pyvast.server")
+
+__all__ = ["ServeConfig", "build_app", "context_from_query", "serve"]
+
+EMPTY_VAST = '<?xml version="1.0" encoding="UTF-8"?><VAST version="4.0"/>'
+
+STATE = web.AppKey("state", dict)  # {"inflight": int, "draining": bool}
+BACKEND = web.AppKey("backend", object)  # HotExecutor | ManifestRegistry
+
+
+@dataclass
+class ServeConfig:
+    manifest: Path  # a manifest file, or a directory with one <tenant>.yml per tenant
+    host: str = "0.0.0.0"
+    port: int = 8080
+    workers: int = 1
+    deadline: Optional[float] = None  # default per-request budget, seconds
+    drain_timeout: float = 10.0
+    drain_grace: float = 2.0  # keep accepting (healthz → 503) this long before closing the listener
+    reload_interval: float = 2.0  # single-manifest mode: hot reload poll, 0 → off
+    cache_dir: Optional[Path] = None
+    max_executors: int = 256
+    backlog: int = 1024
+    max_restarts: int = 5  # per worker slot within restart_window, then give up
+    restart_window: float = 60.0
+    restart_backoff: float = 0.5  # first restart delay, doubled per recent crash (max 30 s)
+
+
+def context_from_query(query) -> Dict[str, Any]:
+    """``{'device.ip': '1.2.3.4'}`` → ``{'device': {'ip': '1.2.3.4'}}``."""
+    ctx: Dict[str, Any] = {}
+    for key, value in query.items():
+        node = ctx
+        *parents, leaf = key.split(".")
+        for p in parents:
+            child = node.get(p)
+            if not isinstance(child, dict):
+                child = node[p] = {}
+            node = child
+        node[leaf] = value
+    return ctx
+
+
+def build_app(cfg: ServeConfig, runtime: Runtime) -> web.Application:
+    """The aiohttp app of one worker; executors start/stop with the app."""
+    multi = cfg.manifest.is_dir()
+    state: Dict[str, Any] = {"inflight": 0, "draining": False}
+    app = web.Application()
+    app[STATE] = state
+
+    async def lifecycle(app):
+        if multi:
+            backend = ManifestRegistry(cfg.manifest, runtime=runtime, cache_dir=cfg.cache_dir,
+                                       max_executors=cfg.max_executors)
+        else:
+            backend = HotExecutor(cfg.manifest, runtime=runtime, cache_dir=cfg.cache_dir,
+                                  interval=cfg.reload_interval)
+        async with backend:
+            app[BACKEND] = backend
+            yield
+
+    app.cleanup_ctx.append(lifecycle)
+
+    async def vast(request: web.Request) -> web.Response:
+        state["inflight"] += 1
+        try:
+            if request.method == "POST":
+                try:
+                    ctx = await request.json()
+                except ValueError:
+                    raise web.HTTPBadRequest(text="body must be a JSON object")
+                if not isinstance(ctx, dict):
+                    raise web.HTTPBadRequest(text="body must be a JSON object")
+            else:
+                ctx = context_from_query(request.query)
+            raw = ctx.pop("deadline", None) if request.method == "GET" else request.query.get("deadline")
+            try:
+                deadline = float(raw) if raw is not None else cfg.deadline
+            except ValueError:
+                raise web.HTTPBadRequest(text="deadline must be a number")
+            backend = app[BACKEND]
+            if multi:
+                tenant = request.match_info["tenant"]
+                if tenant not in backend:  # 404 only when there is no such manifest
+                    try:
+                        backend.source_of(tenant)
+                    except KeyError:
+                        raise web.HTTPNotFound(text="unknown tenant")
+                try:
+                    executor = await backend.get(tenant)
+                except Exception:
+                    log.exception("tenant %s: manifest failed to load", tenant)
+                    raise web.HTTPInternalServerError(text="manifest failed to load")
+            else:
+                executor = backend.executor  # picked once: a hot reload doesn't affect this request
+            try:
+                xml, outcome = await executor.execute(ctx, deadline=deadline), "fill"
+            except NoFill:
+                xml, outcome = EMPTY_VAST, "nofill"
+            return web.Response(text=xml, content_type="application/xml",
+                                headers={"X-Pyvast-Outcome": outcome})
+        finally:
+            state["inflight"] -= 1
+
+    async def healthz(request: web.Request) -> web.Response:
+        if state["draining"]:
+            return web.Response(status=503, text="draining")
+        return web.Response(text="ok")
+
+    async def stats(request: web.Request) -> web.Response:
+        backend = app[BACKEND]
+        executors = backend.executors() if multi else {"default": backend.executor}
+        body = {
+            "pid": os.getpid(),
+            "inflight": state["inflight"],
+            "executors": {name: {eid: h.snapshot() for eid, h in ex.health.items()}
+                          for name, ex in executors.items()},
+        }
+        return web.json_response(body)
+
+    route = "/vast/{tenant}" if multi else "/vast"
+    app.router.add_route("GET", route, vast)
+    app.router.add_route("POST", route, vast)
+    app.router.add_get("/healthz", healthz)
+    app.router.add_get("/stats", stats)
+    return app
+
+
+def _bind(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if hasattr(socket, "SO_REUSEPORT"):
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.setblocking(False)
+    return sock
+
+
+async def run_worker(cfg: ServeConfig, sock: Optional[socket.socket] = None,
+                     stop: Optional[asyncio.Event] = None,
+                     ready: Optional[Callable[[], None]] = None) -> None:
+    """Serve until SIGTERM/SIGINT (or until ``stop`` is set), then drain and exit.
+
+    ``ready`` is called once the app is up and accepting connections.
+    """
+    sock = sock or _bind(cfg.host, cfg.port, cfg.backlog)
+    if stop is None:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+    try:
+        async with Runtime(PoolConfig()) as runtime:
+            app = build_app(cfg, runtime)
+            runner = web.AppRunner(app, access_log=None, handle_signals=False)
+            await runner.setup()
+            site = web.SockSite(runner, sock)
+            await site.start()
+            log.info("worker %d serving on %s:%s", os.getpid(), *sock.getsockname()[:2])
+            if ready is not None:
+                ready()
+            await stop.wait()
+
+            state = app[STATE]
+            state["draining"] = True
+            await asyncio.sleep(cfg.drain_grace)  # health checks see 503 and take us out of rotation
+            await site.stop()  # no new connections; in-flight handlers keep running
+            end = time.monotonic() + cfg.drain_timeout
+            while state["inflight"] and time.monotonic() < end:
+                await asyncio.sleep(0.05)
+            if state["inflight"]:
+                log.warning("worker %d: %d requests still running after drain", os.getpid(), state["inflight"])
+            await runner.cleanup()
+    finally:
+        sock.close()
+
+
+def _event_loop_factory():
+    try:
+        import uvloop
+    except ImportError:
+        return None
+    return uvloop.new_event_loop
+
+
+def _worker_main(cfg: ServeConfig, sock: Optional[socket.socket],
+                 ready: Optional[Callable[[], None]] = None) -> None:
+    with asyncio.Runner(loop_factory=_event_loop_factory()) as runner:
+        runner.run(run_worker(cfg, sock, ready=ready))
+
+
+def serve(cfg: ServeConfig) -> int:
+    """Run ``cfg.workers`` processes on one SO_REUSEPORT address (blocking).
+
+    Returns the exit status: 0 after a signal‑driven shutdown, 1 when the
+    workers kept crashing and the parent gave up.
+    """
+    if cfg.workers <= 1:
+        _worker_main(cfg, None)
+        return 0
+    if not hasattr(socket, "SO_REUSEPORT"):
+        raise RuntimeError("multiple workers need SO_REUSEPORT")
+    # Bind once in the parent to fix the port (``port=0`` picks one); the
+    # workers bind their own sockets to the same address.
+    probe = _bind(cfg.host, cfg.port, cfg.backlog)
+    cfg.port = probe.getsockname()[1]
+    probe.close()
+
+    children: Dict[int, int] = {}  # pid → slot
+    ready_fds: Dict[int, int] = {}  # pid → read end of its "serving" pipe
+    crashes: Dict[int, List[float]] = {slot: [] for slot in range(cfg.workers)}
+    respawn: Dict[int, float] = {}  # slot → monotonic time to restart it
+    stopping = failed = False
+
+    def spawn(slot: int) -> None:
+        r, w = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # child
+            os.close(r)
+            code = 0
+
+            def ready():
+                os.write(w, b"1")
+                os.close(w)
+
+            try:
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                _worker_main(cfg, _bind(cfg.host, cfg.port, cfg.backlog), ready)
+            except BaseException:
+                log.exception("worker crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        os.close(w)
+        children[pid], ready_fds[pid] = slot, r
+
+    def served(pid: int) -> bool:
+        r = ready_fds.pop(pid)
+        try:
+            return os.read(r, 1) == b"1"  # the writer is gone: never blocks
+        finally:
+            os.close(r)
+
+    def stop_all() -> None:
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def forward(signum, frame):
+        nonlocal stopping
+        stopping = True
+        stop_all()
+
+    previous = {sig: signal.signal(sig, forward) for sig in (signal.SIGTERM, signal.SIGINT)}
+    try:
+        for slot in range(cfg.workers):
+            spawn(slot)
+        log.info("serving on %s:%d with %d workers", cfg.host, cfg.port, cfg.workers)
+        while children or (respawn and not stopping):
+            now = time.monotonic()
+            for slot, at in list(respawn.items()):
+                if stopping:
+                    respawn.clear()
+                elif at <= now:
+                    del respawn[slot]
+                    spawn(slot)
+            try:
+                if respawn:  # poll, so a pending restart isn't held up by os.wait()
+                    pid, status = os.waitpid(-1, os.WNOHANG)
+                    if pid == 0:
+                        time.sleep(min(0.1, max(0.0, min(respawn.values()) - now)))
+                        continue
+                else:
+                    pid, status = os.wait()
+            except ChildProcessError:
+                if not respawn:
+                    break
+                time.sleep(0.1)
+                continue
+            except InterruptedError:
+                continue
+            slot = children.pop(pid, None)
+            if slot is None:
+                continue
+            ok = served(pid)
+            if stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            now = time.monotonic()
+            recent = crashes[slot] = [t for t in crashes[slot] if now - t < cfg.restart_window] + [now]
+            if not ok:
+                log.error("worker %d exited (%d) before serving; giving up", pid, code)
+            elif len(recent) > cfg.max_restarts:
+                log.error("worker slot %d died %d times in %.0fs; giving up", slot, len(recent), cfg.restart_window)
+            else:
+                delay = min(30.0, cfg.restart_backoff * 2 ** (len(recent) - 1))
+                log.warning("worker %d exited (%d), restarting in %.1fs", pid, code, delay)
+                respawn[slot] = now + delay
+                continue
+            failed = stopping = True
+            respawn.clear()
+            stop_all()
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        for r in ready_fds.values():
+            os.close(r)
+    return 1 if failed else 0
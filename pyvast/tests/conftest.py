@@ -0,0 +1,68 @@
+import asyncio
+from pathlib import Path
+
+import aiohttp
+import pytest
+
+from pyvast.exceptions import NoFill
+from pyvast.manifest.executor import ManifestExecutor
+from pyvast.manifest.loader import ManifestLoader
+
+
+DEMO_MANIFEST = Path("contrib/manifests/multi_ssp_demo.yml")
+
+
+class FakeAdapter:
+    """Answers after ``delay`` seconds with ``xml`` (or raises NoFill)."""
+
+    def __init__(self, delay, xml=None):
+        self.delay, self.xml = delay, xml
+        self.cancelled = False
+
+    async def fetch(self, ctx, *, session=None):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.xml is None:
+            raise NoFill("fake")
+        return self.xml
+
+
+@pytest.fixture
+def demo_manifest():
+    return DEMO_MANIFEST
+
+
+@pytest.fixture
+def fake_adapter():
+    return FakeAdapter
+
+
+@pytest.fixture
+def make_executor():
+    """``make_executor(mode, **group_fields)`` → executor over the demo manifest."""
+
+    def make(mode="parallel", **group):
+        model = ManifestLoader(DEMO_MANIFEST).model
+        model.groups[0].mode = mode
+        for k, v in group.items():
+            setattr(model.groups[0], k, v)
+        return ManifestExecutor(model)
+
+    return make
+
+
+@pytest.fixture
+def run():
+    """``run(ex, ctx=None, **execute_kw)`` on a fresh loop and session."""
+
+    def run(ex, ctx=None, **kw):
+        async def _go():
+            async with aiohttp.ClientSession() as s:
+                return await ex.execute(ctx or {}, session=s, **kw)
+
+        return asyncio.run(_go())
+
+    return run
@@ -1,11 +1,10 @@
 from pathlib import Path
-from urllib.parse import urlparse, parse_qs
+from urllib.parse import parse_qs, urlparse
 
 import pytest
 
-from pyvast.manifest.loader import ManifestLoader
 from pyvast.adapters.base_http import BaseHTTPAdapter
-
+from pyvast.manifest.loader import ManifestLoader
 
 DEMO_MANIFEST = Path("contrib/manifests/multi_ssp_demo.yml")
 CTX_PATH = Path("contrib/ctx/demo.json")
@@ -37,10 +36,10 @@ def test_dotted_macro_resolution(adfox_adapter, ctx):
     parsed = urlparse(url)
     qs = parse_qs(parsed.query)
 
-    assert "yandex.ru/ads/adfox/721500/" in url          # ${self.owner_id}
-    assert qs["p1"] == ["dfiza"]                         # ${self.site_id}
-    assert qs["p2"] == ["hyxp"]                          # ${self.placement_id}
-    assert "ext_duid" in qs                              # [CACHE_BUST] -> любое число
+    assert "yandex.ru/ads/adfox/721500/" in url  # ${self.owner_id}
+    assert qs["p1"] == ["dfiza"]  # ${self.site_id}
+    assert qs["p2"] == ["hyxp"]  # ${self.placement_id}
+    assert "ext_duid" in qs  # [CACHE_BUST] -> любое число
 
     assert headers["X-Adfox-S2S-Key"] == "532..."
     assert headers["X-Real-IP"] == "91.240.123.86"
@@ -49,4 +48,225 @@ def test_dotted_macro_resolution(adfox_adapter, ctx):
 def test_cache_bust_unique(adfox_adapter, ctx):
     url1, *_ = adfox_adapter._build_request(ctx)
     url2, *_ = adfox_adapter._build_request(ctx)
-    assert url1 != url2, "CACHE_BUST macro should differ on subsequent calls"
\ No newline at end of file
+    assert url1 != url2, "CACHE_BUST macro should differ on subsequent calls"
+
+
+@pytest.mark.parametrize(
+    "spec",
+    [
+        {
+            "base_uri": "http://ssp.rambler.ru/vapirs",
+            "query": {"ip": "${device.ip}", "wl": "r w"},
+        },
+        {
+            "base_uri": "https://h/${self.owner_id}/x?a=1&b=&a=2#frag",
+            "query": {"b": "${self.site_id}", "c": "ü"},
+        },
+        {
+            "base_uri": "https://h/x?owner=${self.owner_id}",
+            "query": {"p": "${self.placement_id}"},
+        },
+        {
+            "base_uri": "https://h/x?a=1",
+            "method": "POST",
+            "query": {"p": "${device.ifa}"},
+        },
+        {
+            "base_uri": "https://h/${request_id}",
+            "headers": {"X-Ip": "${device.ip}", "X-Static": "1"},
+        },
+    ],
+)
+def test_request_plan_matches_generic_path(spec, ctx):
+    from pyvast.adapters.request_plan import RequestPlan
+    from pyvast.manifest.types import AdapterSpec
+
+    plan = RequestPlan(AdapterSpec(**spec))
+    url, headers, data = plan.render(ctx)
+    assert (url, data) == plan._render_slow(ctx)
+    assert headers == {
+        k: v.replace("${device.ip}", ctx["device"]["ip"])
+        for k, v in spec.get("headers", {}).items()
+    }
+
+
+def test_param_setters_resolved_at_load_and_applied(ctx):
+    import asyncio
+
+    import pydantic
+
+    from pyvast.adapters.request_plan import RequestPlan
+    from pyvast.manifest.types import AdapterSpec, ParamSetter
+    from pyvast.manifest.utils_param import resolve_param_setters
+
+    with pytest.raises(pydantic.ValidationError):
+        ParamSetter(target="query.x", factory={"fn": "pyvast.utils.factories:nope"})
+
+    setters = [
+        ParamSetter(
+            target="query.p1",
+            factory={
+                "fn": "pyvast.utils.factories:constant",
+                "args": ["${device.ifa}"],
+            },
+        ),
+        ParamSetter(
+            target="query.extra",
+            factory={"fn": "pyvast.utils.factories.constant", "args": ["e"]},
+        ),
+        ParamSetter(
+            target="header.X-Set",
+            factory={"fn": "pyvast.utils.factories:constant", "args": ["h"]},
+        ),
+    ]
+    query, headers = asyncio.run(resolve_param_setters(ctx, setters))
+    plan = RequestPlan(
+        AdapterSpec(
+            base_uri="https://h/x?a=1", query={"p1": "${self.site_id}", "p2": "v"}
+        )
+    )
+    url, hdrs, _ = plan.render(ctx, query, headers)
+    assert url == "https://h/x?a=1&p1=AAAA-BBBB&p2=v&extra=e"
+    assert url == plan._render_slow(ctx, query)[0]
+    assert hdrs == {"X-Set": "h"}
+
+
+def test_param_setter_awaits_sync_factory_returning_awaitable(ctx):
+    import asyncio
+    import warnings
+
+    from pyvast.manifest.types import ParamSetter
+    from pyvast.manifest.utils_param import resolve_param_setters
+
+    async def lookup(key, *, ctx):
+        return ctx["device"][key]
+
+    def wrapped(*args, **kwargs):  # e.g. a decorator that isn't marked async
+        return lookup(*args, **kwargs)
+
+    setter = ParamSetter(
+        target="query.ip",
+        factory={"fn": "pyvast.utils.factories:constant", "args": ["ip"]},
+    )
+    setter.factory._callable, setter.factory._is_async = wrapped, False
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # no "coroutine was never awaited"
+        query, _ = asyncio.run(resolve_param_setters(ctx, [setter]))
+    assert query == {"ip": ctx["device"]["ip"]}
+
+
+def dict_factory(*, ctx):
+    """A factory that relies on ctx being a dict."""
+    import json
+
+    assert isinstance(ctx, dict)
+    snapshot = ctx.copy()
+    snapshot["seen"] = 1
+    return json.dumps(ctx["device"], sort_keys=True)
+
+
+def test_param_setter_factories_get_a_plain_dict(ctx):
+    import asyncio
+    import json
+
+    from pyvast.manifest.types import ParamSetter
+    from pyvast.manifest.utils_param import resolve_param_setters
+
+    work_ctx = {**ctx, "extra": "x"}
+    setter = ParamSetter(
+        target="header.X-Dev", factory={"fn": "pyvast.tests.test_adapter:dict_factory"}
+    )
+    _, headers = asyncio.run(resolve_param_setters(work_ctx, [setter]))
+    assert json.loads(headers["X-Dev"]) == ctx["device"]
+    assert work_ctx == {**ctx, "extra": "x"}
+
+
+def test_adapter_registry_lazy_types_and_executor(monkeypatch):
+    import sys
+
+    from pyvast.adapters import registry
+    from pyvast.manifest.executor import ManifestExecutor
+    from pyvast.manifest.loader import ManifestLoader
+
+    monkeypatch.setattr(registry, "REGISTRY", dict(registry.REGISTRY))
+    monkeypatch.setattr(registry, "_scanned", True)  # no entry point scan in tests
+    sys.modules.pop("pyvast.adapters.mock", None)
+    assert isinstance(registry.REGISTRY["mock"], str)
+
+    model = ManifestLoader(Path("contrib/manifests/multi_ssp_demo.yml")).model
+    model.adapters["leto_rambler"].type = "mock"
+    ex = ManifestExecutor(model)
+    assert type(ex.adapters["leto_rambler_ssp"]).__name__ == "MockAdapter"
+    assert type(ex.adapters["adfox_ssp"]) is BaseHTTPAdapter
+    assert "pyvast.adapters.mock" in sys.modules and not isinstance(
+        registry.REGISTRY["mock"], str
+    )
+
+    model.adapters["adfox"].type = "nope"
+    with pytest.raises(KeyError, match="unknown adapter type 'nope'"):
+        ManifestExecutor(model)
+
+
+def test_streamed_body_gzip_cap_and_early_nofill():
+    import asyncio
+    import gzip
+    import time
+
+    import aiohttp
+    from aiohttp import web
+
+    from pyvast.exceptions import BodyTooLarge, NoFill
+    from pyvast.manifest.types import AdapterConfig, AdapterSpec
+
+    fill = "<VAST version='4.0'><Ad id='1'><InLine><AdTitle>ок</AdTitle></InLine></Ad></VAST>"
+
+    async def handler(request):
+        name = request.match_info["name"]
+        if name == "gzip":
+            resp = web.Response(text=fill, content_type="application/xml")
+            resp.enable_compression()
+            return resp
+        if name == "bomb":  # 60 KB compressed to a few hundred bytes
+            body = gzip.compress(
+                fill.replace("</VAST>", f"<!--{'x' * 60_000}--></VAST>").encode()
+            )
+            return web.Response(body=body, headers={"Content-Encoding": "gzip"})
+        if name == "empty":
+            return web.Response(text="")
+        # no-fill answer followed by a stalled tail
+        resp = web.StreamResponse()
+        await resp.prepare(request)
+        await resp.write(b'<?xml version="1.0"?><VAST version="4.0"></VAST>')
+        await asyncio.sleep(1)
+        await resp.write(b"\n" * 10)
+        return resp
+
+    async def go():
+        app = web.Application()
+        app.router.add_get("/{name}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        def adapter(name):
+            spec = AdapterSpec(base_uri=f"http://127.0.0.1:{port}/{name}")
+            return BaseHTTPAdapter(spec, AdapterConfig(max_body=10_000))
+
+        try:
+            async with aiohttp.ClientSession() as s:
+                assert await adapter("gzip").fetch({}, session=s) == fill
+                with pytest.raises(BodyTooLarge):
+                    await adapter("bomb").fetch({}, session=s)
+                with pytest.raises(NoFill):
+                    await adapter("empty").fetch({}, session=s)
+                t0 = time.perf_counter()
+                with pytest.raises(NoFill):
+                    await adapter("stall").fetch({}, session=s)
+                assert time.perf_counter() - t0 < 0.5
+        finally:
+            await runner.shutdown()
+            await runner.cleanup()
+
+    asyncio.run(go())
@@ -0,0 +1,154 @@
+import asyncio
+
+from aiohttp import web
+
+from pyvast.utils.event_tracker import PixelDispatcher, fire_pixels
+
+
+def test_dispatcher_retries_and_spools_overflow(tmp_path):
+    hits = []
+
+    async def pixel(request):
+        hits.append(request.query["i"])
+        if request.query["i"] == "0" and hits.count("0") < 2:
+            return web.Response(status=503)
+        return web.Response()
+
+    async def _go():
+        app = web.Application()
+        app.router.add_get("/p", pixel)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        spool = tmp_path / "pixels.jsonl"
+        try:
+            async with PixelDispatcher(
+                queue_size=4, workers=2, spool=spool, backoff=0.01, spool_interval=0.02
+            ) as d:
+                urls = [f"http://127.0.0.1:{port}/p?i={i}&u=[UUID]" for i in range(10)]
+                await fire_pixels(urls, {}, dispatcher=d)
+                assert d.spilled == 6
+                for _ in range(100):
+                    if d.sent == 10:
+                        break
+                    await asyncio.sleep(0.02)
+            return d, spool
+        finally:
+            await runner.cleanup()
+
+    d, spool = asyncio.run(_go())
+    assert (d.sent, d.failed) == (10, 0)
+    assert sorted(hits) == ["0", *map(str, range(10))]
+    assert not spool.exists()
+
+
+def test_spool_is_consumed_by_offset_and_survives_cancellation(tmp_path):
+    import json
+    import time
+
+    spool = tmp_path / "pixels.jsonl"
+    spool.write_text("".join(json.dumps({"url": f"http://h/{i}", "attempt": 0}) + "\n" for i in range(6)))
+
+    d = PixelDispatcher(spool=spool, queue_size=8, workers=1)
+    assert [u for u, _ in d._take_spooled(2)] == ["http://h/0", "http://h/1"]
+    assert d._spool_pos.read_text() == str(len(spool.read_bytes().splitlines(True)[0]) * 2)
+
+    take = d._take_spooled
+
+    def slow_take(n):
+        time.sleep(0.05)
+        return take(n)
+
+    async def _go():
+        d._take_spooled = slow_take
+        await d.start()
+        await asyncio.sleep(0.02)  # spool loop is inside the thread now
+        await d.close(drain_timeout=0)
+
+    asyncio.run(_go())
+    # the 4 taken during shutdown went to the queue, then back to the spool
+    lines = [json.loads(line)["url"] for line in spool.read_text().splitlines()]
+    assert lines == [f"http://h/{i}" for i in range(2, 6)]
+    assert not d._spool_pos.exists()
+
+
+def test_slow_host_does_not_hold_workers_from_other_hosts():
+    import time
+
+    done = {}
+
+    async def pixel(request):
+        if request.query["h"] == "slow":
+            await asyncio.sleep(0.3)
+        done[request.query["i"]] = time.perf_counter()
+        return web.Response()
+
+    async def _go():
+        app = web.Application()
+        app.router.add_get("/p", pixel)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        ports = []
+        for _ in range(2):  # two origins → two hosts for the per-host cap
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            ports.append(site._server.sockets[0].getsockname()[1])
+        slow, fast = (f"http://127.0.0.1:{p}/p" for p in ports)
+        try:
+            async with PixelDispatcher(workers=2, per_host=1) as d:
+                t0 = time.perf_counter()
+                d.submit([f"{slow}?h=slow&i=s{i}" for i in range(4)], {})
+                d.submit([f"{fast}?h=fast&i=f"], {})
+                for _ in range(200):
+                    if d.sent == 5:
+                        break
+                    await asyncio.sleep(0.02)
+                return d, t0
+        finally:
+            await runner.cleanup()
+
+    d, t0 = asyncio.run(_go())
+    assert d.sent == 5 and d.depth == 0
+    assert done["f"] - t0 < 0.2  # not stuck behind the slow host's queue
+    assert sorted(done, key=done.get)[1:] == ["s0", "s1", "s2", "s3"]
+
+
+def test_close_spools_a_send_in_flight_and_rejects_bad_limits(tmp_path):
+    import json
+
+    import pytest
+
+    for bad in ({"workers": 0}, {"per_host": 0}):
+        with pytest.raises(ValueError):
+            PixelDispatcher(**bad)
+
+    started = asyncio.Event()
+
+    async def pixel(request):
+        started.set()
+        await asyncio.sleep(0.5)
+        return web.Response()
+
+    async def _go():
+        app = web.Application()
+        app.router.add_get("/p", pixel)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        spool = tmp_path / "pixels.jsonl"
+        try:
+            d = await PixelDispatcher(workers=1, spool=spool, spool_interval=60).start()
+            d.submit([f"http://127.0.0.1:{port}/p?i=1"], {})
+            await asyncio.wait_for(started.wait(), 2)
+            await d.close(drain_timeout=0.05)
+            return d, spool
+        finally:
+            await runner.cleanup()
+
+    d, spool = asyncio.run(_go())
+    assert (d.sent, d.failed, d.spilled) == (0, 0, 1)
+    assert [json.loads(line)["url"].endswith("/p?i=1") for line in spool.read_text().splitlines()] == [True]
@@ -0,0 +1,398 @@
+import asyncio
+import time
+
+import pytest
+
+from pyvast.exceptions import NoFill
+from pyvast.manifest.executor import ManifestExecutor
+from pyvast.manifest.loader import ManifestLoader
+from pyvast.runtime import PoolConfig, Runtime
+
+
+def test_parallel_returns_fastest_fill_and_cancels_losers(fake_adapter, make_executor, run):
+    ex = make_executor()
+    slow = fake_adapter(1.0, "<slow/>")
+    ex.adapters["adfox_ssp"] = slow
+    ex.adapters["leto_rambler_ssp"] = fake_adapter(0.01, "<fast/>")
+
+    t0 = time.perf_counter()
+    assert run(ex) == "<fast/>"
+    assert time.perf_counter() - t0 < 0.5
+    assert slow.cancelled
+
+
+def test_parallel_priority_waits_for_better_endpoint(fake_adapter, make_executor, run):
+    ex = make_executor(select="priority")
+    ex.adapters["adfox_ssp"] = fake_adapter(0.05, "<adfox/>")
+    ex.adapters["leto_rambler_ssp"] = fake_adapter(0.0, "<leto/>")
+    assert run(ex) == "<adfox/>"
+
+
+def test_waterfall_falls_through_to_nofill(fake_adapter, make_executor, run):
+    ex = make_executor(mode="waterfall")
+    ex.adapters["adfox_ssp"] = fake_adapter(0.0)
+    ex.adapters["leto_rambler_ssp"] = fake_adapter(0.0)
+    with pytest.raises(NoFill):
+        run(ex)
+
+
+def test_deadline_caps_waterfall(fake_adapter, make_executor, run):
+    ex = make_executor(mode="waterfall")
+    ex.adapters["adfox_ssp"] = fake_adapter(1.0, "<slow/>")
+    ex.adapters["leto_rambler_ssp"] = fake_adapter(1.0, "<slow/>")
+
+    t0 = time.perf_counter()
+    with pytest.raises(NoFill):
+        run(ex, deadline=0.1)
+    assert time.perf_counter() - t0 < 0.5
+
+    assert not ex.health["adfox_ssp"].samples  # the request budget expired, not the SSP's timeout
+
+
+def test_endpoint_timeout_is_recorded_against_breaker(fake_adapter, make_executor, run):
+    ex = make_executor(mode="waterfall")
+    ex.model.adapters["adfox"].config.timeout = 0.02
+    ex.adapters["adfox_ssp"] = fake_adapter(1.0, "<slow/>")
+    ex.adapters["leto_rambler_ssp"] = fake_adapter(0.0, "<leto/>")
+    assert run(ex, deadline=1.0) == "<leto/>"
+    assert ex.health["adfox_ssp"].counts["timeout"] == 1
+
+
+def test_context_manager_reuses_pooled_session(fake_adapter, make_executor):
+    ex = make_executor()
+    seen = []
+
+    class Spy(fake_adapter):
+        async def fetch(self, ctx, *, session=None):
+            seen.append(session)
+            return await super().fetch(ctx, session=session)
+
+    ex.adapters["adfox_ssp"] = Spy(0.0, "<a/>")
+    ex.adapters["leto_rambler_ssp"] = Spy(0.0, "<b/>")
+
+    async def _go():
+        async with Runtime(PoolConfig(warmup=False, warm_interval=0)) as rt:
+            ex.runtime = rt
+            async with ex:
+                await ex.execute({})
+                await ex.execute({})
+            assert not rt.session.closed
+            return rt.session
+
+    session = asyncio.run(_go())
+    assert seen and all(s is session for s in seen)
+    assert session.closed
+
+
+def test_keep_warm_is_opt_in_and_pings_only_used_origins(demo_manifest, fake_adapter):
+    model = ManifestLoader(demo_manifest).model
+    model.adapters["leto_rambler"].config.warm = True
+    ex = ManifestExecutor(model)
+    ex.adapters["adfox_ssp"] = fake_adapter(0.0)
+    ex.adapters["leto_rambler_ssp"] = fake_adapter(0.0, "<a/>")
+    pinged = []
+
+    async def _go():
+        async with Runtime(PoolConfig(warmup=False, warm_interval=0.05)) as rt:
+
+            async def ping(origins):
+                pinged.append(set(origins))
+
+            rt._ping = ping
+            ex.runtime = rt
+            async with ex:
+                assert rt.origins == {"http://ssp.rambler.ru"}  # adfox did not opt in
+                await asyncio.sleep(0.08)  # a tick without traffic pings nothing
+                await ex.execute({})
+                await asyncio.sleep(0.12)  # next tick pings it, the one after doesn't
+
+    asyncio.run(_go())
+    assert pinged == [{"http://ssp.rambler.ru"}]
+
+
+def test_breaker_skips_failing_endpoint_then_probes(fake_adapter, make_executor, run):
+    ex = make_executor(mode="waterfall")
+    ex.endpoints["adfox_ssp"].breaker.consecutive_failures = 2
+    ex.endpoints["adfox_ssp"].breaker.cooldown = 0.05
+    bad = fake_adapter(0.0, "<bad/>")
+    calls = []
+
+    async def boom(ctx, *, session=None):
+        calls.append(1)
+        raise ConnectionError("down")
+
+    bad.fetch = boom
+    ex.adapters["adfox_ssp"] = bad
+    ex.adapters["leto_rambler_ssp"] = fake_adapter(0.0, "<leto/>")
+
+    for _ in range(4):
+        assert run(ex) == "<leto/>"
+    assert len(calls) == 2 and ex.breakers["adfox_ssp"].state == "open"
+
+    time.sleep(0.06)
+    ex.adapters["adfox_ssp"] = fake_adapter(0.0, "<adfox/>")
+    assert run(ex) == "<adfox/>"
+    assert ex.breakers["adfox_ssp"].state == "closed"
+    assert ex.health["leto_rambler_ssp"].fill_rate == 1.0
+
+
+def test_breaker_only_probes_decide_in_half_open():
+    from pyvast.manifest.types import BreakerConfig
+    from pyvast.utils.health import CircuitBreaker, EndpointHealth
+
+    br = CircuitBreaker(BreakerConfig(consecutive_failures=1, cooldown=0.0), EndpointHealth())
+    early = br.allow()  # admitted while closed, answers late
+    assert early == 0
+    br.record(0.1, "error", br.allow())
+    assert br.state == "open"
+
+    probe = br.allow()
+    assert probe and br.state == "half_open" and br.allow() is None
+    br.record(0.1, "fill", early)  # a pre-open success neither closes nor frees the probe slot
+    assert br.state == "half_open" and br.allow() is None
+    br.record(0.1, "error", probe)
+    assert br.state == "open"
+
+    stale, fresh = probe, br.allow()  # next half-open period
+    assert fresh != stale
+    br.record(0.1, "fill", stale)
+    assert br.state == "half_open"
+    br.record(0.1, "fill", fresh)
+    assert br.state == "closed"
+    # closing restarts the breaker's failure window only; health stats carry on
+    assert not br.failures and br.failed == 0
+    assert len(br.health.samples) == br.health.total == 5 and br.health.counts["error"] == 2
+
+
+def test_hedge_starts_next_endpoint_when_first_is_slow(fake_adapter, make_executor, run):
+    from pyvast.manifest.types import HedgeConfig
+
+    ex = make_executor(mode="waterfall", hedge=HedgeConfig(delay=0.02, max_rate=1.0))
+    slow = fake_adapter(1.0, "<slow/>")
+    ex.adapters["adfox_ssp"] = slow
+    ex.adapters["leto_rambler_ssp"] = fake_adapter(0.01, "<hedge/>")
+
+    t0 = time.perf_counter()
+    assert run(ex) == "<hedge/>"
+    assert time.perf_counter() - t0 < 0.5 and slow.cancelled
+
+    budget = ex.hedge_budgets["g1"]
+    budget.tokens, budget.rate = 0.0, 0.0  # budget exhausted → plain waterfall
+    ex.adapters["adfox_ssp"] = fake_adapter(0.1, "<slow/>")
+    assert run(ex) == "<slow/>"
+
+
+def test_hedged_failure_starts_next_endpoint_without_a_token(demo_manifest, fake_adapter, run):
+    from pyvast.manifest.types import EndpointDef, HedgeConfig
+
+    model = ManifestLoader(demo_manifest).model
+    model.endpoints.append(EndpointDef(id="third", name="Third", adapter_id="adfox"))
+    group = model.groups[0]
+    group.mode, group.endpoints = "waterfall", [*group.endpoints, "third"]
+    group.hedge = HedgeConfig(delay=0.02, max_rate=0.0)  # one hedge token, never refilled
+    ex = ManifestExecutor(model)
+    ex.adapters["adfox_ssp"] = fake_adapter(1.0, "<slow/>")
+    ex.adapters["leto_rambler_ssp"] = fake_adapter(0.03)  # the hedge fails while adfox still runs
+    ex.adapters["third"] = fake_adapter(0.01, "<third/>")
+
+    t0 = time.perf_counter()
+    assert run(ex) == "<third/>"
+    assert time.perf_counter() - t0 < 0.5
+
+
+def test_hedge_percentile_is_cached_between_samples():
+    from pyvast.utils.health import EndpointHealth
+
+    h = EndpointHealth()
+    for i in range(20):
+        h.record(i / 100, "fill")
+    p = h.percentile_cached(50, every=5)
+    h.record(10.0, "fill")
+    assert h.percentile_cached(50, every=5) == p  # not re-sorted yet
+    for _ in range(4):
+        h.record(10.0, "fill")
+    assert h.percentile_cached(50, every=5) == h.percentile(50) != p
+
+
+def _vast(*ads):
+    body = "".join(
+        f'<Ad id="{i}"><InLine><AdSystem>s</AdSystem><Creatives><Creative adId="{cid}"><Linear>'
+        f"<Duration>00:00:{dur:02d}</Duration><MediaFiles><MediaFile>https://cdn/{cid}.mp4</MediaFile>"
+        "</MediaFiles></Linear></Creative></Creatives></InLine></Ad>"
+        for i, cid, dur in ads
+    )
+    return f'<VAST version="4.1">{body}</VAST>'
+
+
+def test_parallel_pod_merges_fills_dedupes_and_caps_duration(fake_adapter, make_executor, run):
+    from pyvast.manifest.types import PodConfig
+    from pyvast.vast import parse_vast
+
+    ex = make_executor(pod=PodConfig(max_duration=40))
+    ex.adapters["adfox_ssp"] = fake_adapter(0.02, _vast(("a1", "x", 15), ("a2", "y", 30)))
+    ex.adapters["leto_rambler_ssp"] = fake_adapter(0.0, _vast(("b1", "x", 15), ("b2", "z", 20)))
+
+    pod = parse_vast(run(ex))
+    # adfox ranks first; a2 overflows 40s, leto's "x" is a duplicate
+    assert [(a.id, a.sequence) for a in pod.ads] == [("a1", 1), ("b2", 2)]
+    assert pod.version == "4.1"
+    assert set(asyncio.run(ex.execute_profiled({})).stages) == {"parse", "pod"}
+
+
+def test_execute_profiled_reports_stages_per_attempt():
+    from aiohttp import web
+
+    from pyvast.manifest.types import ManifestModel
+
+    FILL = "<VAST version='4.0'><Ad><InLine/></Ad></VAST>"
+
+    async def vast(request):
+        await asyncio.sleep(0.01)
+        if request.match_info["name"] == "down":
+            return web.Response(status=500)
+        return web.Response(text=FILL, content_type="application/xml")
+
+    async def go():
+        app = web.Application()
+        app.router.add_get("/{name}", vast)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        adapters = {n: {"spec": {"base_uri": f"http://127.0.0.1:{port}/{n}", "query": {"ip": "${device.ip}"}},
+                        "config": {"timeout": 1.0}} for n in ("down", "up")}
+        model = ManifestModel(
+            id="p", adapters=adapters,
+            endpoints=[{"id": n, "name": n, "adapter_id": n} for n in adapters],
+            groups=[{"id": "w", "endpoints": ["down", "up"]}],
+        )
+        try:
+            async with Runtime(PoolConfig(warmup=False, warm_interval=0, trace_connect=True)) as rt:
+                async with ManifestExecutor(model, runtime=rt) as ex:
+                    return await ex.execute_profiled({"device": {"ip": "1.2.3.4"}})
+        finally:
+            await runner.cleanup()
+
+    prof = asyncio.run(go())
+    assert prof.outcome == "fill" and prof.xml == FILL and prof.group == "w"
+    down, up = prof.attempts
+    assert (down.endpoint, down.outcome, up.outcome) == ("down", "error", "fill")
+    assert "connect" in down.stages  # first request opens the connection, "up" reuses it
+    assert {"setters", "render", "ttfb", "body", "parse"} <= set(up.stages)
+    assert up.stages["ttfb"] >= 0.009 and up.total >= sum(up.stages.values()) * 0.99
+    assert prof.as_dict()["attempts"][1]["cached"] is False
+
+
+def test_execute_many_bounded_and_completion_ordered(fake_adapter, make_executor):
+    ex = make_executor()
+    ex.adapters["adfox_ssp"] = fake_adapter(0.0)
+
+    class Tracking(fake_adapter):
+        inflight = peak = 0
+
+        async def fetch(self, ctx, *, session=None):
+            Tracking.inflight += 1
+            Tracking.peak = max(Tracking.peak, Tracking.inflight)
+            try:
+                await asyncio.sleep(0.02 if ctx["i"] % 2 else 0.001)
+                return f"<VAST i='{ctx['i']}'/>"
+            finally:
+                Tracking.inflight -= 1
+
+    ex.adapters["leto_rambler_ssp"] = Tracking(0)
+    pulled = []
+
+    def contexts():
+        for i in range(40):
+            pulled.append(i)
+            yield {"i": i}
+
+    async def go():
+        out = []
+        async for r in ex.execute_many(contexts(), concurrency=4):
+            assert len(pulled) <= r.index + 1 + 4 * 2  # input is pulled lazily
+            out.append(r)
+        return out
+
+    results = asyncio.run(go())
+    assert sorted(r.index for r in results) == list(range(40))
+    assert all(r.outcome == "fill" and r.xml == f"<VAST i='{r.ctx['i']}'/>" for r in results)
+    assert Tracking.peak <= 4
+    assert [r.index for r in results] != list(range(40))  # fast ones overtake slow ones
+
+
+def test_execute_many_close_early_cancels(fake_adapter, make_executor):
+    ex = make_executor()
+    slow = fake_adapter(5.0, "<slow/>")
+
+    class ByCtx:
+        async def fetch(self, ctx, *, session=None):
+            if ctx.get("fast"):
+                return "<fast/>"
+            return await slow.fetch(ctx)
+
+    ex.adapters["adfox_ssp"] = fake_adapter(0.0)
+    ex.adapters["leto_rambler_ssp"] = ByCtx()
+
+    async def go():
+        agen = ex.execute_many(iter([{}, {"fast": True}, {}]), concurrency=3)
+        first = await agen.__anext__()
+        await agen.aclose()
+        return first
+
+    t0 = time.perf_counter()
+    assert asyncio.run(go()).ctx == {"fast": True}
+    assert slow.cancelled and time.perf_counter() - t0 < 1.0
+
+
+def test_execute_many_none_context_does_not_end_the_stream(fake_adapter, make_executor):
+    ex = make_executor()
+    ex.adapters["adfox_ssp"] = fake_adapter(0.0)
+    ex.adapters["leto_rambler_ssp"] = fake_adapter(0.0, "<a/>")
+
+    async def agen():
+        for ctx in ({}, None, {}):
+            yield ctx
+
+    async def go(source):
+        return [r async for r in ex.execute_many(source)]
+
+    for source in (lambda: iter([{}, None, {}]), agen):
+        results = sorted(asyncio.run(go(source())), key=lambda r: r.index)
+        assert [r.index for r in results] == [0, 1, 2] and results[1].ctx is None
+
+
+def test_http_only_manifest_does_not_import_lxml(demo_manifest):
+    import subprocess
+    import sys
+
+    code = (
+        "import sys\n"
+        "from pathlib import Path\n"
+        "from pyvast.manifest.executor import ManifestExecutor\n"
+        "from pyvast.manifest.loader import ManifestLoader\n"
+        f"ManifestExecutor(ManifestLoader(Path({str(demo_manifest)!r})).model)\n"
+        "assert 'lxml' not in sys.modules, 'lxml imported'\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)  # a fresh interpreter: ours has lxml
+
+
+def test_attempts_share_the_request_macro_index(fake_adapter, make_executor, run):
+    from pyvast.utils.macro import current_macros
+
+    seen = []
+
+    class Capture(fake_adapter):
+        async def fetch(self, ctx, *, session=None):
+            index = current_macros.get()
+            seen.append((index, index.serves(ctx)))
+            return await super().fetch(ctx, session=session)
+
+    ex = make_executor()
+    ex.adapters["adfox_ssp"] = Capture(0.0)
+    ex.adapters["leto_rambler_ssp"] = Capture(0.0, "<VAST/>")
+    run(ex)
+    (a, a_ok), (b, b_ok) = seen
+    assert a is b and a_ok and b_ok
+    assert current_macros.get() is None
@@ -0,0 +1,56 @@
+import asyncio
+
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+from pyvast.utils import instrumentation
+from pyvast.utils.instrumentation import configure, traced
+
+
+def test_tracing_modes():
+    try:
+        configure(tracing="auto")  # no SDK TracerProvider installed in tests
+        assert traced("x") is instrumentation._NO_SPAN
+        configure(tracing="off")
+        assert traced("x") is instrumentation._NO_SPAN
+        configure(tracing="on")
+        assert traced("x") is not instrumentation._NO_SPAN
+        configure(tracing="0.0")
+        assert all(traced("x") is instrumentation._NO_SPAN for _ in range(100))
+
+        async def use():
+            configure(tracing="on")
+            async with traced("vast.http", url="u"):
+                pass
+
+        asyncio.run(use())
+    finally:
+        configure(tracing="auto")
+
+
+def test_endpoint_metrics_recorded(fake_adapter, make_executor, run):
+    reader = InMemoryMetricReader()
+    provider = MeterProvider(metric_readers=[reader])
+    instrumentation.metrics.use(provider)  # local: the global provider stays untouched
+    try:
+        ex = make_executor()
+        ex.adapters["adfox_ssp"] = fake_adapter(0.0)
+        ex.adapters["leto_rambler_ssp"] = fake_adapter(0.01, "<VAST/>")
+        run(ex)
+        data = reader.get_metrics_data()
+    finally:
+        instrumentation.metrics.use(None)
+        provider.shutdown()
+
+    points = {}
+    for rm in data.resource_metrics:
+        for sm in rm.scope_metrics:
+            for m in sm.metrics:
+                for p in m.data.data_points:
+                    points[(m.name, tuple(sorted(p.attributes.items())))] = p
+    outcomes = {k[1]: p.value for k, p in points.items() if k[0] == "pyvast.endpoint.outcomes"}
+    assert outcomes[(("endpoint", "adfox_ssp"), ("outcome", "nofill"))] >= 1
+    assert outcomes[(("endpoint", "leto_rambler_ssp"), ("outcome", "fill"))] >= 1
+    dur = points[("pyvast.endpoint.duration", (("endpoint", "leto_rambler_ssp"), ("outcome", "fill")))]
+    assert dur.count >= 1 and dur.sum >= 0.01
+    assert points[("pyvast.executor.inflight", ())].value == 0
@@ -0,0 +1,47 @@
+import asyncio
+import json
+
+import pytest
+
+from pyvast.loadgen import load_corpus, run_load
+
+
+@pytest.fixture
+def executor(make_executor, fake_adapter):
+    ex = make_executor()
+    ex.adapters["adfox_ssp"] = fake_adapter(0.001)  # always NoFill
+    ex.adapters["leto_rambler_ssp"] = fake_adapter(0.002, "<VAST/>")
+    return ex
+
+
+def test_load_corpus_json_and_jsonl(tmp_path):
+    (tmp_path / "one.json").write_text(json.dumps({"a": 1}))
+    (tmp_path / "many.jsonl").write_text('{"a": 1}\n\n{"a": 2}\n')
+    assert load_corpus(tmp_path / "one.json") == [{"a": 1}]
+    assert load_corpus(tmp_path / "many.jsonl") == [{"a": 1}, {"a": 2}]
+
+
+@pytest.mark.parametrize("mode", [{"concurrency": 4}, {"rps": 200}])
+def test_run_load_reports_latency_and_endpoint_fill(executor, mode):
+    report = asyncio.run(run_load(executor, [{}], duration=0.2, **mode))
+    s = report.summary()
+    assert s["requests"] > 10 and s["fill"] == s["requests"]
+    assert s["latency_ms"]["p50"] <= s["latency_ms"]["p99"]
+    assert s["endpoints"]["adfox_ssp"]["fill_rate"] == 0.0
+    assert s["endpoints"]["leto_rambler_ssp"]["fill_rate"] == 1.0
+    assert sum(c for _, c in report.histogram()) == s["requests"]
+    assert report.loop_lag
+
+
+def test_run_load_requires_one_mode(executor):
+    with pytest.raises(ValueError):
+        asyncio.run(run_load(executor, [{}], duration=0.1))
+
+
+def test_run_load_endpoint_p95_ignores_earlier_health_samples(executor):
+    for _ in range(200):  # a slow history from before the run
+        executor.health["leto_rambler_ssp"].record(5.0, "fill")
+    report = asyncio.run(run_load(executor, [{}], duration=0.2, concurrency=2))
+    ep = report.summary()["endpoints"]["leto_rambler_ssp"]
+    assert ep["attempts"] == ep["fill"] > 0
+    assert ep["p95_ms"] < 1000
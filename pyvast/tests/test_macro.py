@@ -0,0 +1,51 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from pyvast.utils.macro import MacroIndex, compile_template, interpolate_macros
+
+
+CTX = json.loads(Path("contrib/ctx/demo.json").read_text())
+CTX.update({"Mixed": "m", "zero": 0, "lower": {"k": "v"}})
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "https://yandex.ru/ads/adfox/${self.owner_id}/getCodeTest",
+        "${device.ip}|[request_id]|%%EVENT_TYPE%%|$$date$$|{{ self.site_id }}",
+        "${Mixed}/${MIXED}/${zero}/${SELF.OWNER_ID}/${LOWER.K}",
+        "[UNKNOWN] ${missing.path} %%NOPE%% tail",
+        "no macros at all",
+        "",
+    ],
+)
+def test_compiled_matches_interpolate(text):
+    assert compile_template(text).render(CTX) == interpolate_macros(text, CTX)
+    index = MacroIndex(CTX)
+    for _ in range(2):  # resolving, then from the index
+        assert compile_template(text).render(CTX, index) == interpolate_macros(text, CTX)
+
+
+def test_macro_index_resolves_each_key_once_per_request():
+    base = {"device": {"ip": "1.1.1.1"}, "ID": 7}
+    index = MacroIndex(base)
+    copy = index.copy()
+    tpl = compile_template("${device.ip}/[id]/${UUID}")
+    assert tpl.render_key(copy, index) == "1.1.1.1/7/${UUID}"
+    assert index.values == {"device.ip": "1.1.1.1", "id": "7"}
+    assert index.serves(base) and index.serves(copy)
+    assert not index.serves(dict(base)) and not index.serves({**copy, "x": 1})
+
+
+def test_builtins_render_fresh_values():
+    tpl = compile_template("cb=[CACHE_BUST]")
+    assert tpl.volatile and not tpl.is_static
+    assert tpl.render({}) != tpl.render({})
+
+
+def test_render_key_masks_volatile_macros():
+    tpl = compile_template("https://h/${self.site_id}?cb=[CACHE_BUST]&u=${UUID}")
+    assert tpl.render_key(CTX) == "https://h/dfiza?cb=[CACHE_BUST]&u=${UUID}"
+    assert tpl.render_key(CTX) == tpl.render_key(CTX)
@@ -0,0 +1,176 @@
+import asyncio
+import os
+from pathlib import Path
+
+from pyvast.manifest.loader import ManifestLoader
+from pyvast.manifest.reload import HotExecutor
+from pyvast.runtime import PoolConfig, Runtime
+
+
+DEMO_MANIFEST = Path("contrib/manifests/multi_ssp_demo.yml")
+
+
+def test_compiled_manifest_cache(tmp_path, monkeypatch):
+    first = ManifestLoader(DEMO_MANIFEST, cache_dir=tmp_path)
+    assert not first.from_cache and list(tmp_path.glob("*.json"))
+
+    again = ManifestLoader(DEMO_MANIFEST, cache_dir=tmp_path)
+    assert again.from_cache and again.model == first.model
+
+    (tmp_path / f"{first.digest}.json").write_bytes(b"garbage")
+    assert not ManifestLoader(DEMO_MANIFEST, cache_dir=tmp_path).from_cache
+
+    # an artifact written for another schema is still checked, never trusted blindly
+    (tmp_path / f"{first.digest}.json").write_text('{"id": "x", "adapters": {"a": {"spec": {}}}}')
+    assert not ManifestLoader(DEMO_MANIFEST, cache_dir=tmp_path).from_cache
+
+    # a schema change (new model field) moves the key
+    from pyvast.manifest import loader
+    from pyvast.manifest.types import ManifestModel
+
+    monkeypatch.setattr(ManifestModel, "model_json_schema", classmethod(lambda cls: {"changed": True}))
+    loader._abi.cache_clear()
+    try:
+        assert ManifestLoader(DEMO_MANIFEST, cache_dir=tmp_path).digest != first.digest
+    finally:
+        monkeypatch.undo()
+        loader._abi.cache_clear()
+
+
+def test_hot_reload_swaps_executor_and_keeps_inflight(tmp_path):
+    path = tmp_path / "m.yml"
+    text = DEMO_MANIFEST.read_text()
+    path.write_text(text)
+
+    async def go():
+        async with Runtime(PoolConfig(warmup=False, warm_interval=0)) as rt:
+            async with HotExecutor(path, runtime=rt, cache_dir=tmp_path, interval=0.01) as hx:
+                old = hx.executor
+                old.breakers[old.model.endpoints[0].id].streak = 3
+
+                path.write_text(text.replace(old.model.id, "renamed", 1))
+                st = os.stat(path)
+                os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+                for _ in range(200):
+                    if hx.reloads:
+                        break
+                    await asyncio.sleep(0.01)
+
+                assert hx.reloads == 1 and hx.executor is not old
+                assert hx.executor.model.id == "renamed" and old.model.id != "renamed"
+                eid = old.model.endpoints[0].id
+                assert hx.executor.breakers[eid] is old.breakers[eid]
+
+                path.write_text("id: [broken")
+                assert not await hx.reload()
+                assert hx.executor.model.id == "renamed"
+
+    asyncio.run(go())
+
+
+def test_hot_reload_survives_bad_references(tmp_path):
+    import pytest
+
+    path = tmp_path / "m.yml"
+    text = DEMO_MANIFEST.read_text()
+    path.write_text(text)
+
+    with pytest.raises(ValueError, match="unknown adapter_id"):
+        ManifestLoader(text.replace("adapter_id: adfox", "adapter_id: nope"))
+    with pytest.raises(ValueError, match="unknown endpoints"):
+        ManifestLoader(text.replace("[adfox_ssp, leto_rambler_ssp]", "[adfox_ssp, nope]"))
+
+    def edit(new):
+        path.write_text(new)
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    async def wait_for(cond):
+        for _ in range(200):
+            if cond():
+                return
+            await asyncio.sleep(0.01)
+
+    async def go():
+        async with Runtime(PoolConfig(warmup=False, warm_interval=0)) as rt:
+            async with HotExecutor(path, runtime=rt, cache_dir=tmp_path, interval=0.01) as hx:
+                # fails validation, then passes it but names an unknown adapter type
+                for bad in (text.replace("adapter_id: adfox", "adapter_id: nope"),
+                            text.replace("  leto_rambler:\n", "  leto_rambler:\n    type: nope\n")):
+                    edit(bad)
+                    await wait_for(lambda: hx._stat == hx._file_stat())
+                    await asyncio.sleep(0.03)
+                    assert not hx._task.done() and hx.reloads == 0
+
+                edit(text.replace("id: demo", "id: fixed", 1))
+                await wait_for(lambda: hx.reloads)
+                assert hx.executor.model.id == "fixed" and not hx._task.done()
+
+    asyncio.run(go())
+
+
+def test_registry_lazy_lru_and_shared_adapters(tmp_path):
+    from pyvast.manifest.registry import ManifestRegistry
+
+    text = DEMO_MANIFEST.read_text()
+    for name in ("a", "b", "c"):
+        (tmp_path / f"{name}.yml").write_text(text)
+
+    async def go():
+        async with Runtime(PoolConfig(warmup=False, warm_interval=0)) as rt:
+            reg = ManifestRegistry(tmp_path, runtime=rt, max_executors=2)
+            assert len(reg) == 0  # nothing loaded up front
+
+            a, a2 = await asyncio.gather(reg.get("a"), reg.get("a"))
+            assert a is a2 and reg.loads == 1
+            b = await reg.get("b")
+            assert b.adapters == a.adapters
+            assert all(b.adapters[k] is a.adapters[k] for k in a.adapters)
+            assert all(b.model.adapters[k] is a.model.adapters[k] for k in a.model.adapters)
+
+            await reg.get("c")
+            assert "a" not in reg and reg.evictions == 1
+
+            for bad in ("missing", "../a", ".hidden"):
+                try:
+                    await reg.get(bad)
+                except KeyError:
+                    pass
+                else:
+                    raise AssertionError(bad)
+
+    asyncio.run(go())
+
+
+def test_registry_prunes_pool_on_eviction_and_ignores_stale_loads():
+    import gc
+
+    import yaml
+
+    from pyvast.manifest.registry import ManifestRegistry
+
+    base = yaml.safe_load(DEMO_MANIFEST.read_text())
+
+    def tenant(n):
+        m = yaml.safe_load(yaml.safe_dump(base))
+        m["id"] = f"t{n}"
+        for a in m["adapters"].values():
+            a["spec"]["base_uri"] += f"?t={n}"  # adapters nobody else shares
+        return m
+
+    async def go():
+        reg = ManifestRegistry(max_executors=1)
+        for n in range(5):
+            reg.register(f"t{n}", tenant(n))
+            await reg.get(f"t{n}")
+        gc.collect()
+        only = reg._executors["t4"]
+        assert set(reg.pool.adapters.values()) == set(only.adapters.values())
+
+        reg.register("x", tenant(1))
+        pending = asyncio.ensure_future(reg.get("x"))
+        await asyncio.sleep(0)  # the load of t1's manifest is running
+        reg.register("x", tenant(2))
+        assert (await pending).model.id == "t2" and reg._executors["x"].model.id == "t2"
+
+    asyncio.run(go())
@@ -0,0 +1,105 @@
+import asyncio
+
+import aiohttp
+
+from pyvast.adapters.request_plan import RequestPlan
+from pyvast.manifest.types import AdapterSpec
+from pyvast.utils.response_cache import ResponseCache
+
+
+def test_cache_key_ignores_volatile_macros():
+    plan = RequestPlan(AdapterSpec(base_uri="https://h/x", query={"ip": "${ip}", "cb": "[CACHE_BUST]"}))
+    assert plan.cache_key({"ip": "1"}) == plan.cache_key({"ip": "1"})
+    assert plan.cache_key({"ip": "1"}) != plan.cache_key({"ip": "2"})
+
+
+def test_stale_while_revalidate():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return f"v{len(calls)}"
+
+    async def _go():
+        cache = ResponseCache(ttl=0.0, stale_ttl=60.0, maxsize=1)
+        assert await cache.get_or_fetch("k", fetch) == "v1"  # miss
+        assert await cache.get_or_fetch("k", fetch) == "v1"  # stale → refresh
+        await asyncio.sleep(0)
+        await asyncio.gather(*cache._tasks)
+        assert cache.get("k")[0] == "v2"
+        await cache.get_or_fetch("other", fetch)  # evicts "k"
+        return cache
+
+    cache = asyncio.run(_go())
+    assert len(cache) == 1 and cache.get("k") == (None, False)
+    assert (cache.misses, cache.stale_hits) == (2, 1)
+
+
+def test_nofills_are_cached_only_with_nofill_ttl():
+    import pytest
+
+    from pyvast.exceptions import NoFill
+
+    calls = []
+
+    async def nofill():
+        calls.append(1)
+        raise NoFill("empty")
+
+    async def _go(cache):
+        for _ in range(3):
+            with pytest.raises(NoFill):
+                await cache.get_or_fetch("k", nofill)
+
+    asyncio.run(_go(ResponseCache(ttl=60.0)))
+    assert len(calls) == 3  # default: every no-fill goes upstream
+
+    calls.clear()
+    cache = ResponseCache(ttl=60.0, stale_ttl=60.0, nofill_ttl=60.0)
+    asyncio.run(_go(cache))
+    assert len(calls) == 1 and (cache.misses, cache.hits) == (1, 2)
+    fresh_until, stale_until, _ = cache._data["k"]
+    assert fresh_until == stale_until  # no stale window for no-fills
+
+
+def test_adapter_revalidates_stale_entries_only_on_runtime_session():
+    from aiohttp import web
+
+    from pyvast.adapters.base_http import BaseHTTPAdapter
+    from pyvast.manifest.types import AdapterConfig, ResponseCacheConfig
+    from pyvast.runtime import PoolConfig, Runtime
+
+    hits = []
+
+    async def _go():
+        async def handler(request):
+            hits.append(1)
+            return web.Response(text=f"<VAST version='4.0'><Ad id='{len(hits)}'><InLine/></Ad></VAST>")
+
+        app = web.Application()
+        app.router.add_get("/ad", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        config = AdapterConfig(cache=ResponseCacheConfig(ttl=0.0, stale_ttl=60.0))
+        try:
+            # throwaway session: a stale entry is a miss, nothing runs after the request
+            adapter = BaseHTTPAdapter(AdapterSpec(base_uri=f"http://127.0.0.1:{port}/ad"), config)
+            for i in (1, 2):
+                async with aiohttp.ClientSession() as s:
+                    assert f"id='{i}'" in await adapter.fetch({}, session=s)
+            assert not adapter.cache._tasks and adapter.cache.stale_hits == 0
+
+            # Runtime session: served stale, refreshed in the background after the request
+            adapter = BaseHTTPAdapter(AdapterSpec(base_uri=f"http://127.0.0.1:{port}/ad"), config)
+            async with Runtime(PoolConfig(warmup=False, warm_interval=0)) as rt:
+                assert "id='3'" in await adapter.fetch({}, session=rt.session)
+                assert "id='3'" in await adapter.fetch({}, session=rt.session)
+                await asyncio.gather(*adapter.cache._tasks)
+                assert "id='4'" in adapter.cache.get(next(iter(adapter.cache._data)))[0]
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(_go())
@@ -0,0 +1,129 @@
+import asyncio
+
+import aiohttp
+from aiohttp import web
+
+from pyvast.server import ServeConfig, _bind, context_from_query, run_worker, serve
+
+
+MANIFEST = """
+id: served
+adapters:
+  up:
+    spec:
+      base_uri: "http://127.0.0.1:{port}/ad"
+      query:
+        fill: "${{self.fill}}"
+        slow: "${{self.slow}}"
+    config:
+      timeout: 2.0
+endpoints:
+  - id: up_ssp
+    name: Upstream
+    adapter_id: up
+groups:
+  - id: g1
+    priority: 1
+    mode: waterfall
+    endpoints: [up_ssp]
+"""
+
+
+def test_context_from_query_nests_dotted_keys():
+    ctx = context_from_query({"device.ip": "1.2.3.4", "self.site_id": "s", "deadline": "0.5"})
+    assert ctx == {"device": {"ip": "1.2.3.4"}, "self": {"site_id": "s"}, "deadline": "0.5"}
+
+
+def test_serve_fill_nofill_and_graceful_drain(tmp_path):
+    async def upstream(request):
+        if request.query.get("slow") == "1":
+            await asyncio.sleep(0.3)
+        if request.query.get("fill") != "1":
+            return web.Response(status=500)
+        return web.Response(text="<VAST version='4.0'><Ad id='a'><InLine/></Ad></VAST>",
+                            content_type="application/xml")
+
+    async def go():
+        app = web.Application()
+        app.router.add_get("/ad", upstream)
+        up = web.AppRunner(app)
+        await up.setup()
+        site = web.TCPSite(up, "127.0.0.1", 0)
+        await site.start()
+        up_port = site._server.sockets[0].getsockname()[1]
+
+        path = tmp_path / "m.yml"
+        path.write_text(MANIFEST.format(port=up_port))
+        sock = _bind("127.0.0.1", 0, 16)
+        base = f"http://127.0.0.1:{sock.getsockname()[1]}"
+        stop = asyncio.Event()
+        cfg = ServeConfig(manifest=path, deadline=1.0, drain_timeout=2.0, drain_grace=0.2, reload_interval=0)
+        server = asyncio.create_task(run_worker(cfg, sock, stop))
+        try:
+            async with aiohttp.ClientSession() as s:
+                for _ in range(100):
+                    try:
+                        async with s.get(f"{base}/healthz") as r:
+                            if r.status == 200:
+                                break
+                    except aiohttp.ClientConnectionError:
+                        await asyncio.sleep(0.02)
+
+                async with s.get(f"{base}/vast", params={"self.fill": "1"}) as r:
+                    assert r.status == 200 and r.headers["X-Pyvast-Outcome"] == "fill"
+                    assert "<Ad id='a'>" in await r.text()
+                async with s.post(f"{base}/vast", json={"self": {"fill": "0"}}) as r:
+                    assert r.headers["X-Pyvast-Outcome"] == "nofill"
+                    assert (await r.text()).endswith('<VAST version="4.0"/>')
+                async with s.post(f"{base}/vast", data=b"[1]") as r:
+                    assert r.status == 400
+                async with s.get(f"{base}/stats") as r:
+                    assert "up_ssp" in (await r.json())["executors"]["default"]
+
+                # a request in flight at shutdown still gets its answer
+                slow = asyncio.create_task(s.get(f"{base}/vast", params={"self.fill": "1", "self.slow": "1"}))
+                await asyncio.sleep(0.1)
+                stop.set()
+                await asyncio.sleep(0)
+                async with s.get(f"{base}/healthz") as h:  # still accepting during the grace period
+                    assert h.status == 503
+                r = await slow
+                assert r.status == 200 and r.headers["X-Pyvast-Outcome"] == "fill"
+                r.release()
+            await asyncio.wait_for(server, 3)
+        finally:
+            server.cancel()
+            await up.cleanup()
+
+    asyncio.run(go())
+
+
+def test_serve_gives_up_when_workers_die_before_serving(tmp_path):
+    import time
+
+    path = tmp_path / "broken.yml"
+    path.write_text("id: [broken")
+    t0 = time.monotonic()
+    assert serve(ServeConfig(manifest=path, host="127.0.0.1", port=0, workers=2, reload_interval=0)) == 1
+    assert time.monotonic() - t0 < 10
+
+
+def test_multi_tenant_unknown_is_404_and_broken_is_logged_500(tmp_path, caplog):
+    from aiohttp.test_utils import TestClient, TestServer
+
+    from pyvast.runtime import PoolConfig, Runtime
+    from pyvast.server import build_app
+
+    (tmp_path / "broken.yml").write_text(MANIFEST.format(port=1).replace("  up:\n", "  up:\n    type: nope\n"))
+
+    async def go():
+        async with Runtime(PoolConfig(warmup=False, warm_interval=0)) as rt:
+            app = build_app(ServeConfig(manifest=tmp_path), rt)
+            async with TestClient(TestServer(app)) as client:
+                r = await client.get("/vast/missing")
+                assert r.status == 404
+                r = await client.get("/vast/broken")
+                assert r.status == 500
+
+    asyncio.run(go())
+    assert any("broken" in r.getMessage() and r.exc_info for r in caplog.records)
@@ -0,0 +1,87 @@
+import asyncio
+
+import aiohttp
+
+from pyvast.utils.singleflight import SingleFlight
+
+
+def test_single_flight_shares_call_and_cancels_with_last_waiter():
+    started = []
+
+    async def fetch():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return f"v{len(started)}"
+
+    async def _go():
+        sf = SingleFlight(window=1.0)
+        bodies = await asyncio.gather(*(sf.do("k", fetch) for _ in range(10)))
+        assert bodies == ["v1"] * 10 and (sf.calls, sf.coalesced) == (1, 9) and not len(sf)
+
+        # one waiter leaving doesn't cancel the call; the last one does
+        a, b = (asyncio.create_task(sf.do("k", fetch)) for _ in range(2))
+        await asyncio.sleep(0.01)
+        a.cancel()
+        assert await b == "v2"
+        c = asyncio.create_task(sf.do("k", fetch))
+        await asyncio.sleep(0.01)
+        flight = sf._flights["k"]
+        c.cancel()
+        await asyncio.gather(c, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert flight.task.cancelled() and not len(sf)
+
+        # past the window a new call starts instead of joining
+        sf.window = 0.0
+        await asyncio.gather(sf.do("k", fetch), sf.do("k", fetch))
+        assert len(started) == 5
+
+    asyncio.run(_go())
+
+
+def test_adapter_coalesces_requests_and_wrapper_hops():
+    from aiohttp import web
+
+    from pyvast.adapters.base_http import BaseHTTPAdapter
+    from pyvast.manifest.types import AdapterConfig, AdapterSpec, CoalesceConfig
+    from pyvast.runtime import PoolConfig, Runtime
+
+    hits = {"ad": 0, "hop": 0}
+    inline = "<VAST version='4.0'><Ad><InLine><AdTitle>x</AdTitle></InLine></Ad></VAST>"
+
+    async def _go():
+        async def handler(request):
+            name = request.match_info["name"]
+            hits[name] += 1
+            await asyncio.sleep(0.05)
+            if name == "hop":
+                return web.Response(text=inline)
+            uri = f"http://127.0.0.1:{port}/hop?cb=[CACHE_BUST]"
+            return web.Response(text=f"<VAST version='4.0'><Ad><Wrapper><VASTAdTagURI>{uri}</VASTAdTagURI></Wrapper></Ad></VAST>")
+
+        app = web.Application()
+        app.router.add_get("/{name}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            spec = AdapterSpec(base_uri=f"http://127.0.0.1:{port}/ad", query={"p": "${self.p}", "cb": "[CACHE_BUST]"})
+            adapter = BaseHTTPAdapter(spec, AdapterConfig(coalesce=CoalesceConfig()))
+            ctx = {"self": {"p": "1"}, "resolve_all": True}
+            async with Runtime(PoolConfig(warmup=False, warm_interval=0)) as rt:
+                s = rt.session
+                bodies = await asyncio.gather(*(adapter.fetch(ctx, session=s) for _ in range(8)))
+                assert hits == {"ad": 1, "hop": 1} and all("<AdTitle>x</AdTitle>" in b for b in bodies)
+                await adapter.fetch({**ctx, "self": {"p": "2"}}, session=s)  # other placement → own call
+                assert hits == {"ad": 2, "hop": 2}
+
+            # a throwaway session may close under joined callers: no coalescing
+            async with aiohttp.ClientSession() as s:
+                await asyncio.gather(*(adapter.fetch(ctx, session=s) for _ in range(3)))
+                assert hits == {"ad": 5, "hop": 5} and adapter.flights.calls == 2
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(_go())
@@ -0,0 +1,110 @@
+from pyvast.vast import VastProbe, VastStreamParser, parse_vast
+
+DOC = b"""<?xml version="1.0" encoding="UTF-8"?>
+<VAST version="4.1">
+  <Ad id="a1" sequence="1"><InLine>
+    <AdSystem>sys</AdSystem><AdTitle>t</AdTitle>
+    <Impression id="i"><![CDATA[https://imp/1]]></Impression>
+    <Error>https://err/1</Error>
+    <Creatives><Creative id="c1" adId="x">
+      <Linear><Duration>00:00:15.500</Duration>
+        <TrackingEvents><Tracking event="start">https://t/start</Tracking></TrackingEvents>
+        <VideoClicks><ClickThrough>https://click</ClickThrough></VideoClicks>
+        <MediaFiles><MediaFile delivery="progressive" type="video/mp4" width="640" height="360">
+          https://cdn/v.mp4</MediaFile></MediaFiles>
+      </Linear></Creative>
+      <Creative><CompanionAds><Companion><StaticResource>x</StaticResource></Companion></CompanionAds></Creative>
+    </Creatives>
+    <Extensions><Extension><Impression>ignored</Impression></Extension></Extensions>
+  </InLine></Ad>
+  <Ad id="w"><Wrapper><AdSystem>w</AdSystem><VASTAdTagURI>https://next</VASTAdTagURI></Wrapper></Ad>
+</VAST>"""
+
+
+def test_parse_multi_ad_response():
+    vast = parse_vast(DOC)
+    assert vast.version == "4.1" and [a.id for a in vast.ads] == ["a1", "w"]
+
+    ad = vast.ads[0]
+    assert (ad.kind, ad.ad_system, ad.title, ad.sequence) == ("inline", "sys", "t", 1)
+    assert [i.url for i in ad.impressions] == ["https://imp/1"]
+    assert ad.errors == ["https://err/1"] and ad.duration == 15.5
+
+    cr = ad.creatives[0]
+    assert (cr.id, cr.ad_id, cr.click_through) == ("c1", "x", "https://click")
+    assert cr.media_files[0].url == "https://cdn/v.mp4" and cr.media_files[0].width == 640
+    assert [(t.event, t.url) for t in cr.tracking] == [("start", "https://t/start")]
+
+    assert vast.ads[1].kind == "wrapper" and vast.ads[1].tag_uri == "https://next"
+
+
+def test_empty_vast():
+    vast = parse_vast("<VAST version='4.0'><Error>https://e</Error></VAST>")
+    assert vast.ads == [] and vast.errors == ["https://e"]
+
+
+def test_chunked_feed_matches_whole():
+    whole = parse_vast(DOC)
+    assert parse_vast(DOC, chunk_size=7) == whole
+    p = VastStreamParser()
+    for ch in DOC:
+        p.feed(bytes([ch]))
+    assert p.close() == whole
+
+
+def test_write_vast_roundtrips_model():
+    from pyvast.vast import write_vast
+
+    vast = parse_vast(DOC)
+    vast.ads[0].creatives[0].click_through = "https://click?a=1&b=]]>"
+    out = write_vast(vast)
+    companion = vast.ads[0].creatives.pop()  # no <Linear>: left out, not written as an empty one
+    assert not companion.linear and "<Linear></Linear>" not in out
+    assert parse_vast(out) == vast
+
+
+def test_write_pod_splices_original_ads():
+    import lxml.etree as ET
+
+    from pyvast.vast import assemble_pod, write_pod
+
+    other = b"""<VAST version="4.0"><Ad id="b1"><InLine><AdSystem>s</AdSystem>
+      <AdVerifications><Verification vendor="v"/></AdVerifications>
+      <Creatives><Creative adId="x"><Linear><Duration>00:00:10</Duration></Linear></Creative>
+        <Creative adId="y"><Linear><Duration>00:00:05</Duration></Linear></Creative></Creatives>
+    </InLine></Ad></VAST>"""
+    sources = [(parse_vast(raw), raw) for raw in (DOC, other)]
+    pod = assemble_pod(v for v, _ in sources)
+    doc = ET.fromstring(write_pod(pod, sources).encode())
+
+    a1, b1 = doc.findall("Ad")
+    assert (a1.get("sequence"), b1.get("sequence")) == ("1", "2")
+    assert a1.find("InLine/Extensions") is not None and len(a1.findall(".//Creative")) == 2  # companion kept
+    assert b1.find("InLine/AdVerifications/Verification").get("vendor") == "v"
+    assert [c.get("adId") for c in b1.iter("Creative")] == ["y"]  # "x" is a duplicate of a1's
+    assert parse_vast(ET.tostring(doc)).ads[1].creatives == pod.ads[1].creatives
+
+
+def test_pod_duration_counts_linear_creatives_only():
+    from pyvast.vast import Ad, Creative, Vast, assemble_pod
+
+    def vast(ad_id, *creatives):
+        return Vast(ads=[Ad(id=ad_id, creatives=list(creatives))])
+
+    short = vast("a", Creative(ad_id="a", duration=10), Creative(linear=False, duration=60))
+    pod = assemble_pod([short, vast("b", Creative(ad_id="b", duration=15))], max_duration=30)
+    assert [ad.id for ad in pod.ads] == ["a", "b"]  # the 60 s companion does not count
+
+
+def test_probe_decides_fill_or_nofill_from_first_bytes():
+    def verdict(*chunks):
+        p = VastProbe()
+        return [p.feed(c) for c in chunks][-1], p.broken
+
+    assert verdict(b'<?xml version="1.0"?><VAST version="4.0"/>') == (False, False)
+    assert verdict(b'<VAST version="4.0"><Error>e</Error>', b"</VAST>") == (False, False)
+    assert verdict(b'<VAST version="4.0"><A', b'd id="1"><InLine>') == (True, False)
+    assert verdict(b'<v:VAST xmlns:v="urn:x"><v:Ad>') == (True, False)
+    assert verdict(b"<VAST><AdSystem/></VAST>") == (False, False)  # not an <Ad>
+    assert verdict(b"<VAST>") == (None, False)
+    assert verdict(b"not xml </") == (None, True)
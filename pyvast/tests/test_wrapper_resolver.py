@@ -0,0 +1,93 @@
+import asyncio
+
+import lxml.etree as ET
+import pytest
+
+from pyvast.utils.wrapper_resolver import WrapperCache, WrapperLoop, WrapperResolver
+
+
+def wrapper(next_uri, n):
+    return (
+        f"<VAST><Ad><Wrapper><Impression>imp{n}</Impression>"
+        f"<VASTAdTagURI>{next_uri}</VASTAdTagURI>"
+        f"<Creatives><Creative><Linear><TrackingEvents>"
+        f"<Tracking event='start'>start{n}</Tracking>"
+        f"</TrackingEvents></Linear></Creative></Creatives></Wrapper></Ad></VAST>"
+    )
+
+
+INLINE = (
+    "<VAST><Ad><InLine><AdSystem>s</AdSystem><Impression>imp-inline</Impression>"
+    "<Creatives><Creative><Linear><Duration>00:00:15</Duration></Linear></Creative>"
+    "</Creatives></InLine></Ad></VAST>"
+)
+
+
+class Upstream:
+    def __init__(self, docs):
+        self.docs, self.calls = docs, []
+
+    async def __call__(self, uri):
+        self.calls.append(uri)
+        return self.docs[uri]
+
+
+def test_chain_merges_tracking_and_hits_cache():
+    up = Upstream({"http://b/?d=x.ru": wrapper("http://c/", 2), "http://c/": INLINE})
+    res = WrapperResolver(cache=WrapperCache(ttl=60))
+    ctx = {"DOMAIN": "x.ru"}
+
+    out = asyncio.run(res.resolve(wrapper("http://b/?d=[DOMAIN]", 1), up, ctx))
+    doc = ET.fromstring(out)
+    assert [e.text for e in doc.iterfind("Ad/InLine/Impression")] == ["imp-inline", "imp1", "imp2"]
+    assert [e.text for e in doc.iterfind(".//Linear/TrackingEvents/Tracking")] == ["start1", "start2"]
+
+    asyncio.run(res.resolve(wrapper("http://b/?d=[DOMAIN]", 1), up, ctx))
+    assert up.calls == ["http://b/?d=x.ru", "http://c/"]
+
+
+def test_wrapper_uri_expands_only_iab_macros():
+    uri = "http://b/?ip=${device.ip}&u=[UID]&ua=[DEVICEUA]&t=%%TOKEN%%&cb=[CACHEBUSTING]"
+    up = Upstream({})
+
+    async def fetch(u):
+        up.calls.append(u)
+        return INLINE
+
+    ctx = {"device": {"ip": "1.2.3.4"}, "UID": "secret", "TOKEN": "t", "DEVICEUA": "Mozilla/5.0 (X)"}
+    asyncio.run(WrapperResolver().resolve(wrapper(f"<![CDATA[{uri}]]>", 1), fetch, ctx))
+    (called,) = up.calls
+    prefix = "http://b/?ip=${device.ip}&u=[UID]&ua=Mozilla%2F5.0%20%28X%29&t=%%TOKEN%%&cb="
+    assert called.startswith(prefix) and called[len(prefix):].isdigit()
+
+
+def test_loop_is_detected():
+    up = Upstream({"http://a/": wrapper("http://b/", 2), "http://b/": wrapper("http://a/", 1)})
+    with pytest.raises(WrapperLoop):
+        asyncio.run(WrapperResolver(limit=10).resolve(wrapper("http://a/", 0), up))
+
+
+def test_wrapper_uri_timestamp_is_iab_iso8601():
+    from datetime import datetime
+    from urllib.parse import unquote
+
+    from pyvast.utils.macro import Template, compile_template
+
+    stamp = unquote(Template("http://b/?t=[TIMESTAMP]", iab=True).render({})[len("http://b/?t="):])
+    parsed = datetime.fromisoformat(stamp)
+    assert parsed.utcoffset() is not None and len(stamp.split(".")[1]) == len("123+00:00")
+    assert compile_template("[TIMESTAMP]").render({}).isdigit()  # our own templates keep epoch seconds
+
+
+def test_profiled_resolve_times_each_parse():
+    from pyvast.utils.profiling import AttemptProfile, current_attempt
+
+    up = Upstream({"http://b/": INLINE})
+    prof = AttemptProfile("e")
+
+    async def go():
+        current_attempt.set(prof)
+        await WrapperResolver().resolve(wrapper("http://b/", 1), up)
+
+    asyncio.run(go())
+    assert set(prof.stages) == {"parse"} and prof.stages["parse"] > 0
@@ -0,0 +1,50 @@
+"""
+pyvast.utils.deadline
+~~~~~~~~~~~~~~~~~~~~~
+
+Total time budget for one ad request.
+
+The executor creates a :class:`Deadline` per ``execute()`` call and publishes
+it through :data:`current_deadline`, so anything running inside the request
+(adapters, wrapper resolution) can cap its own timeouts by the time left
+without the budget being threaded through every signature.
+"""
+
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+__all__ = ["Deadline", "current_deadline"]
+
+
+class Deadline:
+    """Monotonic deadline ``budget`` seconds from now (``None`` → unlimited)."""
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, budget: Optional[float] = None):
+        self.expires_at = None if budget is None else time.monotonic() + budget
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (never negative), ``None`` when unlimited."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def cap(self, timeout: Optional[float]) -> Optional[float]:
+        """``timeout`` limited by the time left on the deadline."""
+        left = self.remaining()
+        if left is None:
+            return timeout
+        return left if timeout is None else min(timeout, left)
+
+
+current_deadline: ContextVar[Deadline] = ContextVar(
+    "pyvast_deadline", default=Deadline(None)
+)
@@ -1,9 +1,20 @@
 
-import asyncio, aiohttp, logging
+import asyncio, aiohttp, json, logging, random, threading
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+from .instrumentation import metrics
 from .macro import interpolate_macros
 log = logging.getLogger('vast.tracker')
 
-async def fire_pixels(urls, ctx):
+async def fire_pixels(urls, ctx, *, session=None, dispatcher=None):
+    if dispatcher is not None:  # fire-and-forget through the bounded queue
+        dispatcher.submit(urls, ctx)
+        return
+    if session is not None:  # e.g. Runtime.session – keep pooled connections
+        await asyncio.gather(*(_hit(u, ctx, session) for u in urls))
+        return
     async with aiohttp.ClientSession() as s:
         await asyncio.gather(*(_hit(u, ctx, s) for u in urls))
 
@@ -14,3 +25,251 @@ async def _hit(url_raw, ctx, session):
             log.debug('fired %s', url)
     except Exception as e:
         log.warning('pixel fail %s: %s', url, e)
+
+
+Item = Tuple[str, int]  # (rendered url, attempt)
+
+
+class PixelDispatcher:
+    """Long-running tracking-pixel sender.
+
+    ``submit()`` renders macros and enqueues without awaiting anything. A fixed
+    pool of ``workers`` drains a bounded queue on one persistent session, with
+    at most ``per_host`` requests in flight per host. A pixel whose host is at
+    its cap is parked per host and sent by the worker that frees a slot, so a
+    slow tracker never holds workers that could serve other hosts. Failures
+    (network errors, 5xx) are retried up to ``retries`` times with full-jitter
+    exponential backoff. When the queue is full, pixels spill to the ``spool``
+    JSONL file and are fed back once the queue has room again (and on the next
+    start). Pixels still queued, parked or being sent when :meth:`close` stops
+    waiting go to the spool too (a send cut short may then be repeated).
+    The spool is read from a saved offset (``<spool>.pos``) and truncated once
+    fully consumed, so a tick costs what it reads, not the file size.
+
+    Usage::
+
+        async with PixelDispatcher(session=runtime.session, spool=Path('pixels.jsonl')) as d:
+            await fire_pixels(urls, ctx, dispatcher=d)
+    """
+
+    def __init__(self, *, session: Optional[aiohttp.ClientSession] = None,
+                 workers: int = 16, queue_size: int = 10_000, per_host: int = 8,
+                 retries: int = 3, backoff: float = 0.2, max_backoff: float = 10.0,
+                 timeout: float = 2.0, spool: Optional[Path] = None,
+                 spool_interval: float = 1.0):
+        if workers < 1 or per_host < 1:
+            raise ValueError(f'workers and per_host must be >= 1, got {workers} and {per_host}')
+        self.session = session
+        self._owns_session = session is None
+        self.workers, self.per_host = workers, per_host
+        self.retries, self.backoff, self.max_backoff = retries, backoff, max_backoff
+        self.timeout = timeout
+        self.spool, self.spool_interval = (Path(spool) if spool else None), spool_interval
+        self.queue: 'asyncio.Queue[Item]' = asyncio.Queue(queue_size)
+        self._busy: Dict[str, int] = {}  # requests in flight per host
+        self._parked: Dict[str, Deque[Item]] = {}  # waiting for a slot of their host
+        self._n_parked = 0
+        self._spill: List[str] = []
+        self._spool_lock = threading.Lock()  # spool file is touched from worker threads
+        self._tasks: List[asyncio.Task] = []
+        self._retries: Set[asyncio.Task] = set()
+        self.sent = self.failed = self.spilled = 0
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize() + self._n_parked
+
+    # lifecycle ---------------------------------------------------------------
+    async def start(self) -> 'PixelDispatcher':
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        if self.spool is not None:
+            self._tasks.append(asyncio.create_task(self._spool_loop()))
+        metrics.watch_dispatcher(self)
+        return self
+
+    async def close(self, drain_timeout: float = 5.0) -> None:
+        """Drain the queue (up to ``drain_timeout``), spool what is left, stop."""
+        try:
+            await asyncio.wait_for(self.queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            pass
+        pending = [*self._tasks, *self._retries]
+        for t in pending:
+            t.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+        while not self.queue.empty():
+            self._spill_item(self.queue.get_nowait())
+        for parked in self._parked.values():
+            for item in parked:
+                self._spill_item(item)
+        self._parked.clear()
+        self._n_parked = 0
+        await self._flush_spool()
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self) -> 'PixelDispatcher':
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    # producer side -----------------------------------------------------------
+    def submit(self, urls: Iterable[str], ctx) -> int:
+        """Render and enqueue ``urls``; returns how many went to the queue."""
+        queued = 0
+        for raw in urls:
+            queued += self._put((interpolate_macros(raw, ctx), 0))
+        return queued
+
+    def _put(self, item: Item) -> bool:
+        if self.depth < self.queue.maxsize:  # parked pixels count against the bound
+            self.queue.put_nowait(item)
+            return True
+        self._spill_item(item)
+        return False
+
+    def _spill_item(self, item: Item) -> None:
+        if self.spool is None:
+            self.failed += 1
+            log.warning('pixel queue full, dropped %s', item[0])
+            return
+        self.spilled += 1
+        self._spill.append(json.dumps({'url': item[0], 'attempt': item[1]}))
+
+    # consumer side -----------------------------------------------------------
+    async def _worker(self) -> None:
+        while True:
+            item = await self.queue.get()
+            host = urlsplit(item[0]).netloc
+            if self._busy.get(host, 0) >= self.per_host:
+                # never wait on a busy host: park it (task_done comes when it is sent)
+                self._parked.setdefault(host, deque()).append(item)
+                self._n_parked += 1
+                continue
+            await self._drain_host(host, item)
+
+    async def _drain_host(self, host: str, item: Item) -> None:
+        """Send ``item`` on a slot of ``host``, then that host's parked pixels."""
+        self._busy[host] = self._busy.get(host, 0) + 1
+        try:
+            while True:
+                try:
+                    await self._fire(item)
+                except asyncio.CancelledError:  # close() gave up on it: keep it for next start
+                    self._spill_item(item)
+                    raise
+                finally:
+                    self.queue.task_done()
+                parked = self._parked.get(host)
+                if not parked:
+                    return
+                item = parked.popleft()
+                self._n_parked -= 1
+                if not parked:
+                    del self._parked[host]
+        finally:
+            if self._busy[host] == 1:
+                del self._busy[host]
+            else:
+                self._busy[host] -= 1
+
+    async def _fire(self, item: Item) -> None:
+        url, attempt = item
+        try:
+            async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=self.timeout)) as r:
+                if r.status >= 500:
+                    raise aiohttp.ClientResponseError(r.request_info, r.history, status=r.status)
+            self.sent += 1
+            log.debug('fired %s', url)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if attempt >= self.retries:
+                self.failed += 1
+                log.warning('pixel fail %s: %s', url, e)
+                return
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+            task = asyncio.create_task(self._retry((url, attempt + 1), delay))
+            self._retries.add(task)
+            task.add_done_callback(self._retries.discard)
+
+    async def _retry(self, item: Item, delay: float) -> None:
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:  # shutting down – keep it for next start
+            self._spill_item(item)
+            raise
+        self._put(item)
+
+    # spool -------------------------------------------------------------------
+    async def _spool_loop(self) -> None:
+        while True:
+            await self._flush_spool()
+            room = self.queue.maxsize - self.depth
+            if room > self.queue.maxsize // 2:
+                # the thread can't be interrupted: once it has advanced the offset
+                # its items must reach the queue, even if we are cancelled meanwhile
+                take = asyncio.ensure_future(asyncio.to_thread(self._take_spooled, room))
+                try:
+                    await asyncio.shield(take)
+                finally:
+                    for item in await take:
+                        self._put(item)
+            await asyncio.sleep(self.spool_interval)
+
+    async def _flush_spool(self) -> None:
+        if self.spool is None or not self._spill:
+            return
+        lines, self._spill = self._spill, []
+        write = asyncio.ensure_future(asyncio.to_thread(self._append_spool, lines))
+        try:
+            await asyncio.shield(write)
+        finally:
+            await write
+
+    def _append_spool(self, lines: List[str]) -> None:
+        with self._spool_lock, self.spool.open('a') as f:
+            f.write('\n'.join(lines) + '\n')
+
+    @property
+    def _spool_pos(self) -> Path:
+        return self.spool.with_name(self.spool.name + '.pos')
+
+    def _take_spooled(self, n: int) -> List[Item]:
+        with self._spool_lock:
+            try:
+                f = self.spool.open('rb')
+            except FileNotFoundError:
+                return []
+            with f:
+                try:
+                    offset = int(self._spool_pos.read_text())
+                except (FileNotFoundError, ValueError):
+                    offset = 0
+                f.seek(offset)
+                head = []
+                while len(head) < n:
+                    line = f.readline()
+                    if not line.endswith(b'\n'):
+                        break  # EOF (or a torn last line: leave it)
+                    head.append(line)
+                    offset += len(line)
+                size = f.seek(0, 2)
+            if offset >= size:  # all consumed: start a fresh file
+                self.spool.unlink()
+                self._spool_pos.unlink(missing_ok=True)
+            else:
+                self._spool_pos.write_text(str(offset))
+        out = []
+        for line in head:
+            try:
+                d = json.loads(line)
+                out.append((d['url'], int(d.get('attempt', 0))))
+            except (ValueError, KeyError):
+                log.warning('bad spool line %r', line)
+        return out
@@ -0,0 +1,169 @@
+"""
+pyvast.utils.health
+~~~~~~~~~~~~~~~~~~~
+
+Rolling per‑endpoint health statistics and a circuit breaker on top of them.
+
+:class:`EndpointHealth` keeps the last ``window`` attempts (latency + outcome)
+and derives latency percentiles, error rate and fill rate. :class:`CircuitBreaker`
+trips *open* after ``consecutive_failures`` failures in a row, or when the
+error rate over at least ``min_samples`` of its last ``window`` attempts
+reaches ``error_rate``. That failure window is the breaker's own: closing
+after a successful probe starts it afresh, while the endpoint's health stats
+(latency percentiles used for hedging, counts) carry on. After
+``cooldown`` seconds it goes *half‑open* and lets ``half_open_probes`` live
+requests through as probes: a success closes it again, a failure re‑opens it.
+Only the probes decide: results of attempts admitted before the breaker opened
+that arrive late are recorded in the health stats but never close, re‑open or
+free a probe slot.
+
+Outcomes are ``fill``, ``nofill``, ``timeout`` and ``error``; only the last two
+count as failures — an SSP that answers "no ad" is healthy.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Deque, Dict, Literal, Optional, Tuple
+
+from pyvast.manifest.types import BreakerConfig
+
+__all__ = ["CircuitBreaker", "EndpointHealth", "Outcome"]
+
+Outcome = Literal["fill", "nofill", "timeout", "error"]
+FAILURES = frozenset(("timeout", "error"))
+
+
+class EndpointHealth:
+    __slots__ = ("samples", "total", "counts", "_pct")
+
+    def __init__(self, window: int = 200):
+        self.samples: Deque[Tuple[float, str]] = deque(maxlen=window)
+        self.total = 0
+        self.counts: Dict[str, int] = dict.fromkeys(("fill", "nofill", "timeout", "error"), 0)
+        self._pct: Dict[float, Tuple[int, Optional[float]]] = {}  # q → (total when computed, value)
+
+    def record(self, latency: float, outcome: Outcome) -> None:
+        self.samples.append((latency, outcome))
+        self.total += 1
+        self.counts[outcome] += 1
+
+    def _rate(self, outcomes) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, o in self.samples if o in outcomes) / len(self.samples)
+
+    @property
+    def error_rate(self) -> float:
+        return self._rate(FAILURES)
+
+    @property
+    def fill_rate(self) -> float:
+        return self._rate(("fill",))
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency percentile (``q`` in 0‥100) over the window, seconds."""
+        if not self.samples:
+            return None
+        lat = sorted(s[0] for s in self.samples)
+        return lat[min(len(lat) - 1, int(q / 100 * len(lat)))]
+
+    def percentile_cached(self, q: float, every: int = 16) -> Optional[float]:
+        """:meth:`percentile`, re‑sorted at most once per ``every`` new samples."""
+        hit = self._pct.get(q)
+        if hit is not None and self.total - hit[0] < every:
+            return hit[1]
+        value = self.percentile(q)
+        self._pct[q] = (self.total, value)
+        return value
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "samples": len(self.samples),
+            "total": self.total,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "error_rate": self.error_rate,
+            "fill_rate": self.fill_rate,
+            **self.counts,
+        }
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    __slots__ = ("cfg", "health", "state", "opened_at", "probes", "period", "streak",
+                 "failures", "failed")
+
+    def __init__(self, cfg: BreakerConfig, health: EndpointHealth):
+        self.cfg = cfg
+        self.health = health
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.probes = 0  # half‑open requests in flight
+        self.period = 0  # half‑open periods so far; tags the probes admitted in each
+        self.streak = 0  # consecutive failures
+        self.failures: Deque[bool] = deque(maxlen=cfg.window)  # failed? per attempt
+        self.failed = 0  # True entries in ``failures``
+
+    def allow(self) -> Optional[int]:
+        """May a request go to the endpoint now?
+
+        ``None`` → no; ``0`` → yes, as an ordinary attempt; ``n > 0`` → yes,
+        as a probe of half‑open period ``n``. Pass the value on to
+        :meth:`record`.
+        """
+        if not self.cfg.enabled or self.state == self.CLOSED:
+            return 0
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.cfg.cooldown:
+                return None
+            self.state, self.probes = self.HALF_OPEN, 0
+            self.period += 1
+        if self.probes >= self.cfg.half_open_probes:
+            return None
+        self.probes += 1
+        return self.period
+
+    def record(self, latency: float, outcome: Optional[Outcome], admission: int = 0) -> None:
+        """Feed one finished attempt; ``outcome=None`` → abandoned (cancelled).
+
+        ``admission`` is what :meth:`allow` returned for the attempt.
+        """
+        probe = self.state == self.HALF_OPEN and admission == self.period > 0
+        if probe:
+            self.probes -= 1
+        if outcome is None:
+            return
+        self.health.record(latency, outcome)
+        failed = outcome in FAILURES
+        window = self.failures
+        if window.maxlen:
+            if len(window) == window.maxlen:
+                self.failed -= window[0]
+            window.append(failed)
+            self.failed += failed
+        if failed:
+            self.streak += 1
+            if probe or self._should_trip():
+                self._open()
+        else:
+            self.streak = 0
+            if probe:  # recovered – start a clean failure window
+                self.state = self.CLOSED
+                self.failures.clear()
+                self.failed = 0
+
+    def _should_trip(self) -> bool:
+        cfg = self.cfg
+        if not cfg.enabled or self.state != self.CLOSED:  # half‑open: only probes decide
+            return False
+        if self.streak >= cfg.consecutive_failures:
+            return True
+        n = len(self.failures)
+        return n >= cfg.min_samples and self.failed / n >= cfg.error_rate
+
+    def _open(self) -> None:
+        self.state, self.opened_at, self.probes = self.OPEN, time.monotonic(), 0
@@ -1,10 +1,179 @@
+"""
+pyvast.utils.instrumentation
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
-from contextlib import asynccontextmanager
+OpenTelemetry spans and metrics for the ad‑decision hot path.
+
+Tracing is controlled without code changes through ``PYVAST_TRACING``:
+
+* ``auto`` (default) – spans only while a real ``TracerProvider`` is installed;
+* ``off`` – never create spans;
+* ``on`` – always (a no‑op provider still makes them cheap no‑ops);
+* a number in ``0‥1`` – head‑sample that fraction of spans.
+
+A span that is not created costs one shared no‑op context manager. Metrics go
+to the global ``MeterProvider`` (no‑ops until one is installed), or to the one
+given to :meth:`_Metrics.use`, and can be switched off with
+``PYVAST_METRICS=off``:
+
+==============================  ===============  ==============================
+``pyvast.endpoint.duration``    histogram, s     ``endpoint``, ``outcome``
+``pyvast.endpoint.outcomes``    counter          ``endpoint``, ``outcome``
+``pyvast.wrapper.depth``        histogram        hops followed per response
+``pyvast.executor.inflight``    up‑down counter  ``execute()`` calls running
+``pyvast.pixel.queue_depth``    gauge            summed over live dispatchers
+==============================  ===============  ==============================
+
+:func:`configure` overrides the environment at runtime.
+"""
+
+import os
+import random
+import weakref
+from typing import Dict, Iterable, Optional, Tuple
+
+from opentelemetry import metrics as otel_metrics
 from opentelemetry import trace
+from opentelemetry.metrics import CallbackOptions, Observation
+
+__all__ = ['configure', 'metrics', 'traced']
 
 tracer = trace.get_tracer('vast')
 
-@asynccontextmanager
-async def traced(name:str, **attrs):
-    with tracer.start_as_current_span(name, attributes=attrs):
-        yield
+
+class _NoSpan:
+    __slots__ = ()
+
+    async def __aenter__(self):
+        return None
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    __slots__ = ('name', 'attrs', '_cm')
+
+    def __init__(self, name: str, attrs: dict):
+        self.name, self.attrs = name, attrs
+
+    async def __aenter__(self):
+        self._cm = tracer.start_as_current_span(self.name, attributes=self.attrs)
+        return self._cm.__enter__()
+
+    async def __aexit__(self, *exc):
+        return self._cm.__exit__(*exc)
+
+
+class _Tracing:
+    __slots__ = ('mode', 'rate', '_sdk', '_calls')
+
+    RECHECK = 1024  # auto mode: look for a newly installed provider every N calls
+
+    def __init__(self):
+        self.set(os.environ.get('PYVAST_TRACING', 'auto'))
+
+    def set(self, value: str) -> None:
+        value = str(value).strip().lower()
+        self._sdk, self._calls = False, 0
+        if value in ('auto', 'on', 'off'):
+            self.mode, self.rate = value, 1.0
+            return
+        try:
+            rate = float(value)
+        except ValueError:
+            raise ValueError(f'PYVAST_TRACING must be auto, on, off or a ratio, got {value!r}') from None
+        self.mode, self.rate = ('on' if rate > 0 else 'off'), min(1.0, max(0.0, rate))
+
+    def enabled(self) -> bool:
+        if self.mode == 'off':
+            return False
+        if self.mode == 'auto' and not self._sdk:
+            self._calls -= 1
+            if self._calls > 0:
+                return False
+            self._calls = self.RECHECK
+            # nobody installed an SDK provider yet → spans would go nowhere
+            self._sdk = not isinstance(trace.get_tracer_provider(), trace.ProxyTracerProvider)
+            if not self._sdk:
+                return False
+        return self.rate >= 1.0 or random.random() < self.rate
+
+
+_tracing = _Tracing()
+
+
+def traced(name: str, **attrs):
+    """``async with traced('vast.http', url=...)`` – a span, unless disabled or sampled out."""
+    return _Span(name, attrs) if _tracing.enabled() else _NO_SPAN
+
+
+class _Metrics:
+    """Lazily created instruments with per‑attribute‑set dict caching."""
+
+    def __init__(self):
+        self.enabled = os.environ.get('PYVAST_METRICS', 'on').strip().lower() != 'off'
+        self._meter = None
+        self._provider = None  # None → the global MeterProvider
+        self._attrs: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self._dispatchers: 'weakref.WeakSet' = weakref.WeakSet()
+
+    def use(self, provider=None) -> None:
+        """Record to ``provider`` instead of the global one (``None`` → back to global)."""
+        self._provider, self._meter = provider, None
+
+    def _instruments(self):
+        if self._meter is None:
+            m = self._meter = (self._provider or otel_metrics).get_meter('pyvast')
+            self.duration = m.create_histogram('pyvast.endpoint.duration', unit='s',
+                                               description='Upstream attempt latency')
+            self.outcomes = m.create_counter('pyvast.endpoint.outcomes',
+                                             description='Attempts by outcome (fill, nofill, timeout, error)')
+            self.wrapper_depth = m.create_histogram('pyvast.wrapper.depth',
+                                                    description='Wrapper hops followed per response')
+            self.inflight = m.create_up_down_counter('pyvast.executor.inflight',
+                                                     description='ManifestExecutor.execute calls in flight')
+            m.create_observable_gauge('pyvast.pixel.queue_depth', callbacks=[self._queue_depth],
+                                      description='Tracking pixels waiting in dispatcher queues')
+        return self
+
+    def attempt(self, endpoint: str, latency: float, outcome: str) -> None:
+        if not self.enabled:
+            return
+        attrs = self._attrs.get((endpoint, outcome))
+        if attrs is None:
+            attrs = self._attrs[(endpoint, outcome)] = {'endpoint': endpoint, 'outcome': outcome}
+        ins = self._instruments()
+        ins.duration.record(latency, attrs)
+        ins.outcomes.add(1, attrs)
+
+    def wrapper_hops(self, depth: int) -> None:
+        if self.enabled:
+            self._instruments().wrapper_depth.record(depth)
+
+    def executing(self, delta: int) -> None:
+        if self.enabled:
+            self._instruments().inflight.add(delta)
+
+    def watch_dispatcher(self, dispatcher) -> None:
+        """Report ``dispatcher.depth`` as ``pyvast.pixel.queue_depth`` while it lives."""
+        if self.enabled:
+            self._instruments()
+            self._dispatchers.add(dispatcher)
+
+    def _queue_depth(self, options: CallbackOptions) -> Iterable[Observation]:
+        return [Observation(sum(d.depth for d in list(self._dispatchers)))]
+
+
+metrics = _Metrics()
+
+
+def configure(*, tracing: Optional[str] = None, metrics_enabled: Optional[bool] = None) -> None:
+    """Override ``PYVAST_TRACING`` / ``PYVAST_METRICS`` at runtime."""
+    if tracing is not None:
+        _tracing.set(tracing)
+    if metrics_enabled is not None:
+        metrics.enabled = metrics_enabled
@@ -18,6 +18,18 @@ pyvast.utils.macro
 * Поддержка «точечных путей» – `${self.owner_id}` ищет
   `ctx["self"]["owner_id"]`.
 * Регистронезависим (сначала ищем точное совпадение, затем upper/lower).
+* `compile_template()` – разбирает строку один раз на литералы и слоты;
+  `Template.render(ctx)` даёт тот же результат, что `interpolate_macros`,
+  но без регэкспа на каждый запрос.
+* `MacroIndex` – значения макросов одного запроса: executor создаёт его
+  в `execute` (:data:`current_macros`), и `Template.render(ctx, index)`
+  разрешает каждый ключ один раз на все эндпоинты запроса.
+* `Template(uri, iab=True)` – для чужих URI (`<VASTAdTagURI>` от SSP):
+  раскрываются только `[MACRO]` из стандартного набора IAB (и встроенные
+  генераторы), значения берутся из корня ctx и URL-кодируются;
+  `[TIMESTAMP]` – в формате IAB (ISO 8601 с миллисекундами и смещением).
+  `${…}`, точечные пути и прочие формы остаются как есть – наш контекст
+  в сторонние URL не попадает.
 """
 
 from __future__ import annotations
@@ -26,8 +38,11 @@ import random
 import re
 import time
 import uuid
-from datetime import datetime
-from typing import Any, Dict
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
 
 # ──────────────────────────────────────────────────────────────────────────────
 #  Регэксп: 5 групп, одна из них сработает → берём непустую.
@@ -53,16 +68,43 @@ _BUILTIN: Dict[str, Any] = {
     "TIMESTAMP": lambda: int(datetime.utcnow().timestamp()),
     "CACHE_BUST": _cache_bust,
     "CACHEBUSTER": _cache_bust,
+    "CACHEBUSTING": _cache_bust,  # имя из VAST 4
     "UUID": lambda: str(uuid.uuid4()),
     "RANDOM_INT": lambda: random.randint(1, 999_999),
 }
 
+# В `Template(..., iab=True)` эти генераторы идут по форматам IAB VAST 4
+# (значения URL-кодируются, как и остальные IAB-макросы).
+_IAB_BUILTIN: Dict[str, Any] = {
+    # ISO 8601 с миллисекундами и смещением: 2026-10-18T12:00:00.123+00:00
+    "TIMESTAMP": lambda: quote(datetime.now(timezone.utc).isoformat(timespec="milliseconds"), safe=""),
+}
+
+# Стандартные макросы IAB VAST 4.x, которые SSP может ждать от нас в
+# `<VASTAdTagURI>`. Только они раскрываются в `Template(..., iab=True)`.
+IAB_MACROS = frozenset({
+    "ADCATEGORIES", "ADCOUNT", "ADPLAYHEAD", "ADSERVINGID", "ADTYPE",
+    "APIFRAMEWORKS", "APPBUNDLE", "ASSETURI", "BLOCKEDADCATEGORIES",
+    "BREAKMAXADLENGTH", "BREAKMAXADS", "BREAKMAXDURATION", "BREAKMINADLENGTH",
+    "BREAKMINDURATION", "BREAKPOSITION", "CACHEBUSTING", "CLICKPOS", "CLICKTYPE",
+    "CLIENTUA", "CONTENTID", "CONTENTPLAYHEAD", "CONTENTURI", "DEVICEIP",
+    "DEVICEUA", "DOMAIN", "GDPRCONSENT", "IFA", "IFATYPE", "INVENTORYSTATE",
+    "LATLONG", "LIMITADTRACKING", "MEDIAMIME", "MEDIAPLAYHEAD", "OMIDPARTNER",
+    "PAGEURL", "PLACEMENTTYPE", "PLAYERCAPABILITIES", "PLAYERSIZE", "PLAYERSTATE",
+    "PODSEQUENCE", "REGULATIONS", "SERVERSIDE", "SERVERUA", "TIMESTAMP",
+    "TRANSACTIONID", "UNIVERSALADID", "VASTVERSIONS", "VERIFICATIONVENDORS",
+})
+
 # ──────────────────────────────────────────────────────────────────────────────
 #  Вспом. получение «точечного» пути из словаря
 
 def _dotted_get(path: str, src: Dict[str, Any]) -> Any | None:
+    return _walk(path.split("."), src)
+
+
+def _walk(parts: Tuple[str, ...] | List[str], src: Dict[str, Any]) -> Any | None:
     cur: Any = src
-    for part in path.split("."):
+    for part in parts:
         if isinstance(cur, dict) and part in cur:
             cur = cur[part]
         else:
@@ -70,6 +112,60 @@ def _dotted_get(path: str, src: Dict[str, Any]) -> Any | None:
     return cur
 
 
+def _resolve(key: str, ctx: Dict[str, Any]) -> str | None:
+    # прямое совпадение ключа в корне ctx, затем точечный путь
+    # (self.owner_id → ctx['self']['owner_id'])
+    for variant in (key, key.upper(), key.lower()):
+        if variant in ctx:
+            return str(ctx[variant])
+    val = _dotted_get(key, ctx) or _dotted_get(key.lower(), ctx)
+    return None if val is None else str(val)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Индекс макросов запроса
+
+_MISS: Any = object()
+
+
+class MacroIndex:
+    """
+    Разрешённые ключи макросов одного запроса, общие для всех его эндпоинтов.
+
+    Заполняется лениво: первый `get(key)` ищет ключ в `base` по правилам
+    `interpolate_macros`, следующие – одна проба словаря. Годится только для
+    `base` и копий из `copy()`: их верхний уровень совпадает с `base`
+    (вложенные значения запроса не меняются, см. контракт адаптеров).
+    """
+
+    __slots__ = ("base", "values", "_copies")
+
+    def __init__(self, base: Dict[str, Any]):
+        self.base = base
+        self.values: Dict[str, str | None] = {}
+        self._copies: Dict[int, Dict[str, Any]] = {}  # id → копия (держим, чтобы id не переиспользовался)
+
+    def copy(self) -> Dict[str, Any]:
+        """`dict(base)`, который индекс потом узнает в `serves`."""
+        ctx = dict(self.base)
+        self._copies[id(ctx)] = ctx
+        return ctx
+
+    def serves(self, ctx: Dict[str, Any]) -> bool:
+        if ctx is self.base:
+            return True
+        return id(ctx) in self._copies and len(ctx) == len(self.base)  # не дополнена адаптером
+
+    def get(self, key: str) -> str | None:
+        val = self.values.get(key, _MISS)
+        if val is _MISS:
+            val = self.values[key] = _resolve(key, self.base)
+        return val
+
+
+current_macros: ContextVar[Optional[MacroIndex]] = ContextVar("pyvast_macros", default=None)
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 #  Основная функция
 
@@ -95,20 +191,171 @@ def interpolate_macros(text: str, ctx: Dict[str, Any]) -> str:
             except Exception:
                 return f"<ERR:{key_upper}>"
 
-        # 2) прямое совпадение ключа в корне ctx
-        for variant in (key, key_upper, key.lower()):
+        # 2) ключ в корне ctx или точечный путь
+        val = _resolve(key, ctx)
+        if val is not None:
+            return val
+
+        # 3) не найдено
+        return match.group(0)  # оставляем как есть
+
+    return PATTERN.sub(_replace, text)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+#  Скомпилированные шаблоны
+
+Slot = Callable[[Dict[str, Any]], str]
+
+
+def _builtin_slot(key_upper: str, builtins: Dict[str, Any] = _BUILTIN) -> Slot:
+    fn = builtins[key_upper]
+
+    def render(ctx: Dict[str, Any]) -> str:
+        try:
+            return str(fn())
+        except Exception:
+            return f"<ERR:{key_upper}>"
+
+    return render
+
+
+def _lookup_slot(key: str, raw: str) -> Slot:
+    # те же шаги, что в `_replace`, но варианты ключа и пути готовы заранее
+    variants = tuple(dict.fromkeys((key, key.upper(), key.lower())))
+    path = tuple(key.split("."))
+    path_lower = tuple(key.lower().split("."))
+
+    def render(ctx: Dict[str, Any]) -> str:
+        for variant in variants:
             if variant in ctx:
                 return str(ctx[variant])
-
-        # 3) dotted-path lookup  (self.owner_id → ctx['self']['owner_id'])
-        val = _dotted_get(key, ctx) or _dotted_get(key.lower(), ctx)
+        val = _walk(path, ctx) or _walk(path_lower, ctx)
         if val is not None:
             return str(val)
+        return raw
 
-        # 4) не найдено
-        return match.group(0)  # оставляем как есть
+    return render
 
-    return PATTERN.sub(_replace, text)
+
+def _iab_slot(key_upper: str, raw: str) -> Slot:
+    # только корень ctx, без точечных путей; значение кодируется для URL
+    variants = (key_upper, key_upper.lower())
+
+    def render(ctx: Dict[str, Any]) -> str:
+        for variant in variants:
+            if variant in ctx:
+                return quote(str(ctx[variant]), safe="")
+        return raw
+
+    return render
+
+
+class Template:
+    """
+    Строка-шаблон, разобранная на литералы и слоты-макросы.
+
+    `render(ctx)` только вызывает слоты и склеивает части. С `iab=True`
+    слотами становятся только `[MACRO]` из :data:`IAB_MACROS` и встроенные
+    генераторы, всё остальное – литералы. С `index` (:class:`MacroIndex`,
+    который обслуживает `ctx`) обычные слоты-ключи берут значения из него.
+    """
+
+    __slots__ = ("source", "parts", "slots", "volatile", "_stable", "_keyed", "_keyed_stable")
+
+    def __init__(self, source: str, iab: bool = False):
+        self.source = source
+        self.parts: List[str] = []
+        self.slots: List[Tuple[int, Slot]] = []
+        self.volatile = False  # есть встроенные генераторы (CACHE_BUST, UUID …)
+        self._stable: List[Tuple[int, Slot]] = []  # слоты без генераторов
+        # те же слоты с ключом для MacroIndex (None – слот не индексируется)
+        self._keyed: List[Tuple[int, Optional[str], Slot]] = []
+        self._keyed_stable: List[Tuple[int, Optional[str], Slot]] = []
+        pos = 0
+        for match in PATTERN.finditer(source):
+            key = next(g for g in match.groups() if g).strip()
+            key_upper = key.upper()
+            if iab and (match.group(1) is None or not (key_upper in IAB_MACROS or key_upper in _BUILTIN)):
+                continue  # не наш макрос – остаётся частью литерала
+            if match.start() > pos:
+                self.parts.append(source[pos:match.start()])
+            raw = match.group(0)  # один объект: слот возвращает именно его, если ключа нет
+            idx, index_key, stable = len(self.parts), None, True
+            if iab and key_upper in _IAB_BUILTIN:
+                slot = _builtin_slot(key_upper, _IAB_BUILTIN)
+                self.volatile, stable = True, False
+            elif key_upper in _BUILTIN:
+                slot = _builtin_slot(key_upper)
+                self.volatile, stable = True, False
+            elif iab:
+                slot = _iab_slot(key_upper, raw)
+            else:
+                slot = _lookup_slot(key, raw)
+                index_key = key
+            self.slots.append((idx, slot))
+            self._keyed.append((idx, index_key, slot))
+            if stable:
+                self._stable.append((idx, slot))
+                self._keyed_stable.append((idx, index_key, slot))
+            self.parts.append(raw)
+            pos = match.end()
+        if pos < len(source):
+            self.parts.append(source[pos:])
+
+    @property
+    def is_static(self) -> bool:
+        return not self.slots
+
+    def render(self, ctx: Dict[str, Any], index: Optional[MacroIndex] = None) -> str:
+        if not self.slots:
+            return self.source
+        if index is not None:
+            return self._render_indexed(self._keyed, ctx, index)
+        buf = self.parts.copy()
+        for idx, slot in self.slots:
+            buf[idx] = slot(ctx)
+        return "".join(buf)
+
+    def render_key(self, ctx: Dict[str, Any], index: Optional[MacroIndex] = None) -> str:
+        """
+        Как `render`, но генераторы (`[CACHE_BUST]`, `UUID` …) остаются
+        как есть – стабильный ключ для кешей.
+        """
+        if not self._stable:
+            return self.source
+        if index is not None:
+            return self._render_indexed(self._keyed_stable, ctx, index)
+        buf = self.parts.copy()
+        for idx, slot in self._stable:
+            buf[idx] = slot(ctx)
+        return "".join(buf)
+
+    def _render_indexed(self, slots, ctx: Dict[str, Any], index: MacroIndex) -> str:
+        buf = self.parts.copy()  # на месте слота – исходный текст макроса
+        values = index.values
+        for idx, key, slot in slots:
+            if key is None:
+                buf[idx] = slot(ctx)
+                continue
+            val = values.get(key, _MISS)
+            if val is _MISS:  # первый раз за запрос: тот же слот, его шаги готовы заранее
+                val = slot(ctx)
+                val = values[key] = None if val is buf[idx] else val
+            if val is not None:
+                buf[idx] = val
+        return "".join(buf)
+
+    def __repr__(self) -> str:
+        return f"Template({self.source!r})"
+
+
+@lru_cache(maxsize=4096)
+def compile_template(text: str) -> Template:
+    """
+    Компилирует `text` в :class:`Template` (результат кешируется).
+    """
+    return Template(text)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -0,0 +1,111 @@
+"""
+pyvast.utils.profiling
+~~~~~~~~~~~~~~~~~~~~~~
+
+Opt‑in per‑stage timing of ad requests.
+
+:meth:`ManifestExecutor.execute_profiled` publishes an :class:`ExecuteProfile`
+through :data:`current_profile`; every endpoint attempt then gets an
+:class:`AttemptProfile` in :data:`current_attempt`, and the adapter adds the
+time spent in each stage to it:
+
+``setters``   ParamSetter factories
+``render``    request plan rendering (URL, headers, body)
+``connect``   waiting for / opening a pooled connection (only with
+              ``PoolConfig.trace_connect``; otherwise it is part of ``ttfb``)
+``ttfb``      request sent → response headers
+``body``      reading the response body
+``coalesced`` waiting on an identical in‑flight call (``AdapterConfig.coalesce``);
+              the call's own stages go to the attempt that started it
+``wrappers``  following wrapper chains (all hops)
+``parse``     XML parsing: the no‑fill probe while reading bodies (wrapper hops
+              included) and the wrapper documents
+
+:attr:`ExecuteProfile.stages` has the executor's own: ``parse`` (the fills
+of a pod group into the model) and ``pod`` (assembling and writing the pod).
+
+With profiling off, each stage boundary costs one ``ContextVar.get()``.
+"""
+
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+__all__ = [
+    "AttemptProfile",
+    "ExecuteProfile",
+    "connect_trace_config",
+    "current_attempt",
+    "current_profile",
+]
+
+
+@dataclass(slots=True)
+class AttemptProfile:
+    endpoint: str
+    outcome: Optional[str] = None  # fill | nofill | timeout | deadline | error | cancelled | skipped
+    total: float = 0.0
+    stages: Dict[str, float] = field(default_factory=dict)
+    http: bool = False  # False → answered from the response cache
+    closed: bool = False
+
+    def add(self, stage: str, seconds: float) -> None:
+        if not self.closed:  # e.g. a background cache refresh outliving the attempt
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "endpoint": self.endpoint,
+            "outcome": self.outcome,
+            "total_ms": round(self.total * 1e3, 3),
+            "cached": not self.http,
+            "stages_ms": {k: round(v * 1e3, 3) for k, v in self.stages.items()},
+        }
+
+
+@dataclass(slots=True)
+class ExecuteProfile:
+    xml: Optional[str] = None
+    outcome: Optional[str] = None  # fill | nofill
+    group: Optional[str] = None  # group that produced the fill
+    total: float = 0.0
+    attempts: List[AttemptProfile] = field(default_factory=list)
+    stages: Dict[str, float] = field(default_factory=dict)  # executor level, e.g. pod assembly
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "outcome": self.outcome,
+            "group": self.group,
+            "total_ms": round(self.total * 1e3, 3),
+            "stages_ms": {k: round(v * 1e3, 3) for k, v in self.stages.items()},
+            "attempts": [a.as_dict() for a in self.attempts],
+        }
+
+
+current_profile: ContextVar[Optional[ExecuteProfile]] = ContextVar("pyvast_profile", default=None)
+current_attempt: ContextVar[Optional[AttemptProfile]] = ContextVar("pyvast_attempt", default=None)
+
+
+def connect_trace_config() -> aiohttp.TraceConfig:
+    """aiohttp hooks adding connection acquisition time to the current attempt."""
+
+    async def start(session, tctx, params):
+        tctx.t0 = time.perf_counter() if current_attempt.get() is not None else None
+
+    async def end(session, tctx, params):
+        prof = current_attempt.get()
+        if prof is not None and getattr(tctx, "t0", None) is not None:
+            prof.add("connect", time.perf_counter() - tctx.t0)
+            tctx.t0 = None
+
+    tc = aiohttp.TraceConfig()
+    tc.on_connection_queued_start.append(start)
+    tc.on_connection_queued_end.append(end)
+    tc.on_connection_create_start.append(start)
+    tc.on_connection_create_end.append(end)
+    return tc
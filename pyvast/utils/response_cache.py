@@ -0,0 +1,118 @@
+"""
+pyvast.utils.response_cache
+~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Opt‑in cache for upstream ad responses (see ``AdapterConfig.cache``).
+
+Entries are *fresh* for ``ttl`` seconds and then *stale* for another
+``stale_ttl`` seconds. A stale hit is answered from memory immediately while a
+single background task refreshes the entry (stale‑while‑revalidate). The cache
+is an LRU bounded by ``maxsize``; failed fetches are never stored.
+
+No‑fills (:class:`~pyvast.exceptions.NoFill`) are stored only with
+``nofill_ttl > 0``, for that long and without a stale window; a hit raises
+``NoFill`` again without going upstream. With the default ``0`` every no‑fill
+goes upstream. A background refresh that ends in a no‑fill replaces the stale
+fill only when no‑fills are cached.
+
+The refresh outlives the request that triggered it, so the caller must only
+allow it (``revalidate=True``) when ``fetch`` does not depend on anything
+torn down at the end of the request – in the adapter, a Runtime session.
+Otherwise stale entries are treated as misses.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple, Union
+
+from ..exceptions import NoFill
+
+log = logging.getLogger('vast.cache')
+
+__all__ = ['ResponseCache']
+
+Fetch = Callable[[], Awaitable[str]]
+
+
+class ResponseCache:
+    def __init__(self, ttl: float = 30.0, stale_ttl: float = 0.0, maxsize: int = 10_000,
+                 refresh_timeout: Optional[float] = None, nofill_ttl: float = 0.0):
+        self.ttl, self.stale_ttl, self.maxsize = ttl, stale_ttl, maxsize
+        self.nofill_ttl = nofill_ttl
+        self.refresh_timeout = refresh_timeout
+        # key → (fresh_until, stale_until, body or the NoFill it answered)
+        self._data: 'OrderedDict[str, Tuple[float, float, Union[str, NoFill]]]' = OrderedDict()
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.hits = self.stale_hits = self.misses = 0
+        self._warned = False
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Tuple[Union[str, NoFill, None], bool]:
+        """``(body, is_stale)``; ``(None, False)`` on a miss, a :class:`NoFill` for a cached no‑fill."""
+        item = self._data.get(key)
+        if item is None:
+            return None, False
+        now = time.monotonic()
+        if now >= item[1]:
+            del self._data[key]
+            return None, False
+        self._data.move_to_end(key)
+        return item[2], now >= item[0]
+
+    def put(self, key: str, body: Union[str, NoFill]) -> None:
+        now = time.monotonic()
+        if isinstance(body, NoFill):
+            self._data[key] = (now + self.nofill_ttl, now + self.nofill_ttl, body)
+        else:
+            self._data[key] = (now + self.ttl, now + self.ttl + self.stale_ttl, body)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def get_or_fetch(self, key: str, fetch: Fetch, revalidate: bool = True) -> str:
+        body, stale = self.get(key)
+        if stale and not revalidate:
+            if not self._warned:
+                self._warned = True
+                log.warning('stale_ttl needs a long-lived session (a Runtime); serving stale entries is off')
+            body = None
+        if body is None:
+            self.misses += 1
+            try:
+                body = await fetch()
+            except NoFill as e:
+                if self.nofill_ttl > 0:
+                    self.put(key, e)
+                raise
+            self.put(key, body)
+            return body
+        if isinstance(body, NoFill):
+            self.hits += 1
+            raise NoFill(*body.args)
+        if stale:
+            self.stale_hits += 1
+            if key not in self._refreshing:
+                task = asyncio.create_task(self._refresh(key, fetch))
+                self._refreshing[key] = task
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        else:
+            self.hits += 1
+        return body
+
+    async def _refresh(self, key: str, fetch: Fetch) -> None:
+        try:
+            async with asyncio.timeout(self.refresh_timeout):
+                self.put(key, await fetch())
+        except NoFill as e:
+            if self.nofill_ttl > 0:
+                self.put(key, e)
+        except Exception as e:  # keep serving stale until it expires
+            log.debug('refresh %s failed: %r', key, e)
+        finally:
+            self._refreshing.pop(key, None)
@@ -0,0 +1,92 @@
+"""
+pyvast.utils.singleflight
+~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Opt‑in coalescing of identical in‑flight upstream calls (see
+``AdapterConfig.coalesce``).
+
+The first caller for a key starts the fetch in its own task; callers arriving
+with the same key while it runs, and no later than ``window`` seconds after it
+started, await that task instead of sending their own request. All of them get
+the same body or the same exception. Nothing is kept after the call finishes —
+that is :class:`~pyvast.utils.response_cache.ResponseCache`'s job.
+
+A waiter that is cancelled (lost a parallel race, hit its deadline) only stops
+waiting; the shared call is cancelled when its last waiter leaves.
+
+The shared call runs with whatever the starter's ``fetch`` closes over (in the
+adapter: its session, headers and context). Joined callers therefore depend on
+it staying usable after the starter returns, which is why the adapter
+coalesces only on a Runtime's long‑lived session.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+log = logging.getLogger('vast.singleflight')
+
+__all__ = ['SingleFlight']
+
+Fetch = Callable[[], Awaitable[str]]
+
+
+class _Flight:
+    __slots__ = ('task', 'started', 'waiters')
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.started = time.monotonic()
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self, window: float = 1.0, timeout: Optional[float] = None):
+        self.window = window
+        self.timeout = timeout  # cap on one shared call
+        self._flights: Dict[str, _Flight] = {}
+        self.calls = self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def _joinable(self, key: str) -> Optional[_Flight]:
+        flight = self._flights.get(key)
+        if flight is None or flight.task.done() or time.monotonic() - flight.started > self.window:
+            return None  # too old to join: start a fresh call (the old one keeps its waiters)
+        return flight
+
+    def running(self, key: str) -> bool:
+        """Whether :meth:`do` would join an existing call for ``key`` right now."""
+        return self._joinable(key) is not None
+
+    async def do(self, key: str, fetch: Fetch) -> str:
+        """``await fetch()``, or join the running call for ``key``."""
+        flight = self._joinable(key)
+        if flight is None:
+            self.calls += 1
+            flight = _Flight(asyncio.create_task(self._run(fetch)))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda t: self._done(key, flight))
+        else:
+            self.coalesced += 1
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    async def _run(self, fetch: Fetch) -> str:
+        async with asyncio.timeout(self.timeout):
+            return await fetch()
+
+    def _done(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.task.cancelled() and flight.task.exception() is not None:
+            log.debug('shared call %s failed: %r', key, flight.task.exception())  # also marks it retrieved
@@ -0,0 +1,88 @@
+"""
+pyvast.utils.vast_probe
+~~~~~~~~~~~~~~~~~~~~~~~
+
+Early fill / no‑fill verdict on the first bytes of an upstream response.
+
+Lives outside :mod:`pyvast.vast` so that adapters can use it without pulling
+in the parser, pod and writer modules: lxml is imported only the first time a
+head has to go through the XML parser (a VAST that may have closed without an
+``<Ad>``), so loading an HTTP‑only manifest never imports it.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Optional
+
+__all__ = ["VastProbe"]
+
+CHUNK = 64 * 1024
+
+
+class _ProbeTarget:
+    __slots__ = ("found",)
+
+    def __init__(self) -> None:
+        self.found: Optional[bool] = None
+
+    def start(self, tag: str, attrib) -> None:
+        if self.found is None and (tag == "Ad" or tag.endswith("}Ad")):
+            self.found = True
+
+    def end(self, tag: str) -> None:
+        if self.found is None and (tag == "VAST" or tag.endswith("}VAST")):
+            self.found = False
+
+    def data(self, text: str) -> None:
+        pass
+
+    def close(self) -> Optional[bool]:
+        return self.found
+
+
+class VastProbe:
+    """Tells a fill from a no‑fill by the first bytes of a response.
+
+    ``feed()`` returns ``True`` as soon as an ``<Ad>`` opens, ``False`` once
+    ``</VAST>`` closes without one, ``None`` while undecided. A byte scan
+    catches ``<Ad`` cheaply; only a head that may already have closed the
+    document goes through the XML parser, so fills never pay for it. A head
+    that is not well‑formed XML, or longer than ``limit`` without a verdict,
+    leaves it undecided for good (``broken``).
+    """
+
+    __slots__ = ("_head", "_fed", "_parser", "_target", "broken", "limit")
+
+    _AD = re.compile(rb"<(?:[\w.-]+:)?Ad[\s>/]")
+
+    def __init__(self, limit: int = CHUNK) -> None:
+        self._head = bytearray()
+        self._fed = 0
+        self._parser = None  # lxml.etree.XMLParser, created on first use
+        self._target = _ProbeTarget()
+        self.broken = False
+        self.limit = limit
+
+    def feed(self, chunk: bytes) -> Optional[bool]:
+        target = self._target
+        if self.broken or target.found is not None:
+            return target.found
+        head = self._head
+        scan = max(0, len(head) - 8)  # a tag split across chunks
+        head += chunk
+        if self._AD.search(head, scan):
+            target.found = True
+        elif len(head) > self.limit:
+            self.broken = True
+        elif b"/>" in head or b"</" in head:
+            import lxml.etree as ET
+
+            if self._parser is None:
+                self._parser = ET.XMLParser(target=target, resolve_entities=False, no_network=True)
+            try:
+                self._parser.feed(bytes(head[self._fed :]))
+            except ET.XMLSyntaxError:
+                self.broken = True
+            self._fed = len(head)
+        return target.found
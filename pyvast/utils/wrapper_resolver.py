@@ -1,13 +1,187 @@
+"""
+pyvast.utils.wrapper_resolver
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Follows ``<Wrapper><VASTAdTagURI>`` chains down to the InLine ad.
+
+* TTL/LRU cache of hop responses keyed by the rendered URI (volatile macros
+  such as ``[CACHE_BUST]`` masked), so popular chains resolve from memory.
+* Only the standard IAB ``[MACRO]`` set is expanded in SSP‑supplied URIs
+  (``Template(uri, iab=True)``); ``${…}`` paths into our request context are
+  left alone, so our context never leaks into third‑party URLs.
+* Cycle detection (``A → B → A`` raises :class:`WrapperLoop`).
+* Optional single‑flight of hops (:class:`~pyvast.utils.singleflight.SingleFlight`),
+  so concurrent chains through the same URI share one request (callers pass
+  ``coalesce=False`` when their ``fetch`` can't outlive their own request).
+* Per‑hop timeouts capped by the request :mod:`deadline <pyvast.utils.deadline>`.
+* Impression / Error / Tracking / ClickTracking elements of every wrapper are
+  merged into the final InLine, as the VAST spec requires.
+"""
+
+import asyncio
+import copy
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import lxml.etree as ET
+
+from .deadline import current_deadline
+from .instrumentation import metrics
+from .macro import Template
+from .profiling import current_attempt
+from .singleflight import SingleFlight
 
-import lxml.etree as ET, asyncio, aiohttp, logging
 log = logging.getLogger('vast.wrapper')
 
-async def resolve_wrappers(xml: str, fetch, wrapper_limit:int=5):
-    doc = ET.fromstring(xml.encode())
-    depth = 0
-    while doc.find('.//Wrapper') is not None and depth < wrapper_limit:
-        uri = doc.findtext('.//VASTAdTagURI')
-        xml = await fetch(uri.strip())
-        doc = ET.fromstring(xml.encode())
-        depth += 1
-    return ET.tostring(doc, encoding='unicode')
+__all__ = ['WrapperCache', 'WrapperLoop', 'WrapperResolver', 'resolve_wrappers']
+
+Fetch = Callable[[str], Awaitable[str]]
+
+# wrapper element path → where it goes inside every InLine
+_MERGE: Tuple[Tuple[str, str, str], ...] = (
+    ('Impression', '.', 'Impression'),
+    ('Error', '.', 'Error'),
+    ('Creatives/Creative/Linear/TrackingEvents/Tracking', 'Creatives/Creative/Linear', 'TrackingEvents'),
+    ('Creatives/Creative/Linear/VideoClicks/ClickTracking', 'Creatives/Creative/Linear', 'VideoClicks'),
+)
+
+
+class WrapperLoop(ValueError):
+    """A wrapper chain points back to a URI it already visited."""
+
+
+class WrapperCache:
+    """Size‑bounded LRU of hop responses with a per‑entry TTL."""
+
+    def __init__(self, ttl: float = 60.0, maxsize: int = 1024):
+        self.ttl, self.maxsize = ttl, maxsize
+        self._data: 'OrderedDict[str, Tuple[float, str]]' = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[0] < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return item[1]
+
+    def put(self, key: str, xml: str) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, xml)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class WrapperResolver:
+    """Resolves wrapper chains; one instance per adapter keeps its cache."""
+
+    def __init__(self, cache: Optional[WrapperCache] = None,
+                 hop_timeout: Optional[float] = None, limit: int = 5,
+                 flights: Optional[SingleFlight] = None):
+        self.cache = cache
+        self.flights = flights
+        self.hop_timeout = hop_timeout
+        self.limit = limit
+
+    async def resolve(self, xml: str, fetch: Fetch, ctx: Optional[Dict[str, Any]] = None,
+                      limit: Optional[int] = None, coalesce: bool = True) -> str:
+        """Follow the chain in ``xml``; ``coalesce=False`` skips :attr:`flights`
+        (``fetch`` must not be shared beyond this call)."""
+        limit = self.limit if limit is None else limit
+        flights = self.flights if coalesce else None
+        doc = _parse(xml)
+        collected: List[List[ET._Element]] = [[] for _ in _MERGE]
+        seen = set()
+        depth = 0
+        while depth < limit:
+            wrapper = doc.find('Ad/Wrapper')
+            if wrapper is None:
+                break
+            uri = (wrapper.findtext('VASTAdTagURI') or '').strip()
+            if not uri:
+                break
+            for bucket, (path, _, _) in zip(collected, _MERGE):
+                bucket.extend(wrapper.iterfind(path))
+
+            tpl = Template(uri, iab=True)
+            key = tpl.render_key(ctx) if ctx is not None else uri
+            if key in seen:
+                raise WrapperLoop(key)
+            seen.add(key)
+            xml = await self._hop(key, tpl.render(ctx) if ctx is not None else uri, fetch, flights)
+            doc = _parse(xml)
+            depth += 1
+
+        metrics.wrapper_hops(depth)
+        if depth:
+            for inline in doc.iterfind('Ad/InLine'):
+                _merge(inline, collected)
+        return ET.tostring(doc, encoding='unicode')
+
+    async def _hop(self, key: str, uri: str, fetch: Fetch, flights: Optional[SingleFlight]) -> str:
+        if self.cache is not None:
+            xml = self.cache.get(key)
+            if xml is not None:
+                return xml
+        async with asyncio.timeout(current_deadline.get().cap(self.hop_timeout)):
+            if flights is not None:
+                xml = await flights.do(key, lambda: fetch(uri))
+            else:
+                xml = await fetch(uri)
+        if self.cache is not None:
+            self.cache.put(key, xml)
+        return xml
+
+
+def _parse(xml: str) -> ET._Element:
+    prof = current_attempt.get()
+    if prof is None:
+        return ET.fromstring(xml.encode())
+    t0 = time.perf_counter()
+    try:
+        return ET.fromstring(xml.encode())
+    finally:
+        prof.add("parse", time.perf_counter() - t0)
+
+
+def _merge(inline: ET._Element, collected: List[List[ET._Element]]) -> None:
+    for elements, (_, parent_path, container) in zip(collected, _MERGE):
+        if not elements:
+            continue
+        for parent in inline.iterfind(parent_path):
+            if container == elements[0].tag:  # flat siblings (Impression, Error)
+                same = parent.findall(container)
+                anchor = same[-1] if same else None
+                for el in elements:
+                    el = _copy(el)
+                    if anchor is None:
+                        parent.append(el)
+                    else:
+                        anchor.addnext(el)
+                    anchor = el
+            else:
+                box = parent.find(container)
+                if box is None:
+                    box = ET.SubElement(parent, container)
+                for el in elements:
+                    box.append(_copy(el))
+
+
+def _copy(el: ET._Element) -> ET._Element:
+    el = copy.deepcopy(el)
+    el.tail = None
+    return el
+
+
+async def resolve_wrappers(xml: str, fetch: Fetch, wrapper_limit: int = 5, *,
+                           ctx: Optional[Dict[str, Any]] = None,
+                           cache: Optional[WrapperCache] = None,
+                           hop_timeout: Optional[float] = None) -> str:
+    return await WrapperResolver(cache, hop_timeout, wrapper_limit).resolve(xml, fetch, ctx)
@@ -0,0 +1,5 @@
+from .model import Ad, Creative, Impression, MediaFile, Tracking, Vast
+from .parser import VastProbe, VastStreamParser, parse_vast
+from .pod import assemble_pod, write_pod
+from .writer import write_vast
+__all__ = ['Ad','Creative','Impression','MediaFile','Tracking','Vast','VastProbe','VastStreamParser','assemble_pod','parse_vast','write_pod','write_vast']
@@ -0,0 +1,76 @@
+"""Compact VAST object model.
+
+Only the fields PyVAST actually uses are kept; every class is a slotted
+dataclass so a parsed multi‑ad response costs a handful of small objects
+instead of a full lxml tree.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import List, Literal, Optional
+
+__all__ = ["Ad", "Creative", "Impression", "MediaFile", "Tracking", "Vast"]
+
+
+@dataclass(slots=True)
+class Impression:
+    url: str
+    id: Optional[str] = None
+
+
+@dataclass(slots=True)
+class Tracking:
+    event: str
+    url: str
+    offset: Optional[str] = None
+
+
+@dataclass(slots=True)
+class MediaFile:
+    url: str
+    delivery: Optional[str] = None
+    type: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    bitrate: Optional[int] = None
+    codec: Optional[str] = None
+
+
+@dataclass(slots=True)
+class Creative:
+    id: Optional[str] = None
+    ad_id: Optional[str] = None
+    sequence: Optional[int] = None
+    linear: bool = True  # has a <Linear>; the parser clears it for companion / non‑linear creatives
+    duration: Optional[float] = None  # seconds
+    media_files: List[MediaFile] = field(default_factory=list)
+    tracking: List[Tracking] = field(default_factory=list)
+    click_through: Optional[str] = None
+    click_tracking: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Ad:
+    id: Optional[str] = None
+    sequence: Optional[int] = None
+    kind: Literal["inline", "wrapper"] = "inline"
+    ad_system: Optional[str] = None
+    title: Optional[str] = None
+    tag_uri: Optional[str] = None  # Wrapper → VASTAdTagURI
+    impressions: List[Impression] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    creatives: List[Creative] = field(default_factory=list)
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Longest linear duration among the creatives."""
+        durations = [c.duration for c in self.creatives if c.linear and c.duration is not None]
+        return max(durations) if durations else None
+
+
+@dataclass(slots=True)
+class Vast:
+    version: str = "4.0"
+    ads: List[Ad] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)  # no‑ad <Error> URIs
@@ -0,0 +1,216 @@
+"""Streaming VAST parser.
+
+:func:`parse_vast` drives lxml's (libxml2) push parser with a *target* object:
+every start/end/text event goes straight into the compact
+:mod:`pyvast.vast.model`, and no element tree is ever built. Subtrees PyVAST
+never reads (Extensions, CompanionAds, NonLinearAds, AdVerifications, Icons …)
+are skipped without buffering their text, so memory per response is the model
+itself plus the current text node, regardless of response size.
+
+The gain is memory, not CPU: ``benchmarks/bench_parser.py`` shows parse time
+on par with ``lxml.etree.fromstring`` plus building the same model, at a
+fraction of its peak RSS.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Union
+
+import lxml.etree as ET
+
+from ..utils.vast_probe import VastProbe  # re-exported; kept lxml-free for adapters
+from .model import Ad, Creative, Impression, MediaFile, Tracking, Vast
+
+__all__ = ["VastProbe", "VastStreamParser", "parse_vast", "parse_duration"]
+
+CHUNK = 64 * 1024
+
+SKIP = frozenset(
+    (
+        "Extensions",
+        "CompanionAds",
+        "NonLinearAds",
+        "AdVerifications",
+        "Icons",
+        "Pricing",
+        "ViewableImpression",
+        "CreativeExtensions",
+        "UniversalAdId",
+        "Category",
+        "Description",
+        "Advertiser",
+        "Survey",
+    )
+)
+
+# leaf elements whose text the model needs
+TEXT = frozenset(
+    (
+        "AdSystem",
+        "AdTitle",
+        "VASTAdTagURI",
+        "Impression",
+        "Error",
+        "Duration",
+        "MediaFile",
+        "Tracking",
+        "ClickThrough",
+        "ClickTracking",
+    )
+)
+
+
+def parse_duration(text: Optional[str]) -> Optional[float]:
+    """``HH:MM:SS[.mmm]`` → seconds (``None`` if malformed)."""
+    if not text:
+        return None
+    try:
+        h, m, s = text.strip().split(":")
+        return int(h) * 3600 + int(m) * 60 + float(s)
+    except ValueError:
+        return None
+
+
+def _int(v: Optional[str]) -> Optional[int]:
+    try:
+        return int(v) if v is not None else None
+    except ValueError:
+        return None
+
+
+class _Builder:
+    """lxml parser target that builds the model from SAX‑style events."""
+
+    __slots__ = ("vast", "ad", "creative", "skip", "buf", "attrs")
+
+    def __init__(self) -> None:
+        self.vast = Vast()
+        self.ad: Optional[Ad] = None
+        self.creative: Optional[Creative] = None
+        self.skip = 0  # depth inside a skipped subtree
+        self.buf: Optional[List[str]] = None  # text of the current TEXT leaf
+        self.attrs: Dict[str, str] = {}
+
+    def start(self, tag: str, attrib) -> None:
+        if self.skip:
+            self.skip += 1
+            return
+        if tag[0] == "{":
+            tag = tag.rpartition("}")[2]
+        if tag in TEXT:
+            self.buf, self.attrs = [], attrib
+        elif tag in SKIP:
+            self.skip = 1
+        elif tag == "Ad":
+            self.ad = Ad(id=attrib.get("id"), sequence=_int(attrib.get("sequence")))
+        elif tag == "Creative":
+            if self.ad is not None:
+                self.creative = Creative(
+                    id=attrib.get("id"),
+                    ad_id=attrib.get("adId") or attrib.get("AdID"),
+                    sequence=_int(attrib.get("sequence")),
+                    linear=False,
+                )
+                self.ad.creatives.append(self.creative)
+        elif tag == "Linear":
+            if self.creative is not None:
+                self.creative.linear = True
+        elif tag == "Wrapper":
+            if self.ad is not None:
+                self.ad.kind = "wrapper"
+        elif tag == "VAST":
+            self.vast.version = attrib.get("version", self.vast.version)
+
+    def data(self, text: str) -> None:
+        if self.buf is not None and not self.skip:
+            self.buf.append(text)
+
+    def end(self, tag: str) -> None:
+        if self.skip:
+            self.skip -= 1
+            return
+        if tag[0] == "{":
+            tag = tag.rpartition("}")[2]
+        buf = self.buf
+        if buf is None:
+            if tag == "Ad":
+                if self.ad is not None:
+                    self.vast.ads.append(self.ad)
+                self.ad = self.creative = None
+            elif tag == "Creative":
+                self.creative = None
+            return
+        self.buf = None
+        text = "".join(buf).strip()
+        ad, cr, a = self.ad, self.creative, self.attrs
+        if ad is None:
+            if tag == "Error" and text:
+                self.vast.errors.append(text)
+        elif tag == "MediaFile":
+            if cr is not None:
+                cr.media_files.append(
+                    MediaFile(
+                        url=text,
+                        delivery=a.get("delivery"),
+                        type=a.get("type"),
+                        width=_int(a.get("width")),
+                        height=_int(a.get("height")),
+                        bitrate=_int(a.get("bitrate")),
+                        codec=a.get("codec"),
+                    )
+                )
+        elif tag == "Tracking":
+            if cr is not None:
+                cr.tracking.append(Tracking(a.get("event", ""), text, a.get("offset")))
+        elif tag == "Impression":
+            if text:
+                ad.impressions.append(Impression(text, a.get("id")))
+        elif tag == "Duration":
+            if cr is not None:
+                cr.duration = parse_duration(text)
+        elif tag == "Error":
+            if text:
+                ad.errors.append(text)
+        elif tag == "AdSystem":
+            ad.ad_system = text
+        elif tag == "AdTitle":
+            ad.title = text
+        elif tag == "VASTAdTagURI":
+            ad.tag_uri = text
+        elif cr is not None:
+            if tag == "ClickThrough":
+                cr.click_through = text
+            elif tag == "ClickTracking":
+                cr.click_tracking.append(text)
+
+    def close(self) -> Vast:
+        return self.vast
+
+
+class VastStreamParser:
+    """Incremental form: ``feed()`` chunks, then ``close()``.
+
+    Adapters do not use it: they return the body text, and only pod assembly
+    parses it (with :func:`parse_vast`) once the whole response is in.
+    """
+
+    __slots__ = ("_parser",)
+
+    def __init__(self) -> None:
+        self._parser = ET.XMLParser(target=_Builder(), resolve_entities=False, no_network=True)
+
+    def feed(self, chunk: Union[str, bytes]) -> None:
+        self._parser.feed(chunk)
+
+    def close(self) -> Vast:
+        return self._parser.close()
+
+
+def parse_vast(data: Union[str, bytes], chunk_size: int = CHUNK) -> Vast:
+    """Parse a VAST document into a :class:`~pyvast.vast.model.Vast`."""
+    if isinstance(data, str):
+        data = data.encode()
+    parser = VastStreamParser()
+    for i in range(0, len(data), chunk_size):
+        parser.feed(data[i : i + chunk_size])
+    return parser.close()
@@ -0,0 +1,116 @@
+"""Ad pod assembly.
+
+:func:`assemble_pod` merges several parsed responses (best first) into one
+:class:`~pyvast.vast.model.Vast` holding an ad pod: ads are taken in order,
+creatives already in the pod are dropped, and the pod is capped by ad count
+and total duration. It is a single pass over the ads with a set of seen
+creative keys, so the cost grows with the number of ads only.
+
+The compact model drops what the parser skips (AdVerifications, Extensions,
+Pricing, CompanionAds …), so :func:`write_pod` serializes a pod by splicing
+the original ``<Ad>`` elements of the chosen ads instead.
+"""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+import lxml.etree as ET
+
+from .model import Creative, Vast
+
+__all__ = ["assemble_pod", "creative_key", "write_pod"]
+
+_XML = ET.XMLParser(resolve_entities=False, no_network=True, remove_blank_text=True)
+
+
+def creative_key(cr: Creative) -> Optional[str]:
+    """Identity of a creative for de‑duplication: ad id, else first media URL."""
+    if cr.ad_id:
+        return "id:" + cr.ad_id
+    if cr.media_files:
+        return "url:" + cr.media_files[0].url
+    return None
+
+
+def assemble_pod(
+    responses: Iterable[Vast],
+    *,
+    max_ads: Optional[int] = None,
+    max_duration: Optional[float] = None,
+    dedupe: bool = True,
+    version: Optional[str] = None,
+) -> Vast:
+    """Build a pod from ``responses`` in the order given.
+
+    Wrapper ads and ads left without a linear creative after de‑duplication
+    are skipped; an ad keeps its non‑linear creatives (companions). With
+    ``max_duration`` an ad whose linear duration would overflow the pod (or
+    is unknown) is skipped, and later, shorter ads may still fit.
+    Pod ads get ``sequence`` 1…n; the version is ``version`` or that of the
+    first response contributing an ad.
+    """
+    pod = Vast(version=version or "4.0")
+    seen: Set[str] = set()
+    total = 0.0
+    for vast in responses:
+        if version is None and vast.ads and not pod.ads:
+            pod.version = vast.version  # the best response's version
+        for ad in vast.ads:
+            if max_ads is not None and len(pod.ads) >= max_ads:
+                return pod
+            if ad.kind != "inline":
+                continue
+            creatives = ad.creatives
+            if dedupe:
+                creatives = [c for c in creatives
+                             if not c.linear or (k := creative_key(c)) is None or k not in seen]
+            if not any(c.linear for c in creatives):
+                continue
+            if max_duration is not None:
+                duration = max((c.duration for c in creatives if c.linear and c.duration is not None), default=None)
+                if duration is None or total + duration > max_duration:
+                    continue
+                total += duration
+            if dedupe:
+                seen.update(k for c in creatives if c.linear and (k := creative_key(c)) is not None)
+            pod.ads.append(replace(ad, sequence=len(pod.ads) + 1, creatives=creatives))
+    return pod
+
+
+def _children(el, name: str) -> List[ET._Element]:
+    return [c for c in el if isinstance(c.tag, str) and ET.QName(c).localname == name]
+
+
+def write_pod(pod: Vast, sources: Sequence[Tuple[Vast, Union[str, bytes]]]) -> str:
+    """Serialize ``pod`` from the original ``<Ad>`` elements.
+
+    ``sources`` are the ``(parsed, raw)`` responses ``pod`` was assembled
+    from. Every pod ad is copied from its response with all of its subtrees,
+    minus the creatives the pod dropped, and gets its pod ``sequence``. Only
+    responses that contribute an ad are parsed again.
+    """
+    where: Dict[int, Tuple[int, int]] = {}  # id(creative) → (response, ad)
+    for si, (vast, _) in enumerate(sources):
+        for ai, ad in enumerate(vast.ads):
+            for cr in ad.creatives:
+                where[id(cr)] = (si, ai)
+    docs: Dict[int, List[ET._Element]] = {}
+    root = ET.Element("VAST", version=pod.version)
+    for ad in pod.ads:
+        si, ai = where[id(ad.creatives[0])]
+        if si not in docs:
+            raw = sources[si][1]
+            docs[si] = _children(ET.fromstring(raw.encode() if isinstance(raw, str) else raw, _XML), "Ad")
+        el = docs[si][ai]
+        el.set("sequence", str(ad.sequence))
+        kept = {id(c) for c in ad.creatives}
+        parsed = sources[si][0].ads[ai].creatives
+        elements = [c for body in _children(el, "InLine") for box in _children(body, "Creatives")
+                    for c in _children(box, "Creative")]
+        for cr, cr_el in zip(parsed, elements):
+            if id(cr) not in kept:
+                cr_el.getparent().remove(cr_el)
+        root.append(el)
+    return '<?xml version="1.0" encoding="UTF-8"?>' + ET.tostring(root, encoding="unicode")
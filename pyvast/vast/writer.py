@@ -0,0 +1,97 @@
+"""VAST serializer for the compact model.
+
+:func:`write_vast` emits the document in one pass over the model, appending
+string pieces to a list and joining once — no element tree is built. Only what
+:mod:`pyvast.vast.model` holds is written (linear creatives, tracking, clicks,
+impressions, errors); subtrees the parser skips are not round‑tripped, and
+creatives without a linear part are left out. To re‑emit ads in full, see
+:func:`~pyvast.vast.pod.write_pod`.
+"""
+
+from __future__ import annotations
+
+from typing import List
+from xml.sax.saxutils import escape, quoteattr
+
+from .model import Ad, Creative, Vast
+
+__all__ = ["write_vast", "format_duration"]
+
+
+def format_duration(seconds: float) -> str:
+    """Seconds → ``HH:MM:SS.mmm``."""
+    ms = round(seconds * 1000)
+    h, ms = divmod(ms, 3_600_000)
+    m, ms = divmod(ms, 60_000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}"
+
+
+def _cdata(text: str) -> str:
+    return "<![CDATA[" + text.replace("]]>", "]]]]><![CDATA[>") + "]]>"
+
+
+def _attrs(**kw) -> str:
+    return "".join(f" {k}={quoteattr(str(v))}" for k, v in kw.items() if v is not None)
+
+
+def _creative(out: List[str], cr: Creative) -> None:
+    out.append(f"<Creative{_attrs(id=cr.id, adId=cr.ad_id, sequence=cr.sequence)}><Linear>")
+    if cr.duration is not None:
+        out.append(f"<Duration>{format_duration(cr.duration)}</Duration>")
+    if cr.tracking:
+        out.append("<TrackingEvents>")
+        for t in cr.tracking:
+            out.append(f"<Tracking{_attrs(event=t.event, offset=t.offset)}>{_cdata(t.url)}</Tracking>")
+        out.append("</TrackingEvents>")
+    if cr.click_through or cr.click_tracking:
+        out.append("<VideoClicks>")
+        if cr.click_through:
+            out.append(f"<ClickThrough>{_cdata(cr.click_through)}</ClickThrough>")
+        for url in cr.click_tracking:
+            out.append(f"<ClickTracking>{_cdata(url)}</ClickTracking>")
+        out.append("</VideoClicks>")
+    if cr.media_files:
+        out.append("<MediaFiles>")
+        for mf in cr.media_files:
+            attrs = _attrs(
+                delivery=mf.delivery, type=mf.type, width=mf.width,
+                height=mf.height, bitrate=mf.bitrate, codec=mf.codec,
+            )
+            out.append(f"<MediaFile{attrs}>{_cdata(mf.url)}</MediaFile>")
+        out.append("</MediaFiles>")
+    out.append("</Linear></Creative>")
+
+
+def _ad(out: List[str], ad: Ad) -> None:
+    body = "Wrapper" if ad.kind == "wrapper" else "InLine"
+    out.append(f"<Ad{_attrs(id=ad.id, sequence=ad.sequence)}><{body}>")
+    if ad.ad_system is not None:
+        out.append(f"<AdSystem>{escape(ad.ad_system)}</AdSystem>")
+    if ad.kind == "wrapper":
+        out.append(f"<VASTAdTagURI>{_cdata(ad.tag_uri or '')}</VASTAdTagURI>")
+    elif ad.title is not None:
+        out.append(f"<AdTitle>{escape(ad.title)}</AdTitle>")
+    for imp in ad.impressions:
+        out.append(f"<Impression{_attrs(id=imp.id)}>{_cdata(imp.url)}</Impression>")
+    for url in ad.errors:
+        out.append(f"<Error>{_cdata(url)}</Error>")
+    linear = [cr for cr in ad.creatives if cr.linear]
+    if linear:
+        out.append("<Creatives>")
+        for cr in linear:
+            _creative(out, cr)
+        out.append("</Creatives>")
+    out.append(f"</{body}></Ad>")
+
+
+def write_vast(vast: Vast) -> str:
+    """Serialize a :class:`~pyvast.vast.model.Vast` to a VAST XML string."""
+    out = [f'<?xml version="1.0" encoding="UTF-8"?><VAST version={quoteattr(vast.version)}>']
+    for ad in vast.ads:
+        _ad(out, ad)
+    if not vast.ads:
+        for url in vast.errors:
+            out.append(f"<Error>{_cdata(url)}</Error>")
+    out.append("</VAST>")
+    return "".join(out)